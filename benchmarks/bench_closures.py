@@ -0,0 +1,46 @@
+"""
+闭包后端基准测试：编译开销和执行时间
+"""
+import argparse
+
+from common import best_of, generate_program, report
+
+from python.closures import ClosureInterpreter
+from python.codeobject import CodeObject, assemble
+from python.compiler import Bytecode
+from python.fastvm import FastInterpreter
+from python.interpreter import Interpreter
+from python.precedence import PrecedenceParser
+from python.scanner import Scanner
+from python.stackcompiler import StackCompiler
+
+
+def main() -> None:
+    """
+    比较栈式虚拟机和闭包后端
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=1_000_000, help="源代码字符数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    tree = PrecedenceParser(list(Scanner(generate_program(args.size)))).parse()
+    bytecode: list[Bytecode] = StackCompiler(tree).compile_to_list()
+    code: CodeObject = assemble(bytecode)
+    fast = FastInterpreter(code)
+    closures = ClosureInterpreter(tree)
+    assert closures.run() == Interpreter(bytecode).run()
+    print(f"{len(code):,} instructions, {len(closures.statements):,} statements")
+    for name, run in [
+        ("compile_to_list + assemble", lambda: assemble(StackCompiler(tree).compile_to_list())),
+        ("ClosureCompiler", lambda: ClosureInterpreter(tree)),
+        ("Interpreter list[Bytecode]", lambda: Interpreter(bytecode).run()),
+        ("Interpreter CodeObject", lambda: Interpreter(code).run()),
+        ("FastInterpreter run", fast.run),
+        ("ClosureInterpreter run", closures.run),
+    ]:
+        report(name, best_of(run, args.repeat), len(code), "instructions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+代码对象基准测试：Bytecode 列表与数组形式的代码对象的内存和执行时间
+"""
+import argparse
+import contextlib
+import io
+import tracemalloc
+from typing import Callable
+
+from common import best_of, generate_program, report
+
+from python.codeobject import CodeObject, assemble
+from python.interpreter import Interpreter
+from python.precedence import PrecedenceParser
+from python.scanner import Scanner
+from python.stackcompiler import StackCompiler
+
+
+def retained_bytes(build: Callable[[], object]) -> tuple[object, int]:
+    """
+    运行 build，返回结果和它保留下来的内存字节数
+    """
+    tracemalloc.start()
+    try:
+        result: object = build()
+        size: int = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def main() -> None:
+    """
+    比较两种格式
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=1_000_000, help="源代码字符数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    tree = PrecedenceParser(list(Scanner(generate_program(args.size)))).parse()
+    bytecode, list_size = retained_bytes(StackCompiler(tree).compile_to_list)
+    code, code_size = retained_bytes(lambda: assemble(bytecode))
+    assert isinstance(bytecode, list) and isinstance(code, CodeObject)
+    print(f"{len(bytecode):,} instructions, {len(code.consts):,} constants")
+    print(f"list[Bytecode] {list_size:>14,} bytes")
+    print(f"CodeObject     {code_size:>14,} bytes")
+    report("assemble", best_of(lambda: assemble(bytecode), args.repeat), len(bytecode), "instructions")
+    with contextlib.redirect_stdout(io.StringIO()):  # Interpreter.interpret prints the result.
+        timings = [
+            (name, best_of(lambda program=program: Interpreter(program).interpret(), args.repeat))
+            for name, program in [("interpret list[Bytecode]", bytecode), ("interpret CodeObject", code)]
+        ]
+    for name, seconds in timings:
+        report(name, seconds, len(bytecode), "instructions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+编译器基准测试：嵌套生成器的 Compiler 与显式工作栈的 StackCompiler
+"""
+import argparse
+
+from common import best_of, generate_program, report
+
+from python.compiler import Bytecode, Compiler
+from python.parser import BinOp, ExprStatement, Int, Program, TreeNode
+from python.precedence import PrecedenceParser
+from python.scanner import Scanner
+from python.stackcompiler import StackCompiler
+
+
+def right_deep_tower(depth: int, count: int) -> TreeNode:
+    """
+    count 条 2 ** 2 ** ... ** 2 语句，每条有 depth 层
+    """
+    tree: TreeNode = Int(2)
+    for _ in range(depth):
+        tree = BinOp("**", Int(2), tree)
+    return Program([ExprStatement(tree) for _ in range(count)])
+
+
+def main() -> None:
+    """
+    在随机程序和很深的语法树上比较两种编译器
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=500_000, help="源代码字符数")
+    arg_parser.add_argument("--depth", type=int, default=400, help="深层语法树的层数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    for label, tree in [
+        ("random program", PrecedenceParser(list(Scanner(generate_program(args.size)))).parse()),
+        (f"depth {args.depth}", right_deep_tower(args.depth, 200_000 // args.depth)),
+    ]:
+        bytecode: list[Bytecode] = StackCompiler(tree).compile_to_list()
+        assert bytecode == list(Compiler(tree).compile())
+        print(f"{label}: {len(bytecode):,} instructions")
+        for name, compile_tree in [
+            ("Compiler", lambda tree=tree: list(Compiler(tree).compile())),
+            ("StackCompiler", lambda tree=tree: StackCompiler(tree).compile_to_list()),
+        ]:
+            report(name, best_of(compile_tree, args.repeat), len(bytecode), "instructions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+分派基准测试：每次用 getattr 查找处理方法与预先计算的分派表
+"""
+import argparse
+import contextlib
+import io
+from typing import Any, Generator
+
+from common import best_of, generate_program, report
+
+from python.compiler import Bytecode, Compiler
+from python.interpreter import Interpreter
+from python.parser import TreeNode
+from python.precedence import PrecedenceParser
+from python.scanner import Scanner
+
+
+class GetattrCompiler(Compiler):
+    """
+    每个节点都用 f-string 和 getattr 查找编译方法的编译器
+    """
+
+    def _compile(self, tree: TreeNode) -> Generator[Bytecode, None, None]:  # type: ignore[override]
+        compile_method: Any | None = getattr(self, f"compile_{tree.__class__.__name__}", None)
+        if compile_method is None:
+            raise RuntimeError(f"Can't compile {tree.__class__.__name__}.")
+        yield from compile_method(tree)
+
+
+class GetattrInterpreter(Interpreter):
+    """
+    每条指令都用 f-string 和 getattr 查找解释方法的解释器
+    """
+
+    def interpret(self) -> None:
+        for bc in self.bytecode:
+            interpret_method = getattr(self, f"interpret_{bc.type.value}", None)
+            if interpret_method is None:
+                raise RuntimeError(f"Can't interpret {bc.type.value}.")
+            interpret_method(bc)
+
+
+def main() -> None:
+    """
+    比较两种分派方式的编译和解释耗时
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=500_000, help="源代码字符数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    tree = PrecedenceParser(list(Scanner(generate_program(args.size)))).parse()
+    bytecode: list[Bytecode] = list(Compiler(tree).compile())
+    assert list(GetattrCompiler(tree).compile()) == bytecode
+    print(f"{len(bytecode):,} instructions")
+    for name, compiler in [("compile (getattr)", GetattrCompiler), ("compile (dispatch table)", Compiler)]:
+        seconds: float = best_of(lambda compiler=compiler: list(compiler(tree).compile()), args.repeat)
+        report(name, seconds, len(bytecode), "instructions")
+    with contextlib.redirect_stdout(io.StringIO()):  # Interpreter.interpret prints the result.
+        timings = [
+            (name, best_of(lambda interpreter=interpreter: interpreter(bytecode).interpret(), args.repeat))
+            for name, interpreter in [
+                ("interpret (getattr)", GetattrInterpreter),
+                ("interpret (dispatch table)", Interpreter),
+            ]
+        ]
+    for name, seconds in timings:
+        report(name, seconds, len(bytecode), "instructions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+求值缓存基准测试：反复求值同一批表达式
+"""
+import argparse
+import random
+
+from common import best_of, generate_expression, report
+
+from python.evalcache import CacheLevel, EvaluationCache
+
+
+def main() -> None:
+    """
+    比较不同缓存级别下的求值速度
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--distinct", type=int, default=500, help="不同表达式的数量")
+    arg_parser.add_argument("--calls", type=int, default=20_000, help="求值次数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(0)
+    expressions: list[str] = [generate_expression(rng, 4) for _ in range(args.distinct)]
+    workload: list[str] = rng.choices(expressions, k=args.calls)
+    for name, levels in [
+        ("no cache", []),
+        ("tokens + ast", [CacheLevel.TOKENS, CacheLevel.AST]),
+        ("bytecode", [CacheLevel.BYTECODE]),
+        ("result + bytecode", [CacheLevel.RESULT, CacheLevel.BYTECODE]),
+    ]:
+
+        def run(levels: list[CacheLevel] = levels) -> None:
+            cache = EvaluationCache(levels)
+            for source in workload:
+                cache.evaluate(source)
+
+        report(name, best_of(run, args.repeat), len(workload), "evaluations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+快速解释器基准测试：Stack 类、代码对象和预分配栈
+"""
+import argparse
+
+from common import best_of, generate_program, report
+
+from python.codeobject import CodeObject, assemble, stack_depth
+from python.compiler import Bytecode
+from python.fastvm import FastInterpreter
+from python.interpreter import Interpreter
+from python.precedence import PrecedenceParser
+from python.scanner import Scanner
+from python.stackcompiler import StackCompiler
+
+
+def main() -> None:
+    """
+    比较三种执行方式，以及加载时检查的开销
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=1_000_000, help="源代码字符数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    tree = PrecedenceParser(list(Scanner(generate_program(args.size)))).parse()
+    bytecode: list[Bytecode] = StackCompiler(tree).compile_to_list()
+    code: CodeObject = assemble(bytecode)
+    fast = FastInterpreter(code)
+    assert fast.run() == Interpreter(bytecode).run()
+    print(f"{len(code):,} instructions, max stack depth {fast.max_depth}")
+    for name, run in [
+        ("Interpreter list[Bytecode]", lambda: Interpreter(bytecode).run()),
+        ("Interpreter CodeObject", lambda: Interpreter(code).run()),
+        ("stack_depth (load time)", lambda: stack_depth(code)),
+        ("FastInterpreter run", fast.run),
+    ]:
+        report(name, best_of(run, args.repeat), len(code), "instructions")
+
+
+if __name__ == "__main__":
+    main()
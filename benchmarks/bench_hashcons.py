@@ -0,0 +1,43 @@
+"""
+哈希共享基准测试：重复较多的程序在共享子树前后的内存占用
+"""
+import argparse
+import random
+import tracemalloc
+
+from common import best_of, generate_expression, report
+
+from python.hashcons import HashConsingParser
+from python.precedence import PrecedenceParser
+from python.scanner import Scanner
+from python.tokenizer import Token
+
+
+def main() -> None:
+    """
+    从少量不同的表达式中随机抽取语句，比较两种解析器的内存与速度
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--statements", type=int, default=100_000)
+    arg_parser.add_argument("--distinct", type=int, default=100, help="不同表达式的数量")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(0)
+    expressions: list[str] = [generate_expression(rng) for _ in range(args.distinct)]
+    code: str = "\n".join(rng.choice(expressions) for _ in range(args.statements))
+    tokens: list[Token] = list(Scanner(code))
+    print(f"{args.statements:,} statements, {len(tokens):,} tokens")
+
+    for name, engine in [("PrecedenceParser", PrecedenceParser), ("HashConsingParser", HashConsingParser)]:
+        tracemalloc.start()
+        program = engine(tokens).parse()
+        memory: int = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del program
+        print(f"{name + ' memory':<32} {memory / 1e6:>10.1f} MB")
+        report(name, best_of(lambda engine=engine: engine(tokens).parse(), args.repeat), len(tokens), "tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+映像基准测试：打开映像与读出缓存的代码对象的开销，以及执行时间
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+
+from common import best_of, generate_program, report
+
+from python.bytecache import dumps_code, loads_code
+from python.codeobject import CodeObject, assemble
+from python.image import load_image, write_image
+from python.interpreter import Interpreter
+from python.precedence import PrecedenceParser
+from python.scanner import Scanner
+from python.stackcompiler import StackCompiler
+
+
+def main() -> None:
+    """
+    比较映像与序列化的代码对象
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=2_000_000, help="源代码字符数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    tree = PrecedenceParser(list(Scanner(generate_program(args.size)))).parse()
+    code: CodeObject = assemble(StackCompiler(tree).compile_to_list())
+    serialized: bytes = dumps_code(code)
+    with tempfile.TemporaryDirectory() as directory:
+        path: str = os.path.join(directory, "program.bpci")
+        write_image(code, path)
+        print(f"{len(code):,} instructions, image {os.path.getsize(path):,} bytes")
+
+        def open_and_close() -> None:
+            with load_image(path):
+                pass
+
+        report("load_image", best_of(open_and_close, args.repeat), len(code), "instructions")
+        report("loads_code", best_of(lambda: loads_code(serialized), args.repeat), len(code), "instructions")
+        with load_image(path) as image, contextlib.redirect_stdout(io.StringIO()):
+            timings = [
+                (name, best_of(lambda program=program: Interpreter(program).interpret(), args.repeat))
+                for name, program in [("interpret CodeObject", code), ("interpret mapped image", image)]
+            ]
+    for name, seconds in timings:
+        report(name, seconds, len(code), "instructions")
+
+
+if __name__ == "__main__":
+    main()
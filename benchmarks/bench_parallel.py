@@ -0,0 +1,37 @@
+"""
+并行前端基准测试：不同工作进程数下编译大文件的耗时
+"""
+import argparse
+import os
+import tempfile
+
+from common import best_of, generate_program, report
+
+from python.parallel import compile_file
+
+
+def main() -> None:
+    """
+    生成一个大源文件，依次用 1、2、4……个工作进程编译
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=20_000_000, help="源代码字节数")
+    arg_parser.add_argument("--repeat", type=int, default=1)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path: str = os.path.join(directory, "program.txt")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(generate_program(args.size))
+        size: int = os.path.getsize(path)
+        print(f"{size:,} bytes, {os.cpu_count()} CPUs")
+
+        workers: int = 1
+        while workers <= (os.cpu_count() or 1):
+            seconds: float = best_of(lambda workers=workers: compile_file(path, workers=workers), args.repeat)
+            report(f"{workers} worker(s)", seconds, size / 1e6, "MB")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
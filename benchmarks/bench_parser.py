@@ -0,0 +1,32 @@
+"""
+解析器基准测试：递归下降的 Parser 与迭代式的 PrecedenceParser
+"""
+import argparse
+
+from common import best_of, generate_program, report
+
+from python.parser import Parser
+from python.precedence import PrecedenceParser
+from python.scanner import Scanner
+from python.tokenizer import Token
+
+
+def main() -> None:
+    """
+    在同一份标记列表上比较两种解析器
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=1_000_000, help="源代码字符数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    tokens: list[Token] = list(Scanner(generate_program(args.size)))
+    assert PrecedenceParser(tokens).parse() == Parser(tokens).parse()
+    print(f"{len(tokens):,} tokens")
+    for name, engine in [("Parser", Parser), ("PrecedenceParser", PrecedenceParser)]:
+        seconds: float = best_of(lambda engine=engine: engine(tokens).parse(), args.repeat)
+        report(name, seconds, len(tokens), "tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+寄存器虚拟机基准测试：与栈式虚拟机比较指令数和执行时间
+"""
+import argparse
+
+from common import best_of, generate_program, report
+
+from python.codeobject import CodeObject, assemble
+from python.compiler import Bytecode
+from python.fastvm import FastInterpreter
+from python.interpreter import Interpreter
+from python.precedence import PrecedenceParser
+from python.registervm import RegisterCode, RegisterInterpreter, translate
+from python.scanner import Scanner
+from python.stackcompiler import StackCompiler
+
+
+def main() -> None:
+    """
+    在不同嵌套深度的程序上比较两种虚拟机
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=1_000_000, help="每个程序的源代码字符数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    for depth in [2, 3, 5]:
+        tree = PrecedenceParser(list(Scanner(generate_program(args.size, depth=depth)))).parse()
+        bytecode: list[Bytecode] = StackCompiler(tree).compile_to_list()
+        code: CodeObject = assemble(bytecode)
+        register_code: RegisterCode = translate(bytecode)
+        fast, registers = FastInterpreter(code), RegisterInterpreter(register_code)
+        assert registers.run() == Interpreter(code).run()
+        print(
+            f"depth {depth}: {len(code):,} stack instructions, {len(register_code):,} register instructions "
+            f"({1 - len(register_code) / len(code):.1%} fewer), {len(register_code.registers):,} registers"
+        )
+        for name, run in [
+            ("translate", lambda: translate(bytecode)),
+            ("Interpreter list[Bytecode]", lambda: Interpreter(bytecode).run()),
+            ("Interpreter CodeObject", lambda: Interpreter(code).run()),
+            ("FastInterpreter run", fast.run),
+            ("RegisterInterpreter run", registers.run),
+        ]:
+            report(name, best_of(run, args.repeat), len(code), "stack instructions")
+
+
+if __name__ == "__main__":
+    main()
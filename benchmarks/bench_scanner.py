@@ -0,0 +1,36 @@
+"""
+扫描器吞吐量基准测试：Tokenizer、Scanner 与 ByteScanner
+"""
+import argparse
+
+from common import best_of, generate_program, report
+
+from python.bytescanner import ByteScanner
+from python.scanner import Scanner
+from python.tokenizer import Tokenizer
+
+
+def main() -> None:
+    """
+    在数 MB 的输入上比较两种分词实现
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=4_000_000, help="源代码字符数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    code: str = generate_program(args.size)
+    data: bytes = code.encode("ascii")
+    assert list(Scanner(code)) == list(ByteScanner(data)) == list(Tokenizer(code))
+    print(f"{len(code):,} chars, {code.count(chr(10)):,} lines")
+    for name, engine, source in [
+        ("Tokenizer", Tokenizer, code),
+        ("Scanner", Scanner, code),
+        ("ByteScanner", ByteScanner, data),
+    ]:
+        seconds: float = best_of(lambda engine=engine, source=source: list(engine(source)), args.repeat)
+        report(name, seconds, len(code) / 1e6, "MB")
+
+
+if __name__ == "__main__":
+    main()
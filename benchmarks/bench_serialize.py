@@ -0,0 +1,42 @@
+"""
+语法树序列化基准测试：从源代码解析、二进制格式与 pickle 的加载时间和大小
+"""
+import argparse
+import pickle
+
+from common import best_of, generate_program, report
+
+from python.parser import Program
+from python.precedence import PrecedenceParser
+from python.scanner import Scanner
+from python.serialize import dumps, loads, loads_arena
+
+
+def main() -> None:
+    """
+    比较几种得到语法树的方式
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=2_000_000, help="源代码字符数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    code: str = generate_program(args.size)
+    program: Program = PrecedenceParser(list(Scanner(code))).parse()
+    binary: bytes = dumps(program)
+    pickled: bytes = pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL)
+    assert loads(binary) == pickle.loads(pickled) == program
+
+    print(f"{'source size':<32} {len(code) / 1e6:>10.2f} MB")
+    print(f"{'binary size':<32} {len(binary) / 1e6:>10.2f} MB")
+    print(f"{'pickle size':<32} {len(pickled) / 1e6:>10.2f} MB")
+    megabytes: float = len(code) / 1e6
+    parse_seconds: float = best_of(lambda: PrecedenceParser(list(Scanner(code))).parse(), args.repeat)
+    report("parse from source", parse_seconds, megabytes, "MB")
+    report("loads (binary)", best_of(lambda: loads(binary), args.repeat), megabytes, "MB")
+    report("loads_arena (binary)", best_of(lambda: loads_arena(binary), args.repeat), megabytes, "MB")
+    report("pickle.loads", best_of(lambda: pickle.loads(pickled), args.repeat), megabytes, "MB")
+
+
+if __name__ == "__main__":
+    main()
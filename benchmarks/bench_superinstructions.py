@@ -0,0 +1,50 @@
+"""
+超级指令基准测试：融合前后的分派次数和执行时间
+"""
+import argparse
+from collections import Counter
+
+from common import best_of, generate_program, report
+
+from python.codeobject import assemble
+from python.compiler import Bytecode
+from python.fastvm import FastInterpreter
+from python.interpreter import Interpreter
+from python.peephole import optimize_bytecode
+from python.precedence import PrecedenceParser
+from python.scanner import Scanner
+from python.stackcompiler import StackCompiler
+from python.superinstructions import fuse_superinstructions
+
+
+def main() -> None:
+    """
+    在三种执行方式上比较融合前后的程序
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=1_000_000, help="源代码字符数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    tree = PrecedenceParser(list(Scanner(generate_program(args.size)))).parse()
+    plain: list[Bytecode] = optimize_bytecode(StackCompiler(tree).compile_to_list())
+    removed: Counter[str] = Counter()
+    fused: list[Bytecode] = fuse_superinstructions(plain, removed)
+    plain_code, fused_code = assemble(plain), assemble(fused)
+    assert FastInterpreter(fused_code).run() == Interpreter(plain).run()
+    print(f"dispatches {len(plain):,} -> {len(fused):,} ({1 - len(fused) / len(plain):.1%} fewer)")
+    print(f"removed by rule: {dict(removed)}")
+    fuse_seconds: float = best_of(lambda: fuse_superinstructions(plain), args.repeat)
+    report("fuse_superinstructions", fuse_seconds, len(plain), "instructions")
+    for label, bytecode, code in [("plain", plain, plain_code), ("fused", fused, fused_code)]:
+        fast = FastInterpreter(code)
+        for name, run in [
+            (f"Interpreter list[Bytecode] ({label})", lambda: Interpreter(bytecode).run()),
+            (f"Interpreter CodeObject ({label})", lambda: Interpreter(code).run()),
+            (f"FastInterpreter ({label})", fast.run),
+        ]:
+            report(name, best_of(run, args.repeat), len(plain), "source instructions")
+
+
+if __name__ == "__main__":
+    main()
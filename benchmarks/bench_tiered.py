@@ -0,0 +1,83 @@
+"""
+分层运行时基准测试：少数表达式被反复执行，大多数只执行一次
+"""
+import argparse
+import random
+
+from common import best_of, generate_expression, report
+
+from python.bytecache import compile_source
+from python.interpreter import Interpreter
+from python.tiered import Tier, TieredRuntime
+
+
+def main() -> None:
+    """
+    比较每次都编译执行、只用冷层级和各个提升层级，再单独比较每个层级执行热表达式的速度
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--hot", type=int, default=20, help="热表达式的数量")
+    arg_parser.add_argument("--hot-calls", type=int, default=50_000, help="热表达式的执行次数")
+    arg_parser.add_argument("--cold", type=int, default=2_000, help="只执行一次的表达式数量")
+    arg_parser.add_argument("--threshold", type=int, default=100)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(0)
+    hot: list[str] = [generate_expression(rng, 5) for _ in range(args.hot)]
+    workload: list[str] = rng.choices(hot, k=args.hot_calls) + [generate_expression(rng, 5) for _ in range(args.cold)]
+    rng.shuffle(workload)
+
+    def compile_every_time() -> None:
+        for source in workload:
+            Interpreter(compile_source(source)).run()
+
+    report("compile + Interpreter", best_of(compile_every_time, args.repeat), len(workload), "runs")
+    for name, threshold, tier in [
+        ("cold tier only", len(workload), Tier.NATIVE),
+        ("tiered OPTIMIZED", args.threshold, Tier.OPTIMIZED),
+        ("tiered CLOSURE", args.threshold, Tier.CLOSURE),
+        ("tiered NATIVE", args.threshold, Tier.NATIVE),
+    ]:
+        runtimes: list[TieredRuntime] = []
+
+        def run(threshold: int = threshold, tier: Tier = tier) -> None:
+            runtime = TieredRuntime(threshold, tier)
+            for source in workload:
+                runtime.run(source)
+            runtimes.append(runtime)
+
+        report(name, best_of(run, args.repeat), len(workload), "runs")
+        stats = runtimes[-1].stats
+        print(f"    runs {dict(stats.runs)}, promotion {stats.promotion_seconds * 1000:.1f} ms")
+
+    # 只比较热表达式提升之后每次执行的时间，不含解析、编译和提升。
+    calls: int = args.hot_calls // len(hot)
+    cold = TieredRuntime(threshold=calls, tier=Tier.NATIVE)
+    for source in hot:
+        cold.run(source)
+    codes = [cold.profiles[source].code for source in hot]
+
+    def run_cold() -> None:
+        for code in codes:
+            for _ in range(calls):
+                Interpreter(code).run()
+
+    cold_seconds: float = best_of(run_cold, args.repeat)
+    report("per run: cold tier", cold_seconds, calls * len(hot), "runs")
+    for tier in [Tier.OPTIMIZED, Tier.CLOSURE, Tier.NATIVE]:
+        runtime = TieredRuntime(threshold=0, tier=tier)
+        functions = [runtime.promote(source, cold.profiles[source].tree) for source in hot]
+
+        def run_promoted(functions: list = functions) -> None:
+            for function in functions:
+                for _ in range(calls):
+                    function()
+
+        seconds: float = best_of(run_promoted, args.repeat)
+        report(f"per run: {tier}", seconds, calls * len(hot), "runs")
+        print(f"    {cold_seconds / seconds:.2f}x the cold tier")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+紧凑标记流基准测试：list[Token] 与 TokenStream 的内存占用和解析速度
+"""
+import argparse
+import tracemalloc
+from typing import Callable
+
+from common import best_of, generate_program, report
+
+from python.parser import Parser, TokenStreamParser
+from python.scanner import Scanner
+from python.tokenizer import Token
+from python.tokenstream import TokenStream
+
+
+def peak_memory(build: Callable[[], object]) -> int:
+    """
+    返回构建对象期间的内存峰值（字节）
+    """
+    tracemalloc.start()
+    try:
+        result = build()  # pylint: disable=W0612  # Keep it alive until the snapshot.
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    """
+    比较两种标记序列的内存与速度，使用 --tokens 10000000 复现千万级标记的对比
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--tokens", type=int, default=1_000_000, help="大约的标记数量")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    code: str = generate_program(int(args.tokens * 2.1))
+    tokens: list[Token] = list(Scanner(code))
+    stream = TokenStream(code)
+    print(f"{len(code):,} chars, {len(tokens):,} tokens")
+
+    list_bytes: int = peak_memory(lambda: list(Scanner(code)))
+    stream_bytes: int = peak_memory(lambda: TokenStream(code))
+    print(f"{'list[Token] memory':<32} {list_bytes / 1e6:>10.1f} MB {list_bytes / len(tokens):>10.1f} B/token")
+    print(f"{'TokenStream memory':<32} {stream_bytes / 1e6:>10.1f} MB {stream_bytes / len(tokens):>10.1f} B/token")
+
+    report("build list[Token]", best_of(lambda: list(Scanner(code)), args.repeat), len(tokens), "tokens")
+    report("build TokenStream", best_of(lambda: TokenStream(code), args.repeat), len(tokens), "tokens")
+    report("parse list[Token]", best_of(lambda: Parser(tokens).parse(), args.repeat), len(tokens), "tokens")
+    report("parse TokenStream", best_of(lambda: TokenStreamParser(stream).parse(), args.repeat), len(tokens), "tokens")
+
+
+if __name__ == "__main__":
+    main()
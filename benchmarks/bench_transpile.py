@@ -0,0 +1,50 @@
+"""
+CPython 代码对象后端基准测试：转换开销、缓存命中和执行时间
+"""
+import argparse
+
+from common import best_of, generate_program, report
+
+from python.closures import ClosureInterpreter
+from python.codeobject import CodeObject, assemble
+from python.compiler import Bytecode
+from python.fastvm import FastInterpreter
+from python.interpreter import Interpreter
+from python.precedence import PrecedenceParser
+from python.scanner import Scanner
+from python.stackcompiler import StackCompiler
+from python.transpile import NativeInterpreter, TranspileCache, transpile
+
+
+def main() -> None:
+    """
+    比较各个执行后端
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=1_000_000, help="源代码字符数")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    tree = PrecedenceParser(list(Scanner(generate_program(args.size)))).parse()
+    bytecode: list[Bytecode] = StackCompiler(tree).compile_to_list()
+    code: CodeObject = assemble(bytecode)
+    fast = FastInterpreter(code)
+    closures = ClosureInterpreter(tree)
+    cache = TranspileCache()
+    native = NativeInterpreter(tree, cache)
+    assert native.run() == Interpreter(bytecode).run()
+    print(f"{len(code):,} instructions")
+    for name, run in [
+        ("transpile", lambda: transpile(tree)),
+        ("TranspileCache hit", lambda: cache.compile(tree)),
+        ("Interpreter list[Bytecode]", lambda: Interpreter(bytecode).run()),
+        ("Interpreter CodeObject", lambda: Interpreter(code).run()),
+        ("FastInterpreter run", fast.run),
+        ("ClosureInterpreter run", closures.run),
+        ("NativeInterpreter run", native.run),
+    ]:
+        report(name, best_of(run, args.repeat), len(code), "instructions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+基准测试的公共工具
+
+运行方式（在仓库根目录）：PYTHONPATH=src python benchmarks/<脚本名>.py
+"""
+import gc
+import random
+import time
+from typing import Callable
+
+BINARY_OPERATORS: tuple[str, ...] = ("+", "-", "*", "/", "%", "**")
+
+
+def generate_expression(rng: random.Random, depth: int = 3) -> str:
+    """
+    随机生成一个合法的表达式
+
+    `/` 和 `%` 的右操作数总是正数字面量，`**` 的指数总是很小的整数，保证表达式可以求值。
+    """
+    if depth <= 0 or rng.random() < 0.3:
+        match rng.randrange(3):
+            case 0:
+                return str(rng.randrange(1000))
+            case 1:
+                return f"{rng.randrange(100)}.{rng.randrange(100)}"
+            case _:
+                return f"{rng.choice('+-')}{rng.randrange(1, 100)}"
+    op: str = rng.choice(BINARY_OPERATORS)
+    left: str = generate_expression(rng, depth - 1)
+    if op in {"/", "%"}:
+        right: str = str(rng.randrange(1, 50))
+    elif op == "**":
+        left, right = f"({left})", str(rng.randrange(4))
+    else:
+        right = generate_expression(rng, depth - 1)
+    if rng.random() < 0.3:
+        return f"({left} {op} {right})"
+    return f"{left} {op} {right}"
+
+
+def generate_program(size: int, seed: int = 0, depth: int = 3) -> str:
+    """
+    生成大约 size 个字符、每行一条表达式语句的程序
+    """
+    rng = random.Random(seed)
+    lines: list[str] = []
+    length: int = 0
+    while length < size:
+        line: str = generate_expression(rng, depth)
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+def best_of(func: Callable[[], object], repeat: int = 3) -> float:
+    """
+    多次运行 func，返回最短耗时（秒）
+
+    与 timeit 一样，计时期间关闭垃圾回收，避免大量对象分配时的回收开销干扰结果。
+    """
+    timings: list[float] = []
+    gc_was_enabled: bool = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start: float = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return min(timings)
+
+
+def report(name: str, seconds: float, amount: float, unit: str) -> None:
+    """
+    打印一行基准测试结果
+    """
+    print(f"{name:<32} {seconds * 1000:>10.1f} ms {amount / seconds:>14,.0f} {unit}/s")
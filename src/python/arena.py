@@ -0,0 +1,212 @@
+"""
+扁平的语法树存储区
+"""
+from __future__ import annotations
+
+from array import array
+from enum import IntEnum, auto
+from typing import Any, Sequence
+
+from .parser import BinOp, ExprStatement, Float, Int, NodeDescription, Program, Statement, TreeNode, UnaryOp
+
+
+class NodeKind(IntEnum):
+    """
+    存储区中的节点类型
+    """
+
+    PROGRAM = auto()
+    EXPR_STATEMENT = auto()
+    UNARYOP = auto()
+    BINOP = auto()
+    INT = auto()
+    FLOAT = auto()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}.{self.name}"
+
+
+# 运算符与整数编码之间的对应关系，编码就是 OPERATORS 中的下标。
+OPERATORS: tuple[str, ...] = ("+", "-", "*", "/", "%", "**")
+OPERATOR_CODES: dict[str, int] = {op: code for code, op in enumerate(OPERATORS)}
+
+NO_CHILD: int = -1
+
+
+class AstArena:
+    """
+    语法树存储区类
+
+    每个节点是几个并行数组中的同一个下标：节点类型、运算符编码、左右子节点下标。
+    节点按后序（先子节点、从左到右）存放，所以子节点的下标总是小于父节点。
+    整数可以任意大，所以字面量的值放在 literals 列表中，字面量节点的 left 是它在列表中的下标；
+    程序节点的 left 和 right 是它的语句在 children 数组中的起始位置和数量。
+    """
+
+    def __init__(self) -> None:
+        self.kinds: array[int] = array("B")
+        self.ops: array[int] = array("B")
+        self.left: array[int] = array("q")
+        self.right: array[int] = array("q")
+        self.children: array[int] = array("q")
+        self.literals: list[int | float] = []
+        self.root: int = NO_CHILD
+
+    def add(self, kind: NodeKind, op: int = 0, left: int = NO_CHILD, right: int = NO_CHILD) -> int:
+        """
+        添加一个节点，返回它的下标，新节点就是新的根节点
+        """
+        self.kinds.append(kind)
+        self.ops.append(op)
+        self.left.append(left)
+        self.right.append(right)
+        self.root = len(self.kinds) - 1
+        return self.root
+
+    def add_literal(self, kind: NodeKind, value: int | float) -> int:
+        """
+        添加一个字面量节点
+        """
+        self.literals.append(value)
+        return self.add(kind, left=len(self.literals) - 1)
+
+    def add_program(self, statements: list[int]) -> int:
+        """
+        添加一个程序节点
+        """
+        start: int = len(self.children)
+        self.children.extend(statements)
+        return self.add(NodeKind.PROGRAM, left=start, right=len(statements))
+
+    def statements(self, index: int) -> array[int]:
+        """
+        返回程序节点的语句下标
+        """
+        start: int = self.left[index]
+        return self.children[start : start + self.right[index]]
+
+    def describe(self, index: int) -> NodeDescription:
+        """
+        返回 dump_ast 打印节点所需的信息
+        """
+        kind: int = self.kinds[index]
+        left: int = self.left[index]
+        match kind:
+            case NodeKind.PROGRAM:
+                return "Program", None, None, list(self.statements(index))
+            case NodeKind.EXPR_STATEMENT:
+                return "ExprStatement", None, None, [left]
+            case NodeKind.UNARYOP:
+                return "UnaryOp", OPERATORS[self.ops[index]], None, [left]
+            case NodeKind.BINOP:
+                return "BinOp", OPERATORS[self.ops[index]], None, [left, self.right[index]]
+            case NodeKind.INT:
+                return "Int", None, self.literals[left], []
+            case NodeKind.FLOAT:
+                return "Float", None, self.literals[left], []
+        raise RuntimeError(f"Can't print a node of kind {kind}")
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} nodes, root={self.root})"
+
+    @classmethod
+    def from_tree(cls, tree: TreeNode) -> AstArena:
+        """
+        把数据类语法树转换成存储区，使用显式栈做后序遍历
+        """
+        arena = cls()
+        indices: list[int] = []  # Arena indices of the finished subtrees.
+        stack: list[tuple[TreeNode, bool]] = [(tree, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(_children(node)))
+                continue
+            match node:
+                case Program(statements):
+                    first: int = len(indices) - len(statements)
+                    index: int = arena.add_program(indices[first:])
+                    del indices[first:]
+                case ExprStatement():
+                    index = arena.add(NodeKind.EXPR_STATEMENT, left=indices.pop())
+                case UnaryOp(op):
+                    index = arena.add(NodeKind.UNARYOP, _operator_code(op), left=indices.pop())
+                case BinOp(op):
+                    right: int = indices.pop()
+                    index = arena.add(NodeKind.BINOP, _operator_code(op), indices.pop(), right)
+                case Int(value):
+                    index = arena.add_literal(NodeKind.INT, value)
+                case Float(value):
+                    index = arena.add_literal(NodeKind.FLOAT, value)
+            indices.append(index)
+        return arena
+
+    def to_tree(self) -> TreeNode:
+        """
+        把存储区转换回数据类语法树，子节点总在父节点之前，所以顺序扫描一遍即可
+        """
+        # 节点的类型由 kind 决定，子节点总是表达式、语句总是 ExprStatement，不再逐个检查。
+        nodes: list[Any] = []
+        append = nodes.append
+        literals: list[Any] = self.literals
+        program, expr_statement, unary_op, bin_op, int_, float_ = (int(kind) for kind in NodeKind)
+        for index, (kind, op, left, right) in enumerate(zip(self.kinds, self.ops, self.left, self.right)):
+            if kind == bin_op:
+                append(BinOp(OPERATORS[op], nodes[left], nodes[right]))
+            elif kind == int_:
+                append(Int(literals[left]))
+            elif kind == float_:
+                append(Float(literals[left]))
+            elif kind == unary_op:
+                append(UnaryOp(OPERATORS[op], nodes[left]))
+            elif kind == expr_statement:
+                append(ExprStatement(nodes[left]))
+            elif kind == program:
+                statements: list[Statement] = [nodes[child] for child in self.statements(index)]
+                append(Program(statements))
+            else:
+                raise RuntimeError(f"Unknown node kind {kind}.")
+        return nodes[self.root]
+
+
+def _children(node: TreeNode) -> Sequence[TreeNode]:
+    """
+    返回节点的子节点，从左到右
+    """
+    match node:
+        case Program(statements):
+            return statements
+        case ExprStatement(expr):
+            return [expr]
+        case UnaryOp(_, value):
+            return [value]
+        case BinOp(_, left, right):
+            return [left, right]
+        case Int() | Float():
+            return []
+    raise RuntimeError(f"Can't store a node of type {node.__class__.__name__}.")
+
+
+def _operator_code(op: str) -> int:
+    """
+    返回运算符的编码
+    """
+    if (code := OPERATOR_CODES.get(op)) is None:
+        raise RuntimeError(f"Unknown operator {op}.")
+    return code
+
+
+if __name__ == "__main__":
+    from .parser import Parser, print_ast
+    from .tokenizer import Tokenizer
+
+    CODE = """1 % -2
+5 ** -3 / 5
+1 * 2 + 2 ** 3"""
+    ast_arena = AstArena.from_tree(Parser(list(Tokenizer(CODE))).parse())
+    print(ast_arena)
+    print_ast(ast_arena)
@@ -0,0 +1,221 @@
+"""
+磁盘上的字节码缓存
+"""
+import hashlib
+import marshal
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from dataclasses import dataclass
+
+from .codeobject import ARG_TYPECODE, OPCODES, CodeObject, assemble
+from .precedence import PrecedenceParser
+from .scanner import Scanner
+from .stackcompiler import StackCompiler
+
+MAGIC: bytes = b"BPCC"
+# 编译器或者缓存格式改变时增加版本号，旧的缓存文件就不会再被命中。
+CACHE_VERSION: int = 1
+
+# 文件头：魔数、格式版本、操作码的数量，全部小端。
+HEADER: struct.Struct = struct.Struct("<4sHxxq")
+
+CACHE_SUFFIX: str = ".bpcc"
+DEFAULT_CACHE_DIR: str = os.path.join(os.path.expanduser("~"), ".cache", "bpci")
+DEFAULT_MAX_BYTES: int = 64 << 20
+
+
+@dataclass
+class CacheStats:
+    """
+    缓存统计信息
+    """
+
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    errors: int = 0  # Unreadable entries and failed writes; neither is fatal.
+
+
+def compile_source(source: str) -> CodeObject:
+    """
+    分词、解析并编译源代码
+    """
+    return assemble(StackCompiler(PrecedenceParser(list(Scanner(source))).parse()).compile_to_list())
+
+
+def dumps_code(code: CodeObject) -> bytes:
+    """
+    把代码对象序列化成字节串，参数数组按小端写出，常量用 marshal 编码
+    """
+    args = array(ARG_TYPECODE, code.args)
+    if sys.byteorder == "big":
+        args.byteswap()
+    header: bytes = HEADER.pack(MAGIC, CACHE_VERSION, len(code.opcodes))
+    opcodes: bytes = array("B", code.opcodes).tobytes()
+    return header + opcodes + marshal.dumps((args.tobytes(), code.constant_values()))
+
+
+def loads_code(data: bytes) -> CodeObject:
+    """
+    从字节串读出代码对象，并检查数据是否完整有效
+    """
+    if len(data) < HEADER.size:
+        raise RuntimeError("Truncated bytecode cache entry.")
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != CACHE_VERSION:
+        raise RuntimeError("Not a bytecode cache entry of this version.")
+    opcodes: bytes = data[HEADER.size : HEADER.size + count]
+    args = array(ARG_TYPECODE)
+    try:
+        args_bytes, consts = marshal.loads(data[HEADER.size + count :])
+        args.frombytes(args_bytes)
+    except (EOFError, ValueError, TypeError) as error:
+        raise RuntimeError("Corrupted bytecode cache entry.") from error
+    if sys.byteorder == "big":
+        args.byteswap()
+    if len(opcodes) != count or len(args) != count or not isinstance(consts, tuple):
+        raise RuntimeError("Corrupted bytecode cache entry.")
+    if count and max(opcodes) >= len(OPCODES):
+        raise RuntimeError("Corrupted bytecode cache entry.")
+    return CodeObject(opcodes, args, consts)
+
+
+class BytecodeCache:
+    """
+    字节码缓存类
+
+    编译结果以源代码和格式版本的 SHA-256 为文件名保存在缓存目录中，再次运行相同的源代码时跳过整个前端。
+    写入时先写临时文件再用 os.replace 替换，所以其它进程只会看到完整的旧文件或者新文件；
+    读到损坏的文件当作未命中处理。命中时更新文件的修改时间，
+    目录总大小超过 max_bytes 时按修改时间删除最久没有用过的文件。
+    """
+
+    def __init__(
+        self, directory: str | os.PathLike[str] = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self.directory: str = os.fspath(directory)
+        self.max_bytes: int = max_bytes
+        self.stats = CacheStats()
+
+    def key(self, source: str) -> str:
+        """
+        返回源代码的缓存键
+        """
+        digest = hashlib.sha256(f"{MAGIC.decode()}{CACHE_VERSION}\0".encode())
+        digest.update(source.encode("utf-8"))
+        return digest.hexdigest()
+
+    def path(self, source: str) -> str:
+        """
+        返回源代码的缓存文件路径
+        """
+        return os.path.join(self.directory, self.key(source) + CACHE_SUFFIX)
+
+    def get(self, source: str) -> CodeObject | None:
+        """
+        返回缓存的代码对象，未命中时返回 None
+        """
+        path: str = self.path(source)
+        try:
+            with open(path, "rb") as file:
+                code: CodeObject = loads_code(file.read())
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        except (OSError, RuntimeError):
+            self.stats.misses += 1
+            self.stats.errors += 1
+            self._remove(path)
+            return None
+        try:  # Only marks the entry as recently used for eviction, so a read-only cache still works.
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats.hits += 1
+        return code
+
+    def put(self, source: str, code: CodeObject) -> None:
+        """
+        把代码对象写入缓存，写入失败不会报错
+        """
+        data: bytes = dumps_code(code)
+        if len(data) > self.max_bytes:
+            return
+        temporary_path: str = ""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            descriptor, temporary_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary_path, self.path(source))
+        except OSError:
+            self.stats.errors += 1
+            if temporary_path:
+                self._remove(temporary_path)
+            return
+        self.stats.writes += 1
+        self.evict()
+
+    def compile(self, source: str) -> CodeObject:
+        """
+        返回源代码的代码对象，未命中时编译并写入缓存
+        """
+        code: CodeObject | None = self.get(source)
+        if code is None:
+            code = compile_source(source)
+            self.put(source, code)
+        return code
+
+    def evict(self, max_bytes: int | None = None) -> None:
+        """
+        删除最久没有用过的缓存文件，直到总大小不超过 max_bytes（默认是缓存的大小限制）
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        entries: list[tuple[float, int, str]] = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(CACHE_SUFFIX):
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:  # Evicted by another process.
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total: int = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            if self._remove(path):
+                self.stats.evictions += 1
+            total -= size
+
+    def clear(self) -> None:
+        """
+        删除所有缓存文件
+        """
+        self.evict(max_bytes=-1)
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        """
+        删除文件，返回是否删除了
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        return True
+
+
+if __name__ == "__main__":
+    cache = BytecodeCache()
+    for source_code in sys.argv[1:] or ["1 + 2 * 3"]:
+        print(cache.compile(source_code))
+    print(cache.stats)
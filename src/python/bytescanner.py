@@ -0,0 +1,94 @@
+"""
+字节扫描器
+"""
+import mmap
+import os
+import re
+from typing import Generator
+
+from .scanner import FIXED_TOKENS, TOKEN_PATTERN, WINDOW_SIZE, end_of_program, float_value
+from .tokenizer import Token, TokenType
+
+# 与 Scanner 相同的正则表达式和查找表，只是作用在字节上。
+BYTES_TOKEN_PATTERN: re.Pattern[bytes] = re.compile(TOKEN_PATTERN.pattern.encode("ascii"), re.DOTALL)
+FIXED_BYTES_TOKENS: dict[bytes, TokenType] = {text.encode("ascii"): type_ for text, type_ in FIXED_TOKENS.items()}
+DIGIT_BYTES: frozenset[int] = frozenset(b"0123456789")
+
+# memoryview 没有 find 方法，所以用正则表达式寻找窗口末尾的换行符。
+_NEWLINE_PATTERN: re.Pattern[bytes] = re.compile(b"\n")
+
+# 支持缓冲区协议、可以直接交给 re 扫描的对象。
+Buffer = bytes | bytearray | memoryview | mmap.mmap
+
+
+def scan_bytes(buffer: Buffer, pos: int, endpos: int, beginning_of_line: bool) -> Generator[Token, None, bool]:
+    """
+    扫描 buffer[pos:endpos] 中的标记，返回扫描结束时是否位于行首
+
+    与 scanner.scan 相同，只是直接作用在 ASCII 字节上，只有数字标记的字节片段会被复制。
+    """
+    fixed_tokens: dict[bytes, TokenType] = FIXED_BYTES_TOKENS
+    for text in BYTES_TOKEN_PATTERN.findall(buffer, pos, endpos):
+        if (token_type := fixed_tokens.get(text)) is not None:
+            beginning_of_line = False
+            yield Token(token_type)
+        elif text and text[0] in DIGIT_BYTES:
+            beginning_of_line = False
+            if b"." in text:
+                yield Token(TokenType.FLOAT, float_value(text.decode("ascii")))
+            else:
+                yield Token(TokenType.INT, int(text))
+        elif text == b"\n":
+            if not beginning_of_line:  # Blank lines produce no tokens.
+                beginning_of_line = True
+                yield Token(TokenType.NEWLINE)
+        elif len(text) > 1:  # Floats that start with '.'.
+            beginning_of_line = False
+            yield Token(TokenType.FLOAT, float_value(text.decode("ascii")))
+        elif text:  # The empty match marks the end of the window.
+            raise RuntimeError(f"Can't tokenize {text.decode('ascii', 'backslashreplace')!r}.")
+    return beginning_of_line
+
+
+class ByteScanner:
+    """
+    字节扫描器类
+
+    直接扫描 bytes、memoryview 或 mmap 中的 ASCII 源代码，既不解码成 str，也不复制整个缓冲区。
+    """
+
+    def __init__(self, buffer: Buffer) -> None:
+        self.buffer: Buffer = buffer
+
+    def __iter__(self) -> Generator[Token, None, None]:
+        buffer: Buffer = self.buffer
+        size: int = len(buffer)
+        beginning_of_line: bool = True
+        pos: int = 0
+        while pos < size:
+            newline: re.Match[bytes] | None = _NEWLINE_PATTERN.search(buffer, pos + WINDOW_SIZE)
+            endpos: int = newline.end() if newline is not None else size
+            beginning_of_line = yield from scan_bytes(buffer, pos, endpos, beginning_of_line)
+            pos = endpos
+        yield from end_of_program(beginning_of_line)
+
+
+def scan_file(path: str | os.PathLike[str]) -> Generator[Token, None, None]:
+    """
+    把源文件映射到内存中逐个产生标记，文件可以比内存大
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:  # Empty files can't be mapped.
+            yield from end_of_program(True)
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            yield from ByteScanner(mapped)
+
+
+if __name__ == "__main__":
+    CODE = b"1 + 2 ** 3.5 - .5\n\n(4 % 5) / 6"
+    print(CODE)
+    for tok in ByteScanner(CODE):
+        print(f"\t{tok.type}, {tok.value}")
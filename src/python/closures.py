@@ -0,0 +1,182 @@
+"""
+把语法树编译成嵌套闭包的执行后端
+"""
+from typing import Any, Callable, Sequence
+
+from .compiler import Bytecode
+from .interpreter import BINOPS_TO_OPERATOR, Interpreter
+from .parser import BinOp, ExprStatement, Float, Int, Program, TreeNode, UnaryOp
+from .stackcompiler import StackCompiler
+from .visitor import Dispatcher
+
+# 闭包每嵌套一层，求值时就多一层 Python 调用；更深的语句交给栈式虚拟机执行，避免 RecursionError。
+DEFAULT_MAX_DEPTH: int = 200
+
+# 值栈上的一项：(是否是常量, 常量或者闭包, 闭包的嵌套深度)。常量直接绑定到父节点的闭包里，不需要调用。
+Operand = tuple[bool, Any, int]
+
+
+def _binary(function: Callable[[Any, Any], Any], left: Operand, right: Operand) -> Callable[[], Any]:
+    """
+    返回二元运算的闭包，按操作数是否是常量选择不同的版本
+    """
+    left_value, right_value = left[1], right[1]
+    match left[0], right[0]:
+        case True, True:
+            return lambda: function(left_value, right_value)
+        case True, False:
+            return lambda: function(left_value, right_value())
+        case False, True:
+            return lambda: function(left_value(), right_value)
+    return lambda: function(left_value(), right_value())
+
+
+def _unknown_operator(op: str, operands: list[Operand]) -> Callable[[], Any]:
+    """
+    返回先求值操作数再报错的闭包，与 Interpreter 执行到这条指令时才报错一致
+    """
+    closures: list[Callable[[], Any]] = [value for is_constant, value, _ in operands if not is_constant]
+
+    def fail() -> Any:
+        for closure in closures:
+            closure()
+        raise RuntimeError(f"Unknown operator {op}.")
+
+    return fail
+
+
+class ClosureCompiler(Dispatcher):
+    """
+    闭包编译器类
+
+    每个 BinOp 和 UnaryOp 编译成一个闭包，运算函数在编译时就从 BINOPS_TO_OPERATOR 中查好，
+    常量操作数直接绑定在闭包里，求值就是普通的函数调用，没有逐条指令的分派，也没有栈操作。
+    编译用显式的工作栈后序遍历语法树，深层的语法树也不会递归。
+    嵌套深度超过 max_depth 的语句编译成字节码，由 Interpreter 执行。
+    """
+
+    dispatch_prefix = "compile_"
+    dispatch_keys = {node_class: node_class.__name__ for node_class in [ExprStatement, UnaryOp, BinOp, Int, Float]}
+
+    def __init__(self, tree: TreeNode, max_depth: int = DEFAULT_MAX_DEPTH) -> None:
+        self.tree: TreeNode = tree
+        self.max_depth: int = max_depth
+        self.operands: list[Operand] = []
+
+    def compile(self) -> list[Callable[[], Any]]:
+        """
+        返回每条语句的闭包，调用闭包得到语句的值
+        """
+        statements: Sequence[TreeNode] = [self.tree]
+        if isinstance(self.tree, Program):
+            statements = self.tree.statements
+        return [self.compile_statement(statement) for statement in statements]
+
+    def compile_statement(self, statement: TreeNode) -> Callable[[], Any]:
+        """
+        后序遍历一条语句，每个节点的处理方法从值栈上取出子节点的结果，再压入自己的结果
+        """
+        self.operands.clear()
+        stack: list[tuple[TreeNode, bool]] = [(statement, False)]
+        while stack:
+            node, visited = stack.pop()
+            handler: Callable[..., Any] | None = self.dispatch_table.get(node.__class__)
+            if handler is None:
+                raise RuntimeError(f"Can't compile {node.__class__.__name__}.")
+            if visited:
+                handler(self, node)
+                continue
+            stack.append((node, True))
+            match node:
+                case BinOp(_, left, right):
+                    stack.extend([(right, False), (left, False)])
+                case UnaryOp(_, value) | ExprStatement(value):
+                    stack.append((value, False))
+        is_constant, result, _ = self.operands.pop()
+        if is_constant:
+            return lambda: result
+        return result
+
+    def compile_ExprStatement(self, statement: ExprStatement) -> None:  # pylint: disable=C0103
+        """
+        编译表达式语句，太深的表达式交给 Interpreter
+        """
+        if self.operands[-1][2] > self.max_depth:
+            bytecode: list[Bytecode] = StackCompiler(statement).compile_to_list()
+            self.operands[-1] = (False, lambda: Interpreter(bytecode).run(), 1)
+
+    def compile_UnaryOp(self, tree: UnaryOp) -> None:  # pylint: disable=C0103
+        """
+        编译一元运算，正号不需要闭包，常量取负在编译时完成
+        """
+        operand: Operand = self.operands[-1]
+        is_constant, value, depth = operand
+        if tree.op == "+":
+            return
+        if tree.op != "-":
+            self.operands[-1] = (False, _unknown_operator(tree.op, [operand]), depth + 1)
+        elif is_constant:
+            self.operands[-1] = (True, -value, 0)
+        else:
+            self.operands[-1] = (False, lambda: -value(), depth + 1)
+
+    def compile_BinOp(self, tree: BinOp) -> None:  # pylint: disable=C0103
+        """
+        编译二元运算
+        """
+        right: Operand = self.operands.pop()
+        left: Operand = self.operands.pop()
+        depth: int = max(left[2], right[2]) + 1
+        function: Callable[[Any, Any], Any] | None = BINOPS_TO_OPERATOR.get(tree.op)
+        if function is None:
+            self.operands.append((False, _unknown_operator(tree.op, [left, right]), depth))
+        else:
+            self.operands.append((False, _binary(function, left, right), depth))
+
+    def compile_Int(self, tree: Int) -> None:  # pylint: disable=C0103
+        """
+        编译整数
+        """
+        self.operands.append((True, tree.value, 0))
+
+    def compile_Float(self, tree: Float) -> None:  # pylint: disable=C0103
+        """
+        编译浮点数
+        """
+        self.operands.append((True, tree.value, 0))
+
+
+class ClosureInterpreter:
+    """
+    闭包解释器类
+
+    与 Interpreter 的接口相同，可以按程序选择执行后端：
+    对同一个语法树，run 返回的值和抛出的异常都与 Interpreter 执行编译结果时相同。
+    """
+
+    def __init__(self, tree: TreeNode, max_depth: int = DEFAULT_MAX_DEPTH) -> None:
+        self.statements: list[Callable[[], Any]] = ClosureCompiler(tree, max_depth).compile()
+        self.last_value_popped: Any = None
+
+    def interpret(self) -> None:
+        """
+        执行程序并打印结果
+        """
+        self.run()
+        print("Done!")
+        print(self.last_value_popped)
+
+    def run(self) -> Any:
+        """
+        依次执行每条语句，返回最后一条语句的值
+        """
+        for statement in self.statements:
+            self.last_value_popped = statement()
+        return self.last_value_popped
+
+
+if __name__ == "__main__":
+    from .parser import Parser
+    from .tokenizer import Tokenizer
+
+    ClosureInterpreter(Parser(list(Tokenizer("1 + 2 * 3\n-(2 ** 10) / +4"))).parse()).interpret()
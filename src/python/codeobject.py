@@ -0,0 +1,259 @@
+"""
+数组形式的代码对象
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass, field
+from itertools import compress
+from typing import Any, Hashable, Iterable, Iterator, Protocol, Sequence
+
+from .arena import OPERATOR_CODES, OPERATORS
+from .compiler import Bytecode, BytecodeType
+
+# 操作码就是字节码类型在 OPCODES 中的下标。
+OPCODES: tuple[BytecodeType, ...] = tuple(BytecodeType)
+OPCODE_OF: dict[BytecodeType, int] = {bct: opcode for opcode, bct in enumerate(OPCODES)}
+
+# 这些指令的参数是运算符编码（arena.OPERATORS 中的下标），其它指令的参数是常量池中的下标。
+OPERATOR_OPCODES: frozenset[int] = frozenset({OPCODE_OF[BytecodeType.BINOP], OPCODE_OF[BytecodeType.UNARYOP]})
+
+ARG_TYPECODE: str = "I"
+ARG_ITEMSIZE: int = array(ARG_TYPECODE).itemsize
+
+# 每种指令从栈上弹出和压入的值的个数。
+STACK_EFFECTS: dict[BytecodeType, tuple[int, int]] = {
+    BytecodeType.BINOP: (2, 1),
+    BytecodeType.UNARYOP: (1, 1),
+    BytecodeType.PUSH: (0, 1),
+    BytecodeType.POP: (1, 0),
+    BytecodeType.BINOP_CONST: (1, 1),
+    BytecodeType.PUSH_PUSH_BINOP: (0, 1),
+}
+if missing_effects := set(BytecodeType) - set(STACK_EFFECTS):
+    raise RuntimeError(f"No stack effect for {', '.join(sorted(missing_effects))}.")
+
+UNARY_OPERATOR_CODES: frozenset[int] = frozenset({OPERATOR_CODES["+"], OPERATOR_CODES["-"]})
+
+# 超级指令的常量是 (运算符, 操作数...) 元组，这里是元组的长度。
+FUSED_OPERAND_LENGTHS: dict[int, int] = {
+    OPCODE_OF[BytecodeType.BINOP_CONST]: 2,
+    OPCODE_OF[BytecodeType.PUSH_PUSH_BINOP]: 3,
+}
+
+
+class Constants(Protocol):
+    """
+    常量池，只需要按下标取值和取长度，所以 BytecodeImage 可以用按需解码的字典代替元组
+    """
+
+    def __getitem__(self, index: int, /) -> Any:
+        ...
+
+    def __len__(self) -> int:
+        ...
+
+
+def constant_key(value: Any) -> Hashable:
+    """
+    返回常量在常量池中去重用的键
+
+    1 与 1.0、0.0 与 -0.0 相等，但不能共用一个常量，所以键里带上类型，浮点数用 float.hex 区分符号。
+    """
+    if isinstance(value, float) and not math.isnan(value):
+        return float, value.hex()
+    if isinstance(value, float):
+        return float, id(value)  # NaN is never equal to itself, so never share it.
+    if isinstance(value, tuple):  # Operands of superinstructions.
+        return tuple, tuple(map(constant_key, value))
+    return type(value), value
+
+
+@dataclass
+class CodeObject:
+    """
+    代码对象类
+
+    与 CPython 的 co_code 和 co_consts 类似：每条指令是 opcodes 中的一个字节和 args 中的一个无符号整数，
+    入栈的值（以及其它指令的操作数，包括 None）放在去重的常量元组 consts 中。
+    一条指令只占 5 个字节，而不是一个 Bytecode 对象。
+    """
+
+    opcodes: Sequence[int] = b""
+    args: Sequence[int] = field(default_factory=lambda: array(ARG_TYPECODE))
+    consts: Constants = ()
+
+    @classmethod
+    def from_bytecode(cls, bytecode: list[Bytecode]) -> CodeObject:
+        """
+        把 Bytecode 列表转换成代码对象
+        """
+        opcodes = bytearray()
+        args = array(ARG_TYPECODE)
+        consts: list[Any] = []
+        const_indices: dict[Hashable, int] = {}
+        for bc in bytecode:
+            if (opcode := OPCODE_OF.get(bc.type)) is None:
+                raise RuntimeError(f"Can't assemble {bc.type}.")
+            if opcode in OPERATOR_OPCODES:
+                if (arg := OPERATOR_CODES.get(bc.value)) is None:
+                    raise RuntimeError(f"Unknown operator {bc.value}.")
+            elif (arg := const_indices.get(key := constant_key(bc.value))) is None:
+                arg = const_indices[key] = len(consts)
+                consts.append(bc.value)
+            opcodes.append(opcode)
+            args.append(arg)
+        return cls(bytes(opcodes), args, tuple(consts))
+
+    def instruction(self, index: int) -> Bytecode:
+        """
+        返回第 index 条指令
+        """
+        return self.instruction_from(self.opcodes[index], self.args[index])
+
+    def instruction_from(self, opcode: int, arg: int) -> Bytecode:
+        """
+        返回操作码和参数对应的指令
+        """
+        value: Any = OPERATORS[arg] if opcode in OPERATOR_OPCODES else self.consts[arg]
+        return Bytecode(OPCODES[opcode], value)
+
+    def to_bytecode(self) -> list[Bytecode]:
+        """
+        把代码对象转换回 Bytecode 列表
+        """
+        return list(self)
+
+    def constant_values(self) -> tuple[Any, ...]:
+        """
+        按下标顺序返回所有常量
+        """
+        if isinstance(self.consts, tuple):
+            return self.consts
+        return tuple(map(self.consts.__getitem__, range(len(self.consts))))
+
+    def verify(self) -> None:
+        """
+        逐条检查指令，报告第一个出错的地方
+        """
+        _check_instructions(self)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        指令占用的字节数，不含常量
+        """
+        return len(self.opcodes) + len(self.args) * ARG_ITEMSIZE
+
+    def __iter__(self) -> Iterator[Bytecode]:
+        return map(self.instruction, range(len(self.opcodes)))
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} instructions, {len(self.consts)} constants)"
+
+
+def assemble(bytecode: list[Bytecode]) -> CodeObject:
+    """
+    把 Bytecode 列表转换成代码对象
+    """
+    return CodeObject.from_bytecode(bytecode)
+
+
+def stack_depth(code: CodeObject | list[Bytecode]) -> int:
+    """
+    检查代码对象，返回运行时栈的最大深度
+
+    每条指令的操作码和参数都必须有效，栈不能下溢，而且程序结束时栈必须是空的（每条语句都以 POP 结束）。
+    通过检查的程序运行时不需要再检查栈。
+    参数用 bytes.translate 和 itertools.compress 按操作码分组后一次检查完，发现问题时再逐条检查，找出出错的指令。
+    """
+    if not isinstance(code, CodeObject):
+        code = assemble(code)
+    args: Sequence[int] = code.args
+    if not code.opcodes:
+        return 0
+    if max(code.opcodes) >= len(OPCODES):
+        _check_instructions(code)
+    # BytecodeImage 的操作码是 uint32 的 memoryview，要先转成每个操作码一个字节。
+    opcodes: bytes = bytes(array("B", code.opcodes))
+    constant_opcodes: set[int] = set(range(len(OPCODES))) - OPERATOR_OPCODES
+    unary_opcodes: set[int] = {OPCODE_OF[BytecodeType.UNARYOP]}
+    if (
+        max(compress(args, opcodes.translate(_opcode_flags(constant_opcodes))), default=-1) >= len(code.consts)
+        or max(compress(args, opcodes.translate(_opcode_flags(OPERATOR_OPCODES))), default=-1) >= len(OPERATORS)
+        or not UNARY_OPERATOR_CODES.issuperset(compress(args, opcodes.translate(_opcode_flags(unary_opcodes))))
+    ):
+        _check_instructions(code)
+    for opcode, length in FUSED_OPERAND_LENGTHS.items():
+        for arg in set(compress(args, opcodes.translate(_opcode_flags({opcode})))):
+            if not _is_fused_operand(code.consts[arg], length):
+                _check_instructions(code)
+
+    pops_of: list[int] = [STACK_EFFECTS[bct][0] for bct in OPCODES]
+    deltas_of: list[int] = [STACK_EFFECTS[bct][1] - STACK_EFFECTS[bct][0] for bct in OPCODES]
+    depth: int = 0
+    max_depth: int = 0
+    for opcode in opcodes:
+        if depth < pops_of[opcode]:
+            _check_instructions(code)
+        depth += deltas_of[opcode]
+        if depth > max_depth:
+            max_depth = depth
+    if depth:
+        _check_instructions(code)
+    return max_depth
+
+
+def _opcode_flags(selected: Iterable[int]) -> bytes:
+    """
+    返回把操作码转换成 0/1 标志的 bytes.translate 转换表
+    """
+    return bytes(opcode in selected for opcode in range(256))
+
+
+def _is_fused_operand(value: Any, length: int) -> bool:
+    """
+    检查超级指令的常量是不是 (运算符, 操作数...) 元组
+    """
+    return isinstance(value, tuple) and len(value) == length and value[0] in OPERATOR_CODES
+
+
+def _check_instructions(code: CodeObject) -> None:
+    """
+    逐条检查指令，报告第一个出错的地方
+    """
+    unaryop_code: int = OPCODE_OF[BytecodeType.UNARYOP]
+    depth: int = 0
+    for index, (opcode, arg) in enumerate(zip(code.opcodes, code.args)):
+        if opcode >= len(OPCODES):
+            raise RuntimeError(f"Bad opcode {opcode} at instruction {index}.")
+        if (
+            arg >= (len(OPERATORS) if opcode in OPERATOR_OPCODES else len(code.consts))
+            or (opcode == unaryop_code and arg not in UNARY_OPERATOR_CODES)
+            or (
+                opcode in FUSED_OPERAND_LENGTHS
+                and not _is_fused_operand(code.consts[arg], FUSED_OPERAND_LENGTHS[opcode])
+            )
+        ):
+            raise RuntimeError(f"Bad argument {arg} for {OPCODES[opcode]} at instruction {index}.")
+        pops, pushes = STACK_EFFECTS[OPCODES[opcode]]
+        if depth < pops:
+            raise RuntimeError(f"Stack underflow at instruction {index}.")
+        depth += pushes - pops
+    if depth:
+        raise RuntimeError(f"Unbalanced stack, {depth} values left at the end of the program.")
+
+
+if __name__ == "__main__":
+    from .compiler import Compiler
+    from .parser import Parser
+    from .tokenizer import Tokenizer
+
+    code_object = assemble(list(Compiler(Parser(list(Tokenizer("1 + 2 * 1\n1.0 - 2 ** -0.0"))).parse()).compile()))
+    print(code_object, code_object.opcodes, code_object.args, code_object.consts)
+    for bc in code_object:
+        print(bc)
@@ -5,7 +5,9 @@ from dataclasses import dataclass
 from enum import StrEnum, auto
 from typing import Any, Generator
 
+from .arena import OPERATORS, AstArena, NodeKind
 from .parser import BinOp, ExprStatement, Float, Int, Program, TreeNode, UnaryOp
+from .visitor import Dispatcher
 
 
 class BytecodeType(StrEnum):
@@ -17,6 +19,9 @@ class BytecodeType(StrEnum):
     UNARYOP = auto()
     PUSH = auto()
     POP = auto()
+    # 超级指令，由 superinstructions.fuse_superinstructions 生成，Compiler 本身不会产生。
+    BINOP_CONST = auto()  # PUSH c; BINOP op，值是 (op, c)
+    PUSH_PUSH_BINOP = auto()  # PUSH a; PUSH b; BINOP op，值是 (op, a, b)
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}.{self.name}"
@@ -40,13 +45,21 @@ class Bytecode:
 # type BytecodeGenerator = Generator[Bytecode, None, None]
 
 
-class Compiler:
+class Compiler(Dispatcher):
     """
     编译器类
+
+    每种节点的编译方法在创建类时就查好，存放在以节点类为键的分派表中。
     """
 
-    def __init__(self, tree: TreeNode) -> None:
-        self.tree: TreeNode = tree
+    dispatch_prefix = "compile_"
+    dispatch_keys = {
+        node_class: node_class.__name__
+        for node_class in [Program, ExprStatement, UnaryOp, BinOp, Int, Float, AstArena]
+    }
+
+    def __init__(self, tree: TreeNode | AstArena) -> None:
+        self.tree: TreeNode | AstArena = tree
 
     def compile(self) -> Generator[Bytecode, None, None]:
         """
@@ -54,15 +67,14 @@ class Compiler:
         """
         yield from self._compile(self.tree)
 
-    def _compile(self, tree: TreeNode) -> Generator[Bytecode, None, None]:
+    def _compile(self, tree: TreeNode | AstArena) -> Generator[Bytecode, None, None]:
         """
         访问者模式编译方法
         """
-        node_name: str = tree.__class__.__name__
-        compile_method: Any | None = getattr(self, f"compile_{node_name}", None)
+        compile_method: Any | None = self.dispatch_table.get(tree.__class__)
         if compile_method is None:
-            raise RuntimeError(f"Can't compile {node_name}.")
-        yield from compile_method(tree)
+            raise RuntimeError(f"Can't compile {tree.__class__.__name__}.")
+        yield from compile_method(self, tree)
 
     def compile_Program(self, program: Program) -> Generator[Bytecode, None, None]:  # pylint: disable=C0103
         """
@@ -107,6 +119,21 @@ class Compiler:
         """
         yield Bytecode(BytecodeType.PUSH, tree.value)
 
+    def compile_AstArena(self, arena: AstArena) -> Generator[Bytecode, None, None]:  # pylint: disable=C0103
+        """
+        编译语法树存储区，节点按后序存放，顺序扫描一遍就是编译结果
+        """
+        for index, kind in enumerate(arena.kinds):
+            match kind:
+                case NodeKind.INT | NodeKind.FLOAT:
+                    yield Bytecode(BytecodeType.PUSH, arena.literals[arena.left[index]])
+                case NodeKind.BINOP:
+                    yield Bytecode(BytecodeType.BINOP, OPERATORS[arena.ops[index]])
+                case NodeKind.UNARYOP:
+                    yield Bytecode(BytecodeType.UNARYOP, OPERATORS[arena.ops[index]])
+                case NodeKind.EXPR_STATEMENT:
+                    yield Bytecode(BytecodeType.POP)
+
 
 if __name__ == "__main__":
     from python.parser import Parser
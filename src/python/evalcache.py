@@ -0,0 +1,211 @@
+"""
+内存中的多级求值缓存
+"""
+import sys
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from enum import StrEnum, auto
+from typing import Any, Iterable
+
+from .codeobject import CodeObject, assemble
+from .interpreter import Interpreter
+from .parser import BinOp, ExprStatement, Program, TreeNode, UnaryOp
+from .precedence import TokenStreamPrecedenceParser
+from .stackcompiler import StackCompiler
+from .tokenstream import TokenStream
+
+
+class CacheLevel(StrEnum):
+    """
+    缓存的级别，即缓存哪一个阶段的结果
+    """
+
+    TOKENS = auto()
+    AST = auto()
+    BYTECODE = auto()
+    RESULT = auto()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}.{self.name}"
+
+
+@dataclass
+class CacheMetrics:
+    """
+    缓存统计信息
+    """
+
+    hits: Counter[CacheLevel] = field(default_factory=Counter)
+    misses: Counter[CacheLevel] = field(default_factory=Counter)
+    evictions: int = 0
+    oversized: int = 0  # Values bigger than the whole byte budget, never stored.
+
+    def hit_rate(self, level: CacheLevel = CacheLevel.RESULT) -> float:
+        """
+        返回某一级的命中率
+        """
+        lookups: int = self.hits[level] + self.misses[level]
+        return self.hits[level] / lookups if lookups else 0.0
+
+
+# 未命中时返回的标记值，因为 None 也可能是结果（空程序）。
+MISSING: Any = object()
+
+
+def estimate_size(level: CacheLevel, value: Any) -> int:
+    """
+    估计一个缓存值占用的字节数
+    """
+    match level:
+        case CacheLevel.RESULT:
+            return sys.getsizeof(value)
+        case CacheLevel.BYTECODE:
+            return (
+                sys.getsizeof(value)
+                + value.nbytes
+                + sys.getsizeof(value.consts)
+                + sum(sys.getsizeof(const) for const in value.consts)
+            )
+        case CacheLevel.TOKENS:
+            return sys.getsizeof(value.code) + sum(
+                sys.getsizeof(array_) for array_ in (value.kinds, value.starts, value.ends)
+            )
+    size: int = 0
+    stack: list[TreeNode] = [value]
+    while stack:
+        node: TreeNode = stack.pop()
+        size += sys.getsizeof(node)
+        match node:
+            case Program(statements):
+                size += sys.getsizeof(statements)
+                stack.extend(statements)
+            case ExprStatement(child) | UnaryOp(_, child):
+                stack.append(child)
+            case BinOp(_, left, right):
+                stack.extend([left, right])
+            case _:
+                size += sys.getsizeof(node.value)  # type: ignore[attr-defined]
+    return size
+
+
+class EvaluationCache:
+    """
+    求值缓存类
+
+    以源代码为键，可以同时缓存几个级别：标记流、语法树、代码对象和最终结果。
+    求值时从最高的已启用级别开始查找，未命中就向下一级查找，算出的结果写回所有已启用的级别。
+    所有级别共用一个 LRU 顺序，条目数或者总字节数超过限制时淘汰最久没有用过的条目，
+    比总字节数限制还大的值（例如巨大的整数结果）不会被缓存。
+    缓存的语法树和代码对象是共享的，调用者不能修改它们。
+    """
+
+    def __init__(
+        self,
+        levels: Iterable[CacheLevel] = (CacheLevel.RESULT, CacheLevel.BYTECODE),
+        max_entries: int = 1024,
+        max_bytes: int = 32 << 20,
+    ) -> None:
+        self.levels: frozenset[CacheLevel] = frozenset(levels)
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.entries: OrderedDict[tuple[CacheLevel, str], tuple[Any, int]] = OrderedDict()
+        self.nbytes: int = 0
+        self.metrics = CacheMetrics()
+
+    def get(self, level: CacheLevel, source: str) -> Any:
+        """
+        返回缓存的值，未命中（或者这一级没有启用）时返回 MISSING
+        """
+        if level not in self.levels:
+            return MISSING
+        entry: tuple[Any, int] | None = self.entries.get((level, source))
+        if entry is None:
+            self.metrics.misses[level] += 1
+            return MISSING
+        self.entries.move_to_end((level, source))
+        self.metrics.hits[level] += 1
+        return entry[0]
+
+    def put(self, level: CacheLevel, source: str, value: Any) -> None:
+        """
+        缓存一个值，然后按条目数和字节数淘汰旧的条目
+        """
+        if level not in self.levels:
+            return
+        size: int = estimate_size(level, value) + sys.getsizeof(source)
+        if size > self.max_bytes:
+            self.metrics.oversized += 1
+            return
+        if (old := self.entries.pop((level, source), None)) is not None:
+            self.nbytes -= old[1]
+        self.entries[level, source] = (value, size)
+        self.nbytes += size
+        while len(self.entries) > self.max_entries or self.nbytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.nbytes -= evicted_size
+            self.metrics.evictions += 1
+
+    def tokens(self, source: str) -> TokenStream:
+        """
+        返回源代码的标记流
+        """
+        if (tokens := self.get(CacheLevel.TOKENS, source)) is MISSING:
+            tokens = TokenStream(source)
+            self.put(CacheLevel.TOKENS, source, tokens)
+        return tokens
+
+    def ast(self, source: str) -> TreeNode:
+        """
+        返回源代码的语法树
+        """
+        if (tree := self.get(CacheLevel.AST, source)) is MISSING:
+            tree = TokenStreamPrecedenceParser(self.tokens(source)).parse()
+            self.put(CacheLevel.AST, source, tree)
+        return tree
+
+    def bytecode(self, source: str) -> CodeObject:
+        """
+        返回源代码的代码对象
+        """
+        if (code := self.get(CacheLevel.BYTECODE, source)) is MISSING:
+            code = assemble(StackCompiler(self.ast(source)).compile_to_list())
+            self.put(CacheLevel.BYTECODE, source, code)
+        return code
+
+    def evaluate(self, source: str) -> Any:
+        """
+        返回源代码最后一条语句的值，运行时出错的结果不会被缓存
+        """
+        if (result := self.get(CacheLevel.RESULT, source)) is MISSING:
+            result = Interpreter(self.bytecode(source)).run()
+            self.put(CacheLevel.RESULT, source, result)
+        return result
+
+    def clear(self) -> None:
+        """
+        清空缓存，保留统计信息
+        """
+        self.entries.clear()
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} entries, {self.nbytes} bytes)"
+
+
+DEFAULT_CACHE: EvaluationCache = EvaluationCache()
+
+
+def evaluate(source: str, cache: EvaluationCache | None = None) -> Any:
+    """
+    求值源代码，透明地使用缓存（默认是模块级的 DEFAULT_CACHE）
+    """
+    return (cache if cache is not None else DEFAULT_CACHE).evaluate(source)
+
+
+if __name__ == "__main__":
+    for expression in ["1 + 2 * 3", "2 ** 100", "1 + 2 * 3", "2 ** 100000 % 7", "2 ** 100"]:
+        print(f"{expression} = {evaluate(expression)}")
+    print(DEFAULT_CACHE, DEFAULT_CACHE.metrics, f"hit rate {DEFAULT_CACHE.metrics.hit_rate():.0%}")
@@ -0,0 +1,82 @@
+"""
+预分配栈的快速解释器
+"""
+from typing import Any
+
+from .arena import OPERATOR_CODES
+from .codeobject import FUSED_OPERAND_LENGTHS, OPCODE_OF, CodeObject, assemble, stack_depth
+from .compiler import Bytecode, BytecodeType
+from .interpreter import BINARY_FUNCTIONS, BINOPS_TO_OPERATOR, Interpreter
+
+
+class FastInterpreter(Interpreter):
+    """
+    快速解释器类
+
+    加载程序时就用 stack_depth 检查整个程序并算出栈的最大深度，格式不对的字节码在运行之前就被拒绝。
+    运行时使用预先分配好的定长列表和栈顶下标，不再调用 push/pop，也不再处理栈下溢。
+    """
+
+    def __init__(self, bytecode: list[Bytecode] | CodeObject) -> None:
+        code: CodeObject = bytecode if isinstance(bytecode, CodeObject) else assemble(bytecode)
+        super().__init__(code)
+        self.code: CodeObject = code
+        self.max_depth: int = stack_depth(code)
+        # 超级指令的常量在加载时就把运算符换成函数，运行时不再查字典。
+        operands: list[Any] = list(code.constant_values())
+        for opcode, arg in zip(code.opcodes, code.args):
+            if opcode in FUSED_OPERAND_LENGTHS:
+                operands[arg] = (BINOPS_TO_OPERATOR[code.consts[arg][0]], *code.consts[arg][1:])
+        self.operands: tuple[Any, ...] = tuple(operands)
+
+    def run(self) -> Any:
+        """
+        执行代码对象，返回最后一条语句的值
+        """
+        stack: list[Any] = [None] * self.max_depth
+        top: int = -1  # Index of the value on top of the stack.
+        consts = self.operands
+        binary_functions = BINARY_FUNCTIONS
+        push_code, pop_code = OPCODE_OF[BytecodeType.PUSH], OPCODE_OF[BytecodeType.POP]
+        binop_code: int = OPCODE_OF[BytecodeType.BINOP]
+        binop_const_code: int = OPCODE_OF[BytecodeType.BINOP_CONST]
+        push_push_binop_code: int = OPCODE_OF[BytecodeType.PUSH_PUSH_BINOP]
+        negate_code: int = OPERATOR_CODES["-"]
+        last_value_popped: Any = self.last_value_popped
+        try:
+            for opcode, arg in zip(self.code.opcodes, self.code.args):
+                if opcode == push_code:
+                    top += 1
+                    stack[top] = consts[arg]
+                elif opcode == binop_code:
+                    top -= 1
+                    stack[top] = binary_functions[arg](stack[top], stack[top + 1])
+                elif opcode == binop_const_code:
+                    function, right = consts[arg]
+                    stack[top] = function(stack[top], right)
+                elif opcode == pop_code:
+                    last_value_popped = stack[top]
+                    top -= 1
+                elif opcode == push_push_binop_code:
+                    function, left, right = consts[arg]
+                    top += 1
+                    stack[top] = function(left, right)
+                # stack_depth accepted the program, so every other opcode is UNARYOP with '+' or '-' as its
+                # argument, and unary '+' does nothing.
+                elif arg == negate_code:
+                    stack[top] = -stack[top]
+        finally:
+            self.last_value_popped = last_value_popped
+            self.stack.stack[:] = stack[: top + 1]
+        return last_value_popped
+
+
+if __name__ == "__main__":
+    from .parser import Parser
+    from .stackcompiler import StackCompiler
+    from .tokenizer import Tokenizer
+
+    program = StackCompiler(Parser(list(Tokenizer("1 + 2 * 3\n-(2 ** 10) / +4"))).parse()).compile_to_list()
+    interpreter = FastInterpreter(program)
+    print(f"max stack depth {interpreter.max_depth}")
+    interpreter.interpret()
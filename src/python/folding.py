@@ -0,0 +1,150 @@
+"""
+常量折叠
+"""
+from dataclasses import dataclass
+from typing import TypeVar
+
+from .interpreter import BINOPS_TO_OPERATOR
+from .parser import BinOp, Expr, ExprStatement, Float, Int, Program, Statement, TreeNode, UnaryOp
+
+NodeT = TypeVar("NodeT", bound=TreeNode)
+
+
+@dataclass
+class FoldingLimits:
+    """
+    常量折叠的限制
+    """
+
+    # 结果可能超过这么多位的整数运算不折叠，留到运行时计算。
+    max_int_bits: int = 4096
+
+
+class ConstantFolder:
+    """
+    常量折叠类
+
+    在解析之后、编译之前，把只由字面量组成的子树计算成一个 Int 或 Float 节点。
+    结果可能过大的整数运算，以及会抛出异常的运算（例如除以零）保持原样，
+    所以运行时的结果和异常都不会改变。没有变化的子树原样返回，不会修改输入的语法树。
+    """
+
+    def __init__(self, limits: FoldingLimits | None = None) -> None:
+        self.limits: FoldingLimits = limits if limits is not None else FoldingLimits()
+        self.folded: int = 0  # Number of operations folded so far.
+
+    def fold(self, tree: TreeNode) -> TreeNode:
+        """
+        返回折叠后的语法树，使用显式栈做后序遍历
+        """
+        results: list[TreeNode] = []
+        stack: list[tuple[TreeNode, bool]] = [(tree, False)]
+        while stack:
+            node, children_done = stack.pop()
+            match node, children_done:
+                case Int() | Float(), _:
+                    results.append(node)
+                case Program(statements), False:
+                    stack.append((node, True))
+                    stack.extend((statement, False) for statement in reversed(statements))
+                case ExprStatement(expr) | UnaryOp(_, expr), False:
+                    stack.extend([(node, True), (expr, False)])
+                case BinOp(_, left, right), False:
+                    stack.extend([(node, True), (right, False), (left, False)])
+                case Program(statements), True:
+                    first: int = len(results) - len(statements)
+                    folded_statements: list[Statement] = [_expect(new, Statement) for new in results[first:]]
+                    del results[first:]
+                    if any(new is not old for new, old in zip(folded_statements, statements)):
+                        node = Program(folded_statements)
+                    results.append(node)
+                case ExprStatement(expr), True:
+                    if (value := _expect(results.pop(), Expr)) is not expr:
+                        node = ExprStatement(value)
+                    results.append(node)
+                case UnaryOp(op) as unary_op, True:
+                    results.append(self.fold_unary_op(unary_op, op, _expect(results.pop(), Expr)))
+                case BinOp(op) as bin_op, True:
+                    folded_right: Expr = _expect(results.pop(), Expr)
+                    results.append(self.fold_bin_op(bin_op, op, _expect(results.pop(), Expr), folded_right))
+                case _:
+                    raise RuntimeError(f"Can't fold a node of type {node.__class__.__name__}.")
+        return results[0]
+
+    def fold_unary_op(self, node: UnaryOp, op: str, value: Expr) -> Expr:
+        """
+        折叠一元运算，value 是已经折叠过的操作数
+        """
+        if isinstance(value, (Int, Float)) and op in {"+", "-"}:
+            self.folded += 1
+            if op == "+":
+                return value
+            return Int(-value.value) if isinstance(value, Int) else Float(-value.value)
+        return node if value is node.value else UnaryOp(op, value)
+
+    def fold_bin_op(self, node: BinOp, op: str, left: Expr, right: Expr) -> Expr:
+        """
+        折叠二元运算，left 和 right 是已经折叠过的操作数
+        """
+        if isinstance(left, (Int, Float)) and isinstance(right, (Int, Float)) and op in BINOPS_TO_OPERATOR:
+            if self.is_small_enough(op, left.value, right.value):
+                try:
+                    result = BINOPS_TO_OPERATOR[op](left.value, right.value)
+                except (ArithmeticError, ValueError):  # Leave it to raise at runtime.
+                    result = None
+                if type(result) is int:  # pylint: disable=C0123  # Complex results are not folded.
+                    self.folded += 1
+                    return Int(result)
+                if type(result) is float:  # pylint: disable=C0123
+                    self.folded += 1
+                    return Float(result)
+        if left is node.left and right is node.right:
+            return node
+        return BinOp(op, left, right)
+
+    def is_small_enough(self, op: str, left: int | float, right: int | float) -> bool:
+        """
+        在计算之前估计整数运算结果的位数，检查它是否在限制之内
+        """
+        if not (isinstance(left, int) and isinstance(right, int)):
+            return True  # Floats can't grow, overflows raise and are left unfolded.
+        max_bits: int = self.limits.max_int_bits
+        left_bits, right_bits = left.bit_length(), right.bit_length()
+        match op:
+            case "**":
+                if right < 0 or abs(left) <= 1:
+                    return True
+                return right <= max_bits and left_bits * right <= max_bits
+            case "*":
+                return left_bits + right_bits <= max_bits
+            case "+" | "-":
+                return max(left_bits, right_bits) + 1 <= max_bits
+        return True  # `%` and `/` never grow.
+
+
+def _expect(node: TreeNode, node_type: type[NodeT]) -> NodeT:
+    """
+    检查折叠结果的类型
+    """
+    if not isinstance(node, node_type):
+        raise RuntimeError(f"Expected {node_type.__name__}, got {node.__class__.__name__}.")
+    return node
+
+
+def fold_constants(tree: TreeNode, limits: FoldingLimits | None = None) -> TreeNode:
+    """
+    对语法树做常量折叠
+    """
+    return ConstantFolder(limits).fold(tree)
+
+
+if __name__ == "__main__":
+    from .parser import Parser, print_ast
+    from .tokenizer import Tokenizer
+
+    CODE = """1 % -2
+5 ** -3 / 5
+1 * 2 + 2 ** 3
+1 / (3 - 3) + 2 * 3
+2 ** 100000"""
+    print_ast(fold_constants(Parser(list(Tokenizer(CODE))).parse()))
@@ -0,0 +1,157 @@
+"""
+哈希共享的语法树
+"""
+import math
+from typing import Hashable
+
+from .parser import BinOp, Expr, Float, Int, TreeNode, UnaryOp
+from .precedence import PrecedenceParser
+from .tokenizer import Token, TokenType
+
+
+class NodeInterner:
+    """
+    节点驻留表类
+
+    结构相同的表达式节点只保留一个实例，语法树因此变成共享子树的有向无环图。
+    子节点已经驻留，所以节点的键只需要子节点的 id，判断两棵子树是否相同只需比较 `is`。
+    共享的节点不能再被修改。
+    """
+
+    def __init__(self) -> None:
+        self.nodes: dict[Hashable, Expr] = {}
+        self.hashes: dict[int, int] = {}  # Structural hash of each interned node, by id.
+        self.requests: int = 0  # How many nodes were asked for, shared or not.
+
+    def _intern(self, key: Hashable, node: Expr, structural_hash: int) -> Expr:
+        """
+        登记一个新节点
+        """
+        self.nodes[key] = node
+        self.hashes[id(node)] = structural_hash
+        return node
+
+    def int_node(self, value: int) -> Expr:
+        """
+        返回值为 value 的整数节点
+        """
+        self.requests += 1
+        key: Hashable = (Int, value)
+        if (node := self.nodes.get(key)) is None:
+            node = self._intern(key, Int(value), hash(key))
+        return node
+
+    def float_node(self, value: float) -> Expr:
+        """
+        返回值为 value 的浮点数节点，0.0 与 -0.0 是不同的节点
+        """
+        self.requests += 1
+        key: Hashable = (Float, value, math.copysign(1.0, value))
+        if (node := self.nodes.get(key)) is None:
+            node = self._intern(key, Float(value), hash(key))
+        return node
+
+    def unary_op_node(self, op: str, value: Expr) -> Expr:
+        """
+        返回一元运算节点，value 必须已经驻留
+        """
+        self.requests += 1
+        key: Hashable = (UnaryOp, op, id(value))
+        if (node := self.nodes.get(key)) is None:
+            node = self._intern(key, UnaryOp(op, value), hash((UnaryOp, op, self.hashes[id(value)])))
+        return node
+
+    def bin_op_node(self, op: str, left: Expr, right: Expr) -> Expr:
+        """
+        返回二元运算节点，left 和 right 必须已经驻留
+        """
+        self.requests += 1
+        key: Hashable = (BinOp, op, id(left), id(right))
+        if (node := self.nodes.get(key)) is None:
+            structural_hash: int = hash((BinOp, op, self.hashes[id(left)], self.hashes[id(right)]))
+            node = self._intern(key, BinOp(op, left, right), structural_hash)
+        return node
+
+    def intern(self, tree: Expr) -> Expr:
+        """
+        返回与 tree 结构相同的驻留节点，使用显式栈做后序遍历
+        """
+        results: list[Expr] = []
+        stack: list[tuple[TreeNode, bool]] = [(tree, False)]
+        while stack:
+            node, children_done = stack.pop()
+            match node, children_done:
+                case Int(value), _:
+                    results.append(self.int_node(value))
+                case Float(value), _:
+                    results.append(self.float_node(value))
+                case UnaryOp(_, value), False:
+                    stack.extend([(node, True), (value, False)])
+                case BinOp(_, left, right), False:
+                    stack.extend([(node, True), (right, False), (left, False)])
+                case UnaryOp(op), True:
+                    results.append(self.unary_op_node(op, results.pop()))
+                case BinOp(op), True:
+                    right_node: Expr = results.pop()
+                    results.append(self.bin_op_node(op, results.pop(), right_node))
+                case _:
+                    raise RuntimeError(f"Can't intern a node of type {node.__class__.__name__}.")
+        return results[0]
+
+    def structural_hash(self, node: Expr) -> int:
+        """
+        返回驻留节点的结构哈希值，不需要遍历子树
+        """
+        return self.hashes[id(node)]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} nodes for {self.requests} requests)"
+
+
+class HashConsingParser(PrecedenceParser):
+    """
+    哈希共享解析器类
+
+    与 PrecedenceParser 相同，但结构相同的表达式节点共用一个实例，
+    多个解析器可以共用同一个驻留表。
+    """
+
+    def __init__(self, tokens: list[Token], interner: NodeInterner | None = None) -> None:
+        super().__init__(tokens)
+        self.interner: NodeInterner = interner if interner is not None else NodeInterner()
+
+    def make_unary_op(self, op: str, value: Expr) -> Expr:
+        """
+        创建一元运算节点，相同的节点共用一个对象
+        """
+        return self.interner.unary_op_node(op, value)
+
+    def make_bin_op(self, op: str, left: Expr, right: Expr) -> Expr:
+        """
+        创建二元运算节点，相同的节点共用一个对象
+        """
+        return self.interner.bin_op_node(op, left, right)
+
+    def parse_number(self) -> Expr:  # type: ignore[override]
+        """
+        Parses an integer or a float, sharing nodes with the same value.
+        """
+        if self.peek() == TokenType.INT:
+            return self.interner.int_node(self.eat(TokenType.INT).value)
+        return self.interner.float_node(self.eat(TokenType.FLOAT).value)
+
+
+if __name__ == "__main__":
+    from .parser import ExprStatement
+    from .tokenizer import Tokenizer
+
+    CODE = "(1 + 2) * (1 + 2)\n-(1 + 2) ** 2\n(1 + 2) * (1 + 2)"
+    parser = HashConsingParser(list(Tokenizer(CODE)))
+    program = parser.parse()
+    print(parser.interner)
+    match program.statements:
+        case [ExprStatement(BinOp(_, first)), ExprStatement(UnaryOp(_, BinOp(_, second))), *_]:
+            print(first is second)
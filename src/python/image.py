@@ -0,0 +1,265 @@
+"""
+可以直接从 mmap 执行的字节码映像
+"""
+from __future__ import annotations
+
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any
+
+from .arena import OPERATOR_CODES, OPERATORS
+from .codeobject import FUSED_OPERAND_LENGTHS, OPCODES, OPERATOR_OPCODES, CodeObject, assemble
+from .compiler import Bytecode
+
+MAGIC: bytes = b"BPCI"
+VERSION: int = 1
+
+# 文件头：魔数、格式版本、指令数、常量数、常量数据段的字节数，全部小端。
+HEADER: struct.Struct = struct.Struct("<4sHxxqqq")
+# 每条指令是两个 32 位无符号整数：操作码和参数。
+INSTRUCTION_SIZE: int = 8
+# 常量表的每一项：常量类型、数据长度、数据在常量数据段中的偏移。
+CONSTANT_ENTRY: struct.Struct = struct.Struct("<BxxxIq")
+FLOAT: struct.Struct = struct.Struct("<d")
+
+CONST_NONE, CONST_INT, CONST_FLOAT, CONST_TUPLE = range(4)
+
+
+def _encode_constant(value: Any) -> tuple[int, bytes]:
+    """
+    返回常量的类型和数据
+    """
+    if value is None:
+        return CONST_NONE, b""
+    if type(value) is int:  # pylint: disable=C0123
+        return CONST_INT, value.to_bytes(value.bit_length() // 8 + 1, "little", signed=True)
+    if type(value) is float:  # pylint: disable=C0123
+        return CONST_FLOAT, FLOAT.pack(value)
+    if type(value) is tuple:  # pylint: disable=C0123  # Operands of superinstructions.
+        return CONST_TUPLE, marshal.dumps(value)
+    raise RuntimeError(f"Can't store a constant of type {value.__class__.__name__} in an image.")
+
+
+def _is_fused_operand(value: Any) -> bool:
+    """
+    检查从映像读出的元组是不是超级指令的常量：(运算符, 整数或浮点数...)
+    """
+    return (
+        isinstance(value, tuple)
+        and len(value) in FUSED_OPERAND_LENGTHS.values()
+        and isinstance(value[0], str)
+        and value[0] in OPERATOR_CODES
+        and all(type(operand) in (int, float) for operand in value[1:])
+    )
+
+
+def dumps_image(code: CodeObject | list[Bytecode]) -> bytes:
+    """
+    把代码对象（或者 Compiler 输出的字节码列表）写成映像
+    """
+    if not isinstance(code, CodeObject):
+        code = assemble(code)
+    words = array("I", [0]) * (2 * len(code))
+    words[0::2] = array("I", list(code.opcodes))
+    words[1::2] = array("I", code.args)
+    if sys.byteorder == "big":
+        words.byteswap()
+    table: list[bytes] = []
+    data: list[bytes] = []
+    offset: int = 0
+    for value in code.constant_values():
+        kind, encoded = _encode_constant(value)
+        table.append(CONSTANT_ENTRY.pack(kind, len(encoded), offset))
+        data.append(encoded)
+        offset += len(encoded)
+    header: bytes = HEADER.pack(MAGIC, VERSION, len(code), len(code.consts), offset)
+    return b"".join([header, words.tobytes(), *table, *data])
+
+
+def write_image(code: CodeObject | list[Bytecode], path: str | os.PathLike[str]) -> None:
+    """
+    把映像写入文件
+    """
+    with open(path, "wb") as file:
+        file.write(dumps_image(code))
+
+
+class ImageConstants(dict):
+    """
+    映像的常量表
+
+    常量第一次被用到时才从常量数据段解码，之后就是普通的字典查找，所以打开映像时不需要解码任何常量。
+    """
+
+    def __init__(self, table: memoryview, data: memoryview, count: int) -> None:
+        super().__init__()
+        self.table: memoryview = table
+        self.data: memoryview = data
+        self.count: int = count
+
+    def __missing__(self, index: int) -> Any:
+        if not 0 <= index < self.count:
+            raise RuntimeError(f"Corrupted image: bad constant index {index}.")
+        kind, length, offset = CONSTANT_ENTRY.unpack_from(self.table, index * CONSTANT_ENTRY.size)
+        if offset < 0 or offset + length > len(self.data):
+            raise RuntimeError(f"Corrupted image: bad constant {index}.")
+        encoded: memoryview = self.data[offset : offset + length]
+        if kind == CONST_NONE and length == 0:
+            value: Any = None
+        elif kind == CONST_INT and length > 0:
+            value = int.from_bytes(encoded, "little", signed=True)
+        elif kind == CONST_FLOAT and length == FLOAT.size:
+            value = FLOAT.unpack(encoded)[0]
+        elif kind == CONST_TUPLE:
+            try:
+                value = marshal.loads(encoded)
+            except (EOFError, ValueError, TypeError) as error:
+                raise RuntimeError(f"Corrupted image: bad constant {index}.") from error
+            if not _is_fused_operand(value):
+                raise RuntimeError(f"Corrupted image: bad constant {index}.")
+        else:
+            raise RuntimeError(f"Corrupted image: bad constant {index}.")
+        self[index] = value
+        return value
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class BytecodeImage(CodeObject):
+    """
+    字节码映像类
+
+    映像由文件头、定长指令段、常量表和常量数据段组成。
+    opcodes 和 args 是指令段上的 memoryview，不复制数据，所以打开映像的开销与程序大小无关；
+    多个进程映射同一个文件时共用页缓存中的同一份内存。
+    它是一个 CodeObject，所以 Interpreter 可以直接执行它。
+    """
+
+    def __init__(self, buffer: bytes | bytearray | memoryview | mmap.mmap) -> None:  # pylint: disable=W0231
+        self._buffer = buffer
+        self._views: list[memoryview] = []
+        try:
+            self._load(self._view(memoryview(buffer)))
+        except RuntimeError:
+            self._release()
+            raise
+
+    def _load(self, view: memoryview) -> None:
+        """
+        检查文件头，在指令段和常量段上建立内存视图
+        """
+        if len(view) < HEADER.size:
+            raise RuntimeError("Truncated image.")
+        magic, version, count, const_count, data_size = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise RuntimeError(f"Not a bytecode image, found magic number {bytes(magic)!r}.")
+        if version != VERSION:
+            raise RuntimeError(f"Unsupported image format version {version}, expected {VERSION}.")
+        table_start: int = HEADER.size + count * INSTRUCTION_SIZE
+        data_start: int = table_start + const_count * CONSTANT_ENTRY.size
+        if min(count, const_count, data_size) < 0 or len(view) != data_start + data_size:
+            raise RuntimeError("Image has the wrong size.")
+
+        instructions: memoryview = self._view(view[HEADER.size : table_start])
+        if sys.byteorder == "little":
+            words: memoryview | array = self._view(instructions.cast("I"))
+        else:  # The image is little-endian, so big-endian machines need a swapped copy.
+            words = array("I", instructions.tobytes())
+            words.byteswap()
+        self.opcodes = self._view(words[0::2]) if isinstance(words, memoryview) else words[0::2]
+        self.args = self._view(words[1::2]) if isinstance(words, memoryview) else words[1::2]
+        self.consts = ImageConstants(
+            self._view(view[table_start:data_start]), self._view(view[data_start:]), const_count
+        )
+
+    def _view(self, view: memoryview) -> memoryview:
+        """
+        记下一个 memoryview，关闭映像时释放
+        """
+        self._views.append(view)
+        return view
+
+    def verify(self) -> None:
+        """
+        检查每条指令的操作码和参数，需要遍历整个指令段
+        """
+        for opcode, arg in zip(self.opcodes, self.args):
+            if opcode >= len(OPCODES):
+                raise RuntimeError(f"Corrupted image: bad opcode {opcode}.")
+            if arg >= (len(OPERATORS) if opcode in OPERATOR_OPCODES else len(self.consts)):
+                raise RuntimeError(f"Corrupted image: bad argument {arg} for opcode {opcode}.")
+
+    @property
+    def nbytes(self) -> int:
+        return len(self) * INSTRUCTION_SIZE
+
+    def instruction_from(self, opcode: int, arg: int) -> Bytecode:
+        if opcode >= len(OPCODES):
+            raise RuntimeError(f"Corrupted image: bad opcode {opcode}.")
+        return super().instruction_from(opcode, arg)
+
+    def close(self) -> None:
+        """
+        释放映像的内存视图，并关闭映射的文件
+        """
+        self._release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def _release(self) -> None:
+        """
+        释放所有的内存视图，之后才能关闭映射的文件
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+
+    def __enter__(self) -> BytecodeImage:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CodeObject):
+            return NotImplemented
+        return len(self) == len(other) and self.to_bytecode() == other.to_bytecode()
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+def load_image(path: str | os.PathLike[str]) -> BytecodeImage:
+    """
+    用 mmap 打开映像文件，用完后需要调用 close（或者使用 with 语句）
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:  # Empty files can't be mapped.
+            raise RuntimeError("Truncated image.")
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return BytecodeImage(mapped)
+    except RuntimeError:
+        mapped.close()
+        raise
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    from .interpreter import Interpreter
+    from .parser import Parser
+    from .stackcompiler import StackCompiler
+    from .tokenizer import Tokenizer
+
+    with tempfile.TemporaryDirectory() as directory:
+        image_path: str = os.path.join(directory, "program.bpci")
+        tree = Parser(list(Tokenizer("1 + 2 * 3\n2 ** 100 - 0.5"))).parse()
+        write_image(StackCompiler(tree).compile_to_list(), image_path)
+        with load_image(image_path) as image:
+            print(image)
+            Interpreter(image).interpret()
@@ -4,7 +4,10 @@
 import operator
 from typing import Any
 
-from .compiler import Bytecode
+from .arena import OPERATORS
+from .codeobject import OPCODE_OF, CodeObject, Constants
+from .compiler import Bytecode, BytecodeType
+from .visitor import Dispatcher
 
 BINOPS_TO_OPERATOR = {
     "**": operator.pow,
@@ -15,6 +18,9 @@ BINOPS_TO_OPERATOR = {
     "-": operator.sub,
 }
 
+# 以运算符编码为下标的二元运算函数，供执行代码对象时使用。
+BINARY_FUNCTIONS: tuple = tuple(BINOPS_TO_OPERATOR[op] for op in OPERATORS)
+
 
 class Stack:
     """
@@ -46,14 +52,19 @@ class Stack:
         return f"Stack({self.stack})"
 
 
-class Interpreter:
+class Interpreter(Dispatcher):
     """
     解释器
+
+    每种字节码的解释方法在创建类时就查好，存放在以字节码类型为键的分派表中。
     """
 
-    def __init__(self, bytecode: list[Bytecode]) -> None:
+    dispatch_prefix = "interpret_"
+    dispatch_keys = {bct: bct.value for bct in BytecodeType}
+
+    def __init__(self, bytecode: list[Bytecode] | CodeObject) -> None:
         self.stack = Stack()
-        self.bytecode: list[Bytecode] = bytecode
+        self.bytecode: list[Bytecode] | CodeObject = bytecode
         self.ptr: int = 0
         self.last_value_popped: Any = None
 
@@ -61,17 +72,67 @@ class Interpreter:
         """
         解释字节码列表
         """
-        for bc in self.bytecode:
-            bc_name: str = bc.type.value
-            interpret_method = getattr(self, f"interpret_{bc_name}", None)
-            if interpret_method is None:
-                raise RuntimeError(f"Can't interpret {bc_name}.")
-            interpret_method(bc)
-
+        self.run()
         print("Done!")
         # print(self.stack)
         print(self.last_value_popped)
 
+    def run(self) -> Any:
+        """
+        解释字节码列表，不打印任何内容，返回最后弹出的值
+        """
+        if isinstance(self.bytecode, CodeObject):
+            self.interpret_code(self.bytecode)
+        else:
+            dispatch_table = self.dispatch_table
+            for bc in self.bytecode:
+                interpret_method = dispatch_table.get(bc.type)
+                if interpret_method is None:
+                    raise RuntimeError(f"Can't interpret {bc.type}.")
+                interpret_method(self, bc)
+        return self.last_value_popped
+
+    def interpret_code(self, code: CodeObject) -> None:
+        """
+        直接执行代码对象，常见的指令在循环中内联处理，其它指令交给对应的解释方法
+
+        参数出错时由代码对象的 verify 报告出错的指令。
+        """
+        stack: list = self.stack.stack
+        push, pop = stack.append, stack.pop
+        consts: Constants = code.consts
+        push_code, pop_code = OPCODE_OF[BytecodeType.PUSH], OPCODE_OF[BytecodeType.POP]
+        binop_code, unaryop_code = OPCODE_OF[BytecodeType.BINOP], OPCODE_OF[BytecodeType.UNARYOP]
+        binop_const_code: int = OPCODE_OF[BytecodeType.BINOP_CONST]
+        push_push_binop_code: int = OPCODE_OF[BytecodeType.PUSH_PUSH_BINOP]
+        negate_code: int = OPERATORS.index("-")
+        binops = BINOPS_TO_OPERATOR
+        try:
+            for opcode, arg in zip(code.opcodes, code.args):
+                if opcode == push_code:
+                    push(consts[arg])
+                elif opcode == binop_code:
+                    right = pop()
+                    stack[-1] = BINARY_FUNCTIONS[arg](stack[-1], right)
+                elif opcode == binop_const_code:
+                    op, right = consts[arg]
+                    stack[-1] = binops[op](stack[-1], right)
+                elif opcode == pop_code:
+                    self.last_value_popped = pop()
+                elif opcode == push_push_binop_code:
+                    op, left, right = consts[arg]
+                    push(binops[op](left, right))
+                elif opcode == unaryop_code and arg == negate_code:
+                    stack[-1] = -stack[-1]
+                else:
+                    bc: Bytecode = code.instruction_from(opcode, arg)
+                    self.dispatch_table[bc.type](self, bc)
+        except IndexError:  # A bad argument in an unchecked code object, such as a corrupted image.
+            code.verify()
+            raise
+        except KeyError as error:  # Every bytecode type is in the dispatch table, so this is a fused operator.
+            raise RuntimeError(f"Unknown operator {error.args[0]}.") from None
+
     def interpret_push(self, bc: Bytecode) -> None:
         """
         解释入栈
@@ -97,6 +158,27 @@ class Interpreter:
             raise RuntimeError(f"Unknown operator {bc.value}.")
         self.stack.push(result)
 
+    def interpret_binop_const(self, bc: Bytecode) -> None:
+        """
+        解释右操作数是常量的二元运算
+        """
+        op_name, right = bc.value
+        left: int = self.stack.pop()
+        op = BINOPS_TO_OPERATOR.get(op_name, None)
+        if op is None:
+            raise RuntimeError(f"Unknown operator {op_name}.")
+        self.stack.push(op(left, right))
+
+    def interpret_push_push_binop(self, bc: Bytecode) -> None:
+        """
+        解释两个操作数都是常量的二元运算
+        """
+        op_name, left, right = bc.value
+        op = BINOPS_TO_OPERATOR.get(op_name, None)
+        if op is None:
+            raise RuntimeError(f"Unknown operator {op_name}.")
+        self.stack.push(op(left, right))
+
     def interpret_unaryop(self, bc: Bytecode) -> None:
         """
         解释一元运算
@@ -112,14 +194,13 @@ class Interpreter:
 
 
 if __name__ == "__main__":
+    import os
     import sys
 
-    from python.compiler import Compiler
-    from python.parser import BinOp, Parser
-    from python.tokenizer import Tokenizer
+    from python.bytecache import DEFAULT_CACHE_DIR, BytecodeCache, compile_source
 
+    # 相同的源代码再次运行时直接使用缓存的代码对象，跳过分词、解析和编译。
+    # 环境变量 BPCI_CACHE_DIR 指定缓存目录，设为空字符串时不使用缓存。
     code: str = sys.argv[1]
-    tokens = list(Tokenizer(code))
-    tree: BinOp = Parser(tokens).parse()
-    byte_code = list(Compiler(tree).compile())
-    Interpreter(byte_code).interpret()
+    cache_dir: str = os.environ.get("BPCI_CACHE_DIR", DEFAULT_CACHE_DIR)
+    Interpreter(BytecodeCache(cache_dir).compile(code) if cache_dir else compile_source(code)).interpret()
@@ -0,0 +1,96 @@
+"""
+并行前端
+"""
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+from .compiler import Bytecode
+from .precedence import PrecedenceParser
+from .scanner import Scanner
+from .stackcompiler import StackCompiler
+
+# 每个任务处理的源代码字节数，任务总是在换行符之后结束。
+CHUNK_SIZE: int = 1 << 22
+
+
+def split_source(data: str | bytes | mmap.mmap, chunk_size: int = CHUNK_SIZE) -> list[tuple[int, int]]:
+    """
+    把源代码切分成若干 (start, end) 区间，每个区间都在换行符之后结束
+
+    语句之间以换行符分隔，并且换行符之后分词器总是位于行首，所以各个区间可以独立编译。
+    """
+    newline: str | bytes = "\n" if isinstance(data, str) else b"\n"
+    ranges: list[tuple[int, int]] = []
+    start: int = 0
+    while start < len(data):
+        end: int = data.find(newline, start + chunk_size) + 1 or len(data)  # type: ignore[arg-type]
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def compile_code(code: str) -> list[Bytecode]:
+    """
+    分词、解析并编译一段源代码
+    """
+    return StackCompiler(PrecedenceParser(list(Scanner(code))).parse()).compile_to_list()
+
+
+def _compile_file_range(path: str, start: int, end: int) -> list[Bytecode]:
+    """
+    在工作进程中编译文件的一个区间
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        return compile_code(file.read(end - start).decode("utf-8"))
+
+
+def _stitch(results: Iterable[list[Bytecode]]) -> list[Bytecode]:
+    """
+    按原来的语句顺序拼接各个区间的字节码
+    """
+    bytecode: list[Bytecode] = []
+    for chunk_bytecode in results:
+        bytecode.extend(chunk_bytecode)
+    return bytecode
+
+
+def compile_file(
+    path: str | os.PathLike[str], workers: int | None = None, chunk_size: int = CHUNK_SIZE
+) -> list[Bytecode]:
+    """
+    在进程池中并行编译一个源文件，结果与顺序编译整个文件相同
+
+    各个工作进程自己读取分到的区间，主进程只负责切分和拼接。
+    """
+    path = os.fspath(path)
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:  # Empty files can't be mapped.
+            return []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            ranges: list[tuple[int, int]] = split_source(mapped, chunk_size)
+    if workers == 1 or len(ranges) <= 1:
+        return _stitch(_compile_file_range(path, start, end) for start, end in ranges)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        starts, ends = zip(*ranges)
+        return _stitch(executor.map(_compile_file_range, [path] * len(ranges), starts, ends))
+
+
+def compile_source(code: str, workers: int | None = None, chunk_size: int = CHUNK_SIZE) -> list[Bytecode]:
+    """
+    在进程池中并行编译一段源代码，结果与顺序编译相同
+    """
+    chunks: list[str] = [code[start:end] for start, end in split_source(code, chunk_size)]
+    if workers == 1 or len(chunks) <= 1:
+        return _stitch(map(compile_code, chunks))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return _stitch(executor.map(compile_code, chunks))
+
+
+if __name__ == "__main__":
+    import sys
+
+    for bc in compile_file(sys.argv[1]):
+        print(bc)
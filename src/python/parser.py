@@ -3,9 +3,16 @@
 """
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, TextIO
 
 from .tokenizer import Token, TokenType
+from .tokenstream import TokenStream
+from .visitor import Dispatcher
+
+if TYPE_CHECKING:
+    from .arena import AstArena
 
 
 @dataclass
@@ -92,39 +99,143 @@ class Float(Expr):
     value: float
 
 
-def print_ast(tree: TreeNode, depth: int = 0) -> None:
+# dump_ast 攒够这么多字符后才写入文本流一次。
+DUMP_BUFFER_SIZE: int = 1 << 16
+
+# (节点名, 运算符, 字面量的值, 子节点)
+NodeDescription = tuple[str, str | None, Any, list[Any]]
+
+
+class NodeDescriber(Dispatcher):
+    """
+    节点描述类，为 dump_ast 返回节点名、运算符、字面量的值和子节点
+    """
+
+    dispatch_prefix = "describe_"
+    dispatch_keys = {
+        node_class: node_class.__name__ for node_class in [Program, ExprStatement, UnaryOp, BinOp, Int, Float]
+    }
+
+    def describe(self, tree: TreeNode) -> NodeDescription:
+        """
+        返回 dump_ast 打印节点所需的信息
+        """
+        describe_method: Callable[..., NodeDescription] | None = self.dispatch_table.get(tree.__class__)
+        if describe_method is None:
+            raise RuntimeError(f"Can't print a node of type {tree.__class__.__name__}")
+        return describe_method(self, tree)
+
+    def describe_Program(self, tree: Program) -> NodeDescription:  # pylint: disable=C0103
+        """
+        描述程序
+        """
+        return "Program", None, None, tree.statements
+
+    def describe_ExprStatement(self, tree: ExprStatement) -> NodeDescription:  # pylint: disable=C0103
+        """
+        描述表达式语句
+        """
+        return "ExprStatement", None, None, [tree.expr]
+
+    def describe_UnaryOp(self, tree: UnaryOp) -> NodeDescription:  # pylint: disable=C0103
+        """
+        描述一元运算符
+        """
+        return "UnaryOp", tree.op, None, [tree.value]
+
+    def describe_BinOp(self, tree: BinOp) -> NodeDescription:  # pylint: disable=C0103
+        """
+        描述二元运算符
+        """
+        return "BinOp", tree.op, None, [tree.left, tree.right]
+
+    def describe_Int(self, tree: Int) -> NodeDescription:  # pylint: disable=C0103
+        """
+        描述整数
+        """
+        return "Int", None, tree.value, []
+
+    def describe_Float(self, tree: Float) -> NodeDescription:  # pylint: disable=C0103
+        """
+        描述浮点数
+        """
+        return "Float", None, tree.value, []
+
+
+NODE_DESCRIBER: NodeDescriber = NodeDescriber()
+
+
+def describe_node(tree: TreeNode) -> NodeDescription:
+    """
+    返回 dump_ast 打印节点所需的信息
+    """
+    return NODE_DESCRIBER.describe(tree)
+
+
+def dump_ast(
+    tree: TreeNode | AstArena, file: TextIO | None = None, compact: bool = False, depth: int = 0
+) -> None:
+    """
+    把抽象语法树写入文本流（默认是标准输出）
+
+    用显式栈遍历语法树，输出先攒在缓冲区中再成块写入，不会拼出整个字符串。
+    compact 为真时把整棵树写成一行。
+    """
+    if file is None:
+        file = sys.stdout
+    if isinstance(tree, TreeNode):
+        describe: Callable[[Any], NodeDescription] = NODE_DESCRIBER.describe
+        root: Any = tree
+    else:  # The arena describes its nodes by index.
+        describe, root = tree.describe, tree.root
+
+    buffer: list[str] = []
+    buffered: int = 0
+    # Pending work, popped from the end: text to write, or a (node, depth) to expand.
+    stack: list[str | tuple[Any, int]] = ["\n" if depth == 0 else "", (root, depth)]
+    while stack:
+        item: str | tuple[Any, int] = stack.pop()
+        if isinstance(item, str):
+            buffer.append(item)
+            buffered += len(item)
+            if buffered >= DUMP_BUFFER_SIZE:
+                file.write("".join(buffer))
+                buffer.clear()
+                buffered = 0
+            continue
+
+        node, level = item
+        node_name, op, value, children = describe(node)
+        pieces: list[str | tuple[Any, int]]
+        if not children and node_name != "Program":  # Literals.
+            pieces = [f"{'' if compact else '    ' * level}{node_name}({value!r})"]
+        elif compact:
+            pieces = [node_name + ("([" if node_name == "Program" else "(") + (f"{op!r}, " if op is not None else "")]
+            for index, child in enumerate(children):
+                pieces.extend([", "] * bool(index) + [(child, level)])
+            pieces.append("])" if node_name == "Program" else ")")
+        elif node_name == "Program":
+            indent: str = "    " * level
+            pieces = [f"{indent}{node_name}([\n"]
+            for child in children:
+                pieces.extend([(child, level + 1), ",\n"])
+            pieces.append(f",\n{indent}])")
+        else:
+            indent = "    " * level
+            pieces = [f"{indent}{node_name}(\n" + (f"{indent}    {op!r},\n" if op is not None else "")]
+            for index, child in enumerate(children):
+                pieces.extend([",\n"] * bool(index) + [(child, level + 1)])
+            pieces.append(f",\n{indent})")
+        stack.extend(reversed(pieces))
+
+    file.write("".join(buffer))
+
+
+def print_ast(tree: TreeNode | AstArena, depth: int = 0) -> None:
     """
     打印抽象语法树
     """
-    indent: str = "    " * depth
-    node_name: str = tree.__class__.__name__
-    match tree:  # 结构模式匹配从 Python 3.10 引入
-        case Program(statements):
-            print(f"{indent}{node_name}([\n", end="")
-            for statement in statements:
-                print_ast(statement, depth + 1)
-                print(",")
-            print(f",\n{indent}])", end="")
-        case ExprStatement(expr):
-            print(f"{indent}{node_name}(\n", end="")
-            print_ast(expr, depth + 1)
-            print(f",\n{indent})", end="")
-        case UnaryOp(op, value):
-            print(f"{indent}{node_name}(\n{indent}    {op!r},")
-            print_ast(value, depth + 1)
-            print(f",\n{indent})", end="")
-        case BinOp(op, left, right):
-            print(f"{indent}{node_name}(\n{indent}    {op!r},")
-            print_ast(left, depth + 1)
-            print(",")
-            print_ast(right, depth + 1)
-            print(f",\n{indent})", end="")
-        case Int(value) | Float(value):
-            print(f"{indent}{node_name}({value!r})", end="")
-        case _:
-            raise RuntimeError(f"Can't print a node of type {node_name}")
-    if depth == 0:
-        print()
+    dump_ast(tree, depth=depth)
 
 
 class Parser:
@@ -144,8 +255,8 @@ class Parser:
     number := INT | FLOAT
     """
 
-    def __init__(self, tokens: list[Token]) -> None:
-        self.tokens: list[Token] = tokens
+    def __init__(self, tokens: list[Token] | TokenStream) -> None:
+        self.tokens: list[Token] | TokenStream = tokens
         self.next_token_index: int = 0  # Points to the next token to be consumed.
 
     def eat(self, expected_token_type: TokenType) -> Token:
@@ -281,6 +392,34 @@ class Parser:
         return program
 
 
+class TokenStreamParser(Parser):
+    """
+    紧凑标记流的解析器类
+
+    eat 和 peek 只比较标记流中的类型编码，只在吃掉 INT 和 FLOAT 时解析值，不为每个标记创建 Token。
+    Parser 也能解析 TokenStream，只是要逐个创建 Token。
+    与其它解析器组合时放在前面，例如 class TokenStreamPrecedenceParser(TokenStreamParser, PrecedenceParser)。
+    """
+
+    def __init__(self, tokens: TokenStream) -> None:
+        super().__init__(tokens)
+        self.stream: TokenStream = tokens
+
+    def eat(self, expected_token_type: TokenType) -> Token:
+        """
+        eat for a TokenStream, which compares kind codes and parses literal values only.
+        """
+        next_token: Token = self.stream.eat(self.next_token_index, expected_token_type)
+        self.next_token_index += 1
+        return next_token
+
+    def peek(self, skip: int = 0) -> TokenType | None:
+        """
+        peek for a TokenStream, which looks at the kind code only.
+        """
+        return self.stream.peek(self.next_token_index + skip)
+
+
 if __name__ == "__main__":
     from .tokenizer import Tokenizer
 
@@ -0,0 +1,129 @@
+"""
+窥孔优化
+"""
+from collections import Counter
+from typing import Callable, NamedTuple
+
+from .compiler import Bytecode, BytecodeType
+
+
+class PeepholeRule(NamedTuple):
+    """
+    窥孔规则
+
+    rewrite 接收最后 width 条指令，不匹配时返回 None，匹配时返回替换的指令。
+    替换的指令必须比原来少，这样反复改写总会停下来。
+    """
+
+    name: str
+    width: int
+    rewrite: Callable[[list[Bytecode]], list[Bytecode] | None]
+
+
+def _drop_unary_plus(window: list[Bytecode]) -> list[Bytecode] | None:
+    """
+    UNARYOP '+' 不做任何事情
+    """
+    match window:
+        case [Bytecode(BytecodeType.UNARYOP, "+")]:
+            return []
+    return None
+
+
+def _negate_constant(window: list[Bytecode]) -> list[Bytecode] | None:
+    """
+    PUSH c; UNARYOP '-' 改写成 PUSH -c
+    """
+    match window:
+        case [Bytecode(BytecodeType.PUSH, int() | float() as value), Bytecode(BytecodeType.UNARYOP, "-")]:
+            return [Bytecode(BytecodeType.PUSH, -value)]
+    return None
+
+
+def _drop_double_negation(window: list[Bytecode]) -> list[Bytecode] | None:
+    """
+    两次取负互相抵消
+    """
+    match window:
+        case [Bytecode(BytecodeType.UNARYOP, "-"), Bytecode(BytecodeType.UNARYOP, "-")]:
+            return []
+    return None
+
+
+RULES: tuple[PeepholeRule, ...] = (
+    PeepholeRule("unary_plus", 1, _drop_unary_plus),
+    PeepholeRule("negate_constant", 2, _negate_constant),
+    PeepholeRule("double_negation", 2, _drop_double_negation),
+)
+
+
+class PeepholeOptimizer:
+    """
+    窥孔优化器类
+
+    指令逐条进入输出列表，每进入一条就用规则反复改写输出列表的末尾，
+    所以改写产生的新模式也会被继续改写。整个列表重复处理直到不再变化。
+    removed 记录每条规则删掉的指令数。
+    """
+
+    def __init__(self, rules: tuple[PeepholeRule, ...] = RULES) -> None:
+        self.rules: tuple[PeepholeRule, ...] = rules
+        self.removed: Counter[str] = Counter()
+
+    def optimize(self, bytecode: list[Bytecode]) -> list[Bytecode]:
+        """
+        返回优化后的字节码列表，不修改输入的列表和指令
+        """
+        while True:
+            optimized: list[Bytecode] = self.optimize_once(bytecode)
+            if len(optimized) == len(bytecode):
+                return optimized
+            bytecode = optimized
+
+    def optimize_once(self, bytecode: list[Bytecode]) -> list[Bytecode]:
+        """
+        从头到尾处理一遍字节码列表
+        """
+        output: list[Bytecode] = []
+        for bc in bytecode:
+            output.append(bc)
+            while self._rewrite_tail(output):
+                pass
+        return output
+
+    def _rewrite_tail(self, output: list[Bytecode]) -> bool:
+        """
+        用第一条匹配的规则改写输出列表的末尾，返回是否改写了
+        """
+        for rule in self.rules:
+            if len(output) < rule.width:
+                continue
+            replacement: list[Bytecode] | None = rule.rewrite(output[-rule.width :])
+            if replacement is None:
+                continue
+            if len(replacement) >= rule.width:
+                raise RuntimeError(f"Peephole rule {rule.name} doesn't shrink the bytecode.")
+            del output[-rule.width :]
+            output.extend(replacement)
+            self.removed[rule.name] += rule.width - len(replacement)
+            return True
+        return False
+
+
+def optimize_bytecode(bytecode: list[Bytecode]) -> list[Bytecode]:
+    """
+    用默认规则做窥孔优化
+    """
+    return PeepholeOptimizer().optimize(bytecode)
+
+
+if __name__ == "__main__":
+    from .compiler import Compiler
+    from .parser import Parser
+    from .tokenizer import Tokenizer
+
+    CODE = "--3 + +2\n-(1 + 2) - - - -4\n1 - +-+-5.5"
+    optimizer = PeepholeOptimizer()
+    for bc in optimizer.optimize(list(Compiler(Parser(list(Tokenizer(CODE))).parse()).compile())):
+        print(bc)
+    print(dict(optimizer.removed))
@@ -0,0 +1,130 @@
+"""
+迭代式优先级解析器
+"""
+from typing import NamedTuple
+
+from .parser import BinOp, Expr, Parser, TokenStreamParser, UnaryOp
+from .tokenizer import TokenType
+
+
+class Operator(NamedTuple):
+    """
+    运算符优先级表的表项
+    """
+
+    op: str
+    precedence: int
+    right_associative: bool = False
+    prefix: bool = False
+
+
+# 运算符优先级表，与 Parser 的文法等价：
+# computation(+ -) < term(* / %) < unary(前缀 + -) < exponentiation(**，右结合)
+INFIX_OPERATORS: dict[TokenType, Operator] = {
+    TokenType.PLUS: Operator("+", 1),
+    TokenType.MINUS: Operator("-", 1),
+    TokenType.MUL: Operator("*", 2),
+    TokenType.DIV: Operator("/", 2),
+    TokenType.MOD: Operator("%", 2),
+    TokenType.EXP: Operator("**", 4, right_associative=True),
+}
+PREFIX_OPERATORS: dict[TokenType, Operator] = {
+    TokenType.PLUS: Operator("+", 3, prefix=True),
+    TokenType.MINUS: Operator("-", 3, prefix=True),
+}
+# 左括号在运算符栈中的标记，优先级最低，归约时不会越过它。
+PAREN: Operator = Operator("(", 0)
+
+
+class PrecedenceParser(Parser):
+    """
+    迭代式优先级解析器类
+
+    用运算符优先级表和显式的操作数栈、运算符栈解析表达式，不做递归，
+    嵌套深度只受内存限制。产生的语法树和报错与 Parser 相同。
+    """
+
+    def make_unary_op(self, op: str, value: Expr) -> Expr:
+        """
+        Builds an unary operation node, subclasses may share identical nodes.
+        """
+        return UnaryOp(op, value)
+
+    def make_bin_op(self, op: str, left: Expr, right: Expr) -> Expr:
+        """
+        Builds a binary operation node, subclasses may share identical nodes.
+        """
+        return BinOp(op, left, right)
+
+    def parse_computation(self) -> Expr:
+        """
+        Parses a computation with an explicit stack instead of recursion.
+        """
+        operands: list[Expr] = []
+        operators: list[Operator] = []
+        open_parens: int = 0
+        make_unary_op, make_bin_op = self.make_unary_op, self.make_bin_op
+
+        def reduce() -> None:
+            """Pops one operator and combines its operands."""
+            operator: Operator = operators.pop()
+            if operator.prefix:
+                operands.append(make_unary_op(operator.op, operands.pop()))
+            else:
+                right: Expr = operands.pop()
+                operands.append(make_bin_op(operator.op, operands.pop(), right))
+
+        while True:
+            # Prefix operators and opening parentheses come before an operand.
+            while True:
+                next_token_type: TokenType | None = self.peek()
+                if next_token_type in PREFIX_OPERATORS:
+                    operators.append(PREFIX_OPERATORS[next_token_type])
+                elif next_token_type == TokenType.LPAREN:
+                    operators.append(PAREN)
+                    open_parens += 1
+                else:
+                    break
+                self.eat(next_token_type)
+            operands.append(self.parse_number())
+
+            # Closing parentheses finish the innermost parenthesised computation.
+            while open_parens and (next_token_type := self.peek()) == TokenType.RPAREN:
+                self.eat(TokenType.RPAREN)
+                while operators[-1] is not PAREN:
+                    reduce()
+                operators.pop()
+                open_parens -= 1
+
+            if (next_token_type := self.peek()) not in INFIX_OPERATORS:
+                break
+            infix: Operator = INFIX_OPERATORS[next_token_type]
+            while operators and (
+                operators[-1].precedence > infix.precedence
+                or (operators[-1].precedence == infix.precedence and not infix.right_associative)
+            ):
+                reduce()
+            operators.append(infix)
+            self.eat(next_token_type)
+
+        if open_parens:
+            self.eat(TokenType.RPAREN)  # Raises the same error as the recursive parser.
+        while operators:
+            reduce()
+        return operands[0]
+
+
+class TokenStreamPrecedenceParser(TokenStreamParser, PrecedenceParser):
+    """
+    紧凑标记流的迭代式优先级解析器类
+    """
+
+
+if __name__ == "__main__":
+    from .parser import print_ast
+    from .tokenizer import Tokenizer
+
+    CODE = """1 % -2
+5 ** -3 / 5
+1 * 2 + 2 ** 3"""
+    print_ast(PrecedenceParser(list(Tokenizer(CODE))).parse())
@@ -0,0 +1,253 @@
+"""
+寄存器虚拟机
+"""
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Iterator
+
+from .arena import OPERATOR_CODES, OPERATORS
+from .codeobject import ARG_TYPECODE, STACK_EFFECTS, constant_key
+from .compiler import Bytecode, BytecodeType
+from .interpreter import BINARY_FUNCTIONS
+from .visitor import Dispatcher
+
+# 寄存器指令的操作码：dest = left op right、dest = -left、dest = left。
+BINOP, NEG, MOVE = range(3)
+
+# 0 号寄存器保存最后弹出的值，之后是与栈上的位置一一对应的临时寄存器，最后是常量。
+LAST_REGISTER: int = 0
+# 转换过程中常量的编号带上这个标志，与临时寄存器区分。
+CONSTANT_FLAG: int = 1 << 31
+
+
+@dataclass
+class RegisterCode:
+    """
+    寄存器代码类
+
+    每条指令是 opcodes 和 ops 中的一个字节（操作码和运算符编码），以及 dests、lefts、rights 中的寄存器编号。
+    常量也放在寄存器里，registers 是寄存器的初始值，所以操作数不需要区分寄存器和常量。
+    """
+
+    opcodes: bytes = b""
+    ops: bytes = b""
+    dests: array[int] = field(default_factory=lambda: array(ARG_TYPECODE))
+    lefts: array[int] = field(default_factory=lambda: array(ARG_TYPECODE))
+    rights: array[int] = field(default_factory=lambda: array(ARG_TYPECODE))
+    registers: list[Any] = field(default_factory=lambda: [None])
+
+    def instruction(self, index: int) -> str:
+        """
+        返回第 index 条指令的文本形式
+        """
+        opcode, dest, left = self.opcodes[index], self.dests[index], self.lefts[index]
+        if opcode == BINOP:
+            return f"r{dest} = r{left} {OPERATORS[self.ops[index]]} r{self.rights[index]}"
+        return f"r{dest} = {'-' if opcode == NEG else ''}r{left}"
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self.instruction, range(len(self)))
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} instructions, {len(self.registers)} registers)"
+
+
+class RegisterTranslator(Dispatcher):
+    """
+    寄存器代码转换器类
+
+    像 Interpreter 一样逐条执行 Compiler 输出的字节码，但栈上放的是寄存器编号：
+    PUSH 和一元正号不生成指令，二元运算把结果写入它在栈上的位置对应的临时寄存器，
+    POP 把上一条指令的目标改成 0 号寄存器，不需要单独的指令。指令的顺序与字节码相同，所以异常也相同。
+    """
+
+    dispatch_prefix = "translate_"
+    dispatch_keys = {bct: bct.value for bct in BytecodeType}
+
+    def __init__(self, bytecode: list[Bytecode]) -> None:
+        self.bytecode: list[Bytecode] = bytecode
+        self.stack: list[int] = []
+        self.max_depth: int = 0
+        self.constants: list[Any] = []
+        self.constant_indices: dict[Hashable, int] = {}
+        self.opcodes = bytearray()
+        self.ops = bytearray()
+        self.dests = array(ARG_TYPECODE)
+        self.lefts = array(ARG_TYPECODE)
+        self.rights = array(ARG_TYPECODE)
+
+    def translate(self) -> RegisterCode:
+        """
+        返回寄存器代码
+        """
+        for index, bc in enumerate(self.bytecode):
+            handler: Callable[..., Any] | None = self.dispatch_table.get(bc.type)
+            if handler is None:
+                raise RuntimeError(f"Can't translate {bc.type}.")
+            if len(self.stack) < STACK_EFFECTS[bc.type][0]:
+                raise RuntimeError(f"Stack underflow at instruction {index}.")
+            handler(self, bc)
+        # Constants come after the temporaries, so their registers are only known now.
+        first_constant: int = 1 + self.max_depth
+        for operands in (self.lefts, self.rights):
+            for index, register in enumerate(operands):
+                if register & CONSTANT_FLAG:
+                    operands[index] = first_constant + (register ^ CONSTANT_FLAG)
+        registers: list[Any] = [None] * first_constant + self.constants
+        return RegisterCode(bytes(self.opcodes), bytes(self.ops), self.dests, self.lefts, self.rights, registers)
+
+    def translate_push(self, bc: Bytecode) -> None:
+        """
+        转换入栈，只记下常量所在的寄存器
+        """
+        self.stack.append(self._constant(bc.value))
+
+    def translate_pop(self, bc: Bytecode) -> None:  # pylint: disable=W0613
+        """
+        转换弹出，结果直接写入 0 号寄存器
+        """
+        source: int = self.stack.pop()
+        if self.dests and self.dests[-1] == source == self._temporary(len(self.stack)):
+            self.dests[-1] = LAST_REGISTER
+        else:
+            self._emit(MOVE, 0, LAST_REGISTER, source, 0)
+
+    def translate_binop(self, bc: Bytecode) -> None:
+        """
+        转换二元运算
+        """
+        right: int = self.stack.pop()
+        self._binary(bc.value, self.stack.pop(), right)
+
+    def translate_binop_const(self, bc: Bytecode) -> None:
+        """
+        转换右操作数是常量的二元运算
+        """
+        op, right = bc.value
+        self._binary(op, self.stack.pop(), self._constant(right))
+
+    def translate_push_push_binop(self, bc: Bytecode) -> None:
+        """
+        转换两个操作数都是常量的二元运算
+        """
+        op, left, right = bc.value
+        self._binary(op, self._constant(left), self._constant(right))
+
+    def translate_unaryop(self, bc: Bytecode) -> None:
+        """
+        转换一元运算，正号不生成指令
+        """
+        if bc.value == "+":
+            return
+        if bc.value != "-":
+            raise RuntimeError(f"Unknown operator {bc.value}.")
+        source: int = self.stack.pop()
+        self._emit(NEG, 0, self._push_temporary(), source, 0)
+
+    def _binary(self, op: str, left: int, right: int) -> None:
+        """
+        生成二元运算指令
+        """
+        if (code := OPERATOR_CODES.get(op)) is None:
+            raise RuntimeError(f"Unknown operator {op}.")
+        self._emit(BINOP, code, self._push_temporary(), left, right)
+
+    def _emit(self, opcode: int, op: int, dest: int, left: int, right: int) -> None:
+        """
+        生成一条指令
+        """
+        self.opcodes.append(opcode)
+        self.ops.append(op)
+        self.dests.append(dest)
+        self.lefts.append(left)
+        self.rights.append(right)
+
+    def _push_temporary(self) -> int:
+        """
+        把栈顶位置对应的临时寄存器压入栈，返回它的编号
+        """
+        register: int = self._temporary(len(self.stack))
+        self.stack.append(register)
+        self.max_depth = max(self.max_depth, len(self.stack))
+        return register
+
+    @staticmethod
+    def _temporary(position: int) -> int:
+        """
+        返回栈上某个位置对应的临时寄存器
+        """
+        return 1 + position
+
+    def _constant(self, value: Any) -> int:
+        """
+        返回常量的临时编号，转换结束后再换成寄存器编号
+        """
+        if (index := self.constant_indices.get(key := constant_key(value))) is None:
+            index = self.constant_indices[key] = len(self.constants)
+            self.constants.append(value)
+        return index | CONSTANT_FLAG
+
+
+def translate(bytecode: list[Bytecode]) -> RegisterCode:
+    """
+    把 Compiler 输出的字节码列表转换成寄存器代码
+    """
+    return RegisterTranslator(bytecode).translate()
+
+
+class RegisterInterpreter:
+    """
+    寄存器解释器类
+
+    与 Interpreter 的接口相同。每条运算指令直接读写寄存器，没有入栈和出栈。
+    """
+
+    def __init__(self, code: list[Bytecode] | RegisterCode) -> None:
+        self.code: RegisterCode = code if isinstance(code, RegisterCode) else translate(code)
+        self.last_value_popped: Any = None
+
+    def interpret(self) -> None:
+        """
+        执行程序并打印结果
+        """
+        self.run()
+        print("Done!")
+        print(self.last_value_popped)
+
+    def run(self) -> Any:
+        """
+        执行寄存器代码，返回最后一条语句的值
+        """
+        code: RegisterCode = self.code
+        registers: list[Any] = code.registers.copy()
+        registers[LAST_REGISTER] = self.last_value_popped
+        functions = BINARY_FUNCTIONS
+        try:
+            for opcode, op, dest, left, right in zip(code.opcodes, code.ops, code.dests, code.lefts, code.rights):
+                if opcode == BINOP:
+                    registers[dest] = functions[op](registers[left], registers[right])
+                elif opcode == NEG:
+                    registers[dest] = -registers[left]
+                else:
+                    registers[dest] = registers[left]
+        finally:
+            self.last_value_popped = registers[LAST_REGISTER]
+        return self.last_value_popped
+
+
+if __name__ == "__main__":
+    from .compiler import Compiler
+    from .parser import Parser
+    from .tokenizer import Tokenizer
+
+    program = list(Compiler(Parser(list(Tokenizer("1 + 2 * 3\n-(2 ** 10) / +4\n5"))).parse()).compile())
+    register_code = translate(program)
+    print(f"{len(program)} stack instructions, {register_code}")
+    for line in register_code:
+        print(line)
+    RegisterInterpreter(register_code).interpret()
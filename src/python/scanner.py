@@ -0,0 +1,103 @@
+"""
+表驱动扫描器
+"""
+import re
+from string import digits
+from typing import Generator
+
+from .tokenizer import CHARS_AS_TOKENS, Token, TokenType
+
+# 主正则表达式：先跳过空格，再匹配一个标记的文本；`*+` 是占有量词（Python 3.11 引入）。
+# 无法识别的字符由最后的 `.` 分支匹配，`\Z` 匹配扫描窗口的末尾。
+TOKEN_PATTERN: re.Pattern[str] = re.compile(
+    rf"[ ]*+(\*\*|[{re.escape(''.join(CHARS_AS_TOKENS))}]|[0-9]+\.?[0-9]*|\.[0-9]+|\n|\Z|.)",
+    re.DOTALL,
+)
+
+# 文本固定的标记，直接查表得到标记类型。
+FIXED_TOKENS: dict[str, TokenType] = {"**": TokenType.EXP, **CHARS_AS_TOKENS}
+
+# 每次交给正则表达式扫描的字符数，窗口总是在换行符之后结束，所以不会切断标记。
+WINDOW_SIZE: int = 1 << 16
+
+
+def float_value(text: str) -> float:
+    """
+    按照 Tokenizer 的方式计算浮点数字面量的值：整数部分加上小数部分
+    """
+    integer, _, decimal = text.partition(".")
+    value: float = float("." + decimal) if decimal else 0.0
+    return int(integer) + value if integer else value
+
+
+def scan(
+    code: str, pos: int, endpos: int, beginning_of_line: bool, parse_literals: bool = True
+) -> Generator[Token, None, bool]:
+    """
+    扫描 code[pos:endpos] 中的标记，返回扫描结束时是否位于行首
+
+    调用者需保证 endpos 不会切断标记。不产生结尾的 NEWLINE 和 EOF 标记。
+    parse_literals 为假时，INT 和 FLOAT 标记的值是源代码中的文本。
+    """
+    fixed_tokens: dict[str, TokenType] = FIXED_TOKENS
+    for text in TOKEN_PATTERN.findall(code, pos, endpos):
+        if (token_type := fixed_tokens.get(text)) is not None:
+            beginning_of_line = False
+            yield Token(token_type)
+        elif text and text[0] in digits:
+            beginning_of_line = False
+            if not parse_literals:
+                yield Token(TokenType.FLOAT if "." in text else TokenType.INT, text)
+            elif "." in text:
+                yield Token(TokenType.FLOAT, float_value(text))
+            else:
+                yield Token(TokenType.INT, int(text))
+        elif text == "\n":
+            if not beginning_of_line:  # Blank lines produce no tokens.
+                beginning_of_line = True
+                yield Token(TokenType.NEWLINE)
+        elif len(text) > 1:  # Floats that start with '.'.
+            beginning_of_line = False
+            yield Token(TokenType.FLOAT, float_value(text) if parse_literals else text)
+        elif text:  # The empty match marks the end of the window.
+            raise RuntimeError(f"Can't tokenize {text!r}.")
+    return beginning_of_line
+
+
+def end_of_program(beginning_of_line: bool) -> Generator[Token, None, None]:
+    """
+    产生程序结尾的标记
+    """
+    if not beginning_of_line:  # The program always ends with a newline.
+        yield Token(TokenType.NEWLINE)
+    yield Token(TokenType.EOF)
+
+
+class Scanner:
+    """
+    扫描器类
+
+    用一条预编译的主正则表达式单次遍历源代码，再查表把匹配到的文本分类，
+    不做递归，产生的标记与 Tokenizer 完全相同。parse_literals 为假时，INT 和 FLOAT 标记的值是源代码中的文本。
+    """
+
+    def __init__(self, code: str, parse_literals: bool = True) -> None:
+        self.code: str = code
+        self.parse_literals: bool = parse_literals
+
+    def __iter__(self) -> Generator[Token, None, None]:
+        code: str = self.code
+        beginning_of_line: bool = True
+        pos: int = 0
+        while pos < len(code):
+            endpos: int = code.find("\n", pos + WINDOW_SIZE) + 1 or len(code)
+            beginning_of_line = yield from scan(code, pos, endpos, beginning_of_line, self.parse_literals)
+            pos = endpos
+        yield from end_of_program(beginning_of_line)
+
+
+if __name__ == "__main__":
+    CODE = "1 + 2 ** 3.5 - .5\n\n(4 % 5) / 6"
+    print(CODE)
+    for tok in Scanner(CODE):
+        print(f"\t{tok.type}, {tok.value}")
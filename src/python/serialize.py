@@ -0,0 +1,183 @@
+"""
+语法树的二进制序列化
+"""
+import marshal
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Iterable
+
+from .arena import OPERATORS, AstArena, NodeKind
+from .parser import TreeNode
+
+MAGIC: bytes = b"BPCA"
+VERSION: int = 1
+
+# 文件头：魔数、格式版本、节点数、根节点下标、程序子节点数、字面量段的字节数，全部小端。
+HEADER: struct.Struct = struct.Struct("<4sHxxqqqq")
+
+# 子节点下标在文件中以 32 位整数保存，比内存中的 64 位数组小一半。
+INDEX_TYPECODE: str = "i"
+INDEX_SIZE: int = 4
+MAX_NODES: int = 2**31 - 1
+
+# 运算的操作数和表达式语句的子节点必须是这些类型。
+EXPRESSION_KINDS: frozenset[int] = frozenset({NodeKind.UNARYOP, NodeKind.BINOP, NodeKind.INT, NodeKind.FLOAT})
+
+
+def _indices_to_bytes(values: array) -> bytes:
+    """
+    把下标数组转换成 32 位小端字节
+    """
+    indices = array(INDEX_TYPECODE, values)
+    if sys.byteorder == "big":
+        indices.byteswap()
+    return indices.tobytes()
+
+
+def _indices_from_bytes(data: bytes | memoryview) -> array:
+    """
+    从 32 位小端字节读出 64 位下标数组
+    """
+    indices = array(INDEX_TYPECODE)
+    indices.frombytes(data)
+    if sys.byteorder == "big":
+        indices.byteswap()
+    return array("q", indices)
+
+
+def dumps_arena(arena: AstArena) -> bytes:
+    """
+    把语法树存储区序列化成字节串
+
+    节点数组按小端字节写出，字面量列表用 marshal 编码（支持任意大的整数）。
+    """
+    if max(len(arena), len(arena.children)) > MAX_NODES:
+        raise RuntimeError(f"Can't serialize more than {MAX_NODES} nodes.")
+    literals: bytes = marshal.dumps(arena.literals)
+    header: bytes = HEADER.pack(MAGIC, VERSION, len(arena), arena.root, len(arena.children), len(literals))
+    return b"".join(
+        [
+            header,
+            arena.kinds.tobytes(),
+            arena.ops.tobytes(),
+            _indices_to_bytes(arena.left),
+            _indices_to_bytes(arena.right),
+            _indices_to_bytes(arena.children),
+            literals,
+        ]
+    )
+
+
+def loads_arena(data: bytes | memoryview) -> AstArena:
+    """
+    从字节串读出语法树存储区，并检查数据是否完整有效
+    """
+    data = memoryview(data)
+    if len(data) < HEADER.size:
+        raise RuntimeError("Truncated AST data.")
+    magic, version, count, root, children_count, literals_size = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise RuntimeError(f"Not AST data, found magic number {bytes(magic)!r}.")
+    if version != VERSION:
+        raise RuntimeError(f"Unsupported AST format version {version}, expected {VERSION}.")
+    if min(count, children_count, literals_size) < 0 or len(data) != (
+        HEADER.size + count * (2 + 2 * INDEX_SIZE) + children_count * INDEX_SIZE + literals_size
+    ):
+        raise RuntimeError("AST data has the wrong size.")
+
+    arena = AstArena()
+    pos: int = HEADER.size
+    arena.kinds.frombytes(data[pos : pos + count])
+    arena.ops.frombytes(data[pos + count : pos + 2 * count])
+    pos += 2 * count
+    for name, size in [("left", count), ("right", count), ("children", children_count)]:
+        setattr(arena, name, _indices_from_bytes(data[pos : pos + size * INDEX_SIZE]))
+        pos += size * INDEX_SIZE
+    arena.literals = marshal.loads(data[pos:])
+    arena.root = root
+
+    if not isinstance(arena.literals, list) or not all(type(value) in (int, float) for value in arena.literals):
+        raise RuntimeError("Corrupted AST data: bad literals.")
+    used = bytearray(count)
+    if count and (
+        not 0 <= root < count
+        or min(arena.kinds) < min(NodeKind)
+        or max(arena.kinds) > max(NodeKind)
+        or max(arena.ops) >= len(OPERATORS)
+        or not all(_valid_node(arena, index, used) for index in range(count))
+    ):
+        raise RuntimeError("Corrupted AST data: bad nodes.")
+    return arena
+
+
+def _valid_node(arena: AstArena, index: int, used: bytearray) -> bool:
+    """
+    检查节点：子节点必须排在它前面、类型正确，而且只属于一个父节点；字面量和程序的语句不能越界
+
+    used 标记已经属于某个父节点的节点，共享的子节点在 to_tree 中会变成同一个对象。
+    """
+    left: int = arena.left[index]
+    right: int = arena.right[index]
+    expected: frozenset[int] = EXPRESSION_KINDS
+    match arena.kinds[index]:
+        case NodeKind.PROGRAM:
+            if not (0 <= left and 0 <= right and left + right <= len(arena.children)):
+                return False
+            children: Iterable[int] = arena.statements(index)
+            expected = frozenset({NodeKind.EXPR_STATEMENT})
+        case NodeKind.EXPR_STATEMENT | NodeKind.UNARYOP:
+            children = [left]
+        case NodeKind.BINOP:
+            children = [left, right]
+        case _:
+            return 0 <= left < len(arena.literals)
+    for child in children:
+        if not 0 <= child < index or used[child] or arena.kinds[child] not in expected:
+            return False
+        used[child] = 1
+    return True
+
+
+def dumps(tree: TreeNode) -> bytes:
+    """
+    把语法树序列化成字节串
+    """
+    return dumps_arena(AstArena.from_tree(tree))
+
+
+def loads(data: bytes | memoryview) -> TreeNode:
+    """
+    从字节串读出语法树
+    """
+    arena: AstArena = loads_arena(data)
+    try:
+        return arena.to_tree()
+    except IndexError as error:
+        raise RuntimeError("Corrupted AST data: bad child index.") from error
+
+
+def dump(tree: TreeNode, file: BinaryIO) -> None:
+    """
+    把语法树写入二进制文件
+    """
+    file.write(dumps(tree))
+
+
+def load(file: BinaryIO) -> TreeNode:
+    """
+    从二进制文件读出语法树
+    """
+    return loads(file.read())
+
+
+if __name__ == "__main__":
+    from .parser import Parser, print_ast
+    from .tokenizer import Tokenizer
+
+    CODE = """1 % -2
+5 ** -3 / 5
+1 * 2 + 2 ** 3"""
+    serialized = dumps(Parser(list(Tokenizer(CODE))).parse())
+    print(f"{len(serialized)} bytes: {serialized!r}")
+    print_ast(loads(serialized))
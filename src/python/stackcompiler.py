@@ -0,0 +1,61 @@
+"""
+非递归编译器
+"""
+from typing import Generator
+
+from .arena import AstArena
+from .compiler import Bytecode, BytecodeType, Compiler
+from .parser import BinOp, ExprStatement, Float, Int, Program, TreeNode, UnaryOp
+
+
+class StackCompiler(Compiler):
+    """
+    非递归编译器类
+
+    与 Compiler 的结果相同，但用显式的工作栈做后序遍历，直接把字节码追加到输出列表中。
+    栈中的项是还没有展开的节点，或者等待输出的字节码；
+    每个节点只展开一次，所以编译时间与节点数成正比，与语法树的深度无关，也不受递归深度限制。
+    """
+
+    def compile(self) -> Generator[Bytecode, None, None]:
+        """
+        逐条产生字节码
+        """
+        yield from self.compile_to_list()
+
+    def compile_to_list(self) -> list[Bytecode]:
+        """
+        返回字节码列表
+        """
+        if isinstance(self.tree, AstArena):
+            return list(self.compile_AstArena(self.tree))
+        bytecode: list[Bytecode] = []
+        emit = bytecode.append
+        stack: list[TreeNode | Bytecode] = [self.tree]
+        pop, extend = stack.pop, stack.extend
+        while stack:
+            item: TreeNode | Bytecode = pop()
+            match item:  # Positional captures would go through __match_args__ and cost about 40% more.
+                case Bytecode():
+                    emit(item)
+                case Int() | Float():
+                    emit(Bytecode(BytecodeType.PUSH, item.value))
+                case BinOp():
+                    extend((Bytecode(BytecodeType.BINOP, item.op), item.right, item.left))
+                case UnaryOp():
+                    extend((Bytecode(BytecodeType.UNARYOP, item.op), item.value))
+                case ExprStatement():
+                    extend((Bytecode(BytecodeType.POP), item.expr))
+                case Program():
+                    extend(reversed(item.statements))
+                case _:
+                    raise RuntimeError(f"Can't compile {item.__class__.__name__}.")
+        return bytecode
+
+
+if __name__ == "__main__":
+    from .parser import Parser
+    from .tokenizer import Tokenizer
+
+    for bc in StackCompiler(Parser(list(Tokenizer("3 + 5 - 7 + 1.2 + 2.4 - 3.6\n-2 ** 2 ** 3"))).parse()).compile():
+        print(bc)
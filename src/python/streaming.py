@@ -0,0 +1,120 @@
+"""
+流式分词器和解析器
+"""
+from collections import deque
+from io import TextIOBase
+from typing import Generator, Iterable, Iterator
+
+from .parser import Statement
+from .precedence import PrecedenceParser
+from .scanner import WINDOW_SIZE, end_of_program, scan
+from .tokenizer import Token, TokenType
+
+# 数字字面量中的字符，以它们结尾的块可能切断了一个数字。
+NUMBER_CHARS: str = "0123456789."
+
+
+def _partial_token_start(buffer: str) -> int:
+    """
+    返回块末尾可能被切断的标记的起始位置：末尾的数字，或者末尾连续星号中落单的一个
+    """
+    cut: int = len(buffer.rstrip(NUMBER_CHARS))
+    if cut < len(buffer):
+        return cut
+    # Stars pair up into `**` from the left, so only an odd one out can join the next chunk.
+    return len(buffer) - (len(buffer) - len(buffer.rstrip("*"))) % 2
+
+
+class StreamTokenizer:
+    """
+    流式分词器类
+
+    按固定大小的块读取文本流（或任意字符串块的可迭代对象），产生与 Tokenizer 相同的标记。
+    块末尾可能被切断的数字和 `**` 留到下一块再扫描，所以内存占用只与块大小
+    （以及最长的一个数字）有关，与程序长度无关。
+    """
+
+    def __init__(self, source: TextIOBase | Iterable[str], chunk_size: int = WINDOW_SIZE) -> None:
+        if isinstance(source, str):
+            raise RuntimeError("StreamTokenizer needs a text stream, use Scanner for strings.")
+        if chunk_size < 1:
+            raise RuntimeError(f"Chunk size must be positive, got {chunk_size}.")
+        self.source: TextIOBase | Iterable[str] = source
+        self.chunk_size: int = chunk_size
+
+    def chunks(self) -> Generator[str, None, None]:
+        """
+        逐块读取源代码
+        """
+        if isinstance(self.source, TextIOBase):
+            while chunk := self.source.read(self.chunk_size):
+                yield chunk
+        else:
+            yield from self.source
+
+    def __iter__(self) -> Generator[Token, None, None]:
+        beginning_of_line: bool = True
+        carry: str = ""  # Text that might be the start of a token cut by the chunk boundary.
+        for chunk in self.chunks():
+            buffer: str = carry + chunk
+            cut: int = _partial_token_start(buffer)
+            beginning_of_line = yield from scan(buffer, 0, cut, beginning_of_line)
+            carry = buffer[cut:]
+        beginning_of_line = yield from scan(carry, 0, len(carry), beginning_of_line)
+        yield from end_of_program(beginning_of_line)
+
+
+class StreamParser(PrecedenceParser):
+    """
+    流式解析器类
+
+    从任意标记迭代器中按需读取标记，只保留很小的前瞻窗口，每次产生一条语句。
+    已消费的标记立即释放，内存峰值只与最大的一条语句有关。
+    """
+
+    def __init__(self, tokens: Iterable[Token]) -> None:  # pylint: disable=W0231
+        self.token_iterator: Iterator[Token] = iter(tokens)
+        self.lookahead: deque[Token] = deque()
+        self.next_token_index: int = 0  # Number of tokens consumed so far.
+
+    def eat(self, expected_token_type: TokenType) -> Token:
+        """
+        Returns the next token if it is of the expected type.
+
+        If the next token is not of the expected type, this raises an error.
+        """
+        if self.peek() is None:
+            raise RuntimeError(f"Expected {expected_token_type}, ran out of tokens.")
+        next_token: Token = self.lookahead.popleft()
+        self.next_token_index += 1
+        if next_token.type != expected_token_type:
+            raise RuntimeError(f"Expected {expected_token_type}, ate {next_token!r}.")
+        return next_token
+
+    def peek(self, skip: int = 0) -> TokenType | None:
+        """
+        Checks the type of an upcoming token, pulling it from the iterator if needed.
+        """
+        while len(self.lookahead) <= skip:
+            if (token := next(self.token_iterator, None)) is None:
+                return None
+            self.lookahead.append(token)
+        return self.lookahead[skip].type
+
+    def __iter__(self) -> Generator[Statement, None, None]:
+        while self.peek() != TokenType.EOF:
+            yield self.parse_statement()
+        self.eat(TokenType.EOF)
+
+
+if __name__ == "__main__":
+    import io
+
+    from .parser import print_ast
+
+    CODE = "1 + 2 ** 3.5 - .5\n\n(4 % 5) / 6"
+    print(CODE)
+    for tok in StreamTokenizer(io.StringIO(CODE), chunk_size=4):
+        print(f"\t{tok.type}, {tok.value}")
+    for stmt in StreamParser(StreamTokenizer(io.StringIO(CODE), chunk_size=4)):
+        print_ast(stmt)
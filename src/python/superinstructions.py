@@ -0,0 +1,55 @@
+"""
+超级指令
+"""
+from collections import Counter
+
+from .compiler import Bytecode, BytecodeType
+
+
+def fuse_superinstructions(bytecode: list[Bytecode], removed: Counter[str] | None = None) -> list[Bytecode]:
+    """
+    把常见的指令序列改写成超级指令，removed 记录每种超级指令省掉的分派次数
+
+    PUSH a; PUSH b; BINOP op 合并成 PUSH_PUSH_BINOP (op, a, b)，PUSH c; BINOP op 合并成 BINOP_CONST (op, c)。
+    超级指令不会再组成新的模式，所以从前往后扫描一遍就够了，较长的模式先匹配。
+    应该在其它窥孔优化之后运行，因为超级指令不会再匹配那些规则。
+    """
+    push, binop = BytecodeType.PUSH, BytecodeType.BINOP
+    fused: list[Bytecode] = []
+    append = fused.append
+    push_push_binops: int = 0
+    binop_consts: int = 0
+    index: int = 0
+    end: int = len(bytecode)
+    while index < end:
+        bc: Bytecode = bytecode[index]
+        if bc.type is push and index + 1 < end:
+            following: Bytecode = bytecode[index + 1]
+            if following.type is binop:
+                append(Bytecode(BytecodeType.BINOP_CONST, (following.value, bc.value)))
+                binop_consts += 1
+                index += 2
+                continue
+            if following.type is push and index + 2 < end and (last := bytecode[index + 2]).type is binop:
+                append(Bytecode(BytecodeType.PUSH_PUSH_BINOP, (last.value, bc.value, following.value)))
+                push_push_binops += 1
+                index += 3
+                continue
+        append(bc)
+        index += 1
+    if removed is not None:
+        removed.update({"push_push_binop": 2 * push_push_binops, "binop_const": binop_consts})
+    return fused
+
+
+if __name__ == "__main__":
+    from .parser import Parser
+    from .peephole import optimize_bytecode
+    from .stackcompiler import StackCompiler
+    from .tokenizer import Tokenizer
+
+    tree = Parser(list(Tokenizer("1 + 2 * 3\n(1 - 2) / 4.5 ** -1"))).parse()
+    removed: Counter[str] = Counter()
+    for bc in fuse_superinstructions(optimize_bytecode(StackCompiler(tree).compile_to_list()), removed):
+        print(bc)
+    print(dict(removed))
@@ -0,0 +1,162 @@
+"""
+按执行次数分层的运行时
+"""
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from enum import StrEnum, auto
+from typing import Any, Callable
+
+from .closures import ClosureInterpreter
+from .codeobject import CodeObject, assemble
+from .fastvm import FastInterpreter
+from .folding import fold_constants
+from .interpreter import Interpreter
+from .parser import TreeNode
+from .peephole import optimize_bytecode
+from .precedence import PrecedenceParser
+from .scanner import Scanner
+from .stackcompiler import StackCompiler
+from .transpile import NativeInterpreter, TranspileCache
+
+
+class Tier(StrEnum):
+    """
+    执行层级，INTERPRETER 是冷程序所在的层级，其它是提升后的层级
+    """
+
+    INTERPRETER = auto()
+    OPTIMIZED = auto()  # Folding and peephole optimization, run by FastInterpreter.
+    CLOSURE = auto()
+    NATIVE = auto()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}.{self.name}"
+
+
+@dataclass
+class TierStats:
+    """
+    分层统计信息
+    """
+
+    runs: Counter[Tier] = field(default_factory=Counter)
+    promotions: Counter[Tier] = field(default_factory=Counter)
+    demotions: int = 0  # Promoted programs evicted from the store, they start cold again.
+    promotion_seconds: float = 0.0
+
+
+@dataclass
+class ProgramProfile:
+    """
+    冷程序的语法树、代码对象和执行次数，提升时直接使用语法树，不再重新解析
+    """
+
+    tree: TreeNode
+    code: CodeObject
+    runs: int = 0
+
+
+def _optimized(tree: TreeNode) -> Callable[[], Any]:
+    """
+    常量折叠并做窥孔优化，由 FastInterpreter 执行
+
+    不合并超级指令：折叠之后几乎只剩 PUSH 和 POP，合并只会多扫描一遍，运行时也没有变快。
+    """
+    bytecode = optimize_bytecode(StackCompiler(fold_constants(tree)).compile_to_list())
+    return FastInterpreter(assemble(bytecode)).run
+
+
+class TieredRuntime:
+    """
+    分层运行时类
+
+    以源代码为键统计每个程序的执行次数。冷程序只解析和编译一次，用 Interpreter 执行；
+    执行次数超过 threshold 之后，用保存的语法树把程序提升到 tier 指定的层级，以后都执行提升后的版本。
+    冷程序和提升后的程序分别按 LRU 最多保存 max_tracked 和 max_promoted 个，
+    被淘汰的提升程序回到冷的状态，重新计数。所有层级的结果和异常都与 Interpreter 相同。
+    """
+
+    def __init__(
+        self,
+        threshold: int = 1000,
+        tier: Tier = Tier.NATIVE,
+        max_promoted: int = 256,
+        max_tracked: int = 4096,
+    ) -> None:
+        if tier == Tier.INTERPRETER:
+            raise RuntimeError(f"Can't promote programs to {tier!r}.")
+        self.threshold: int = threshold
+        self.tier: Tier = tier
+        self.max_promoted: int = max_promoted
+        self.max_tracked: int = max_tracked
+        self.profiles: OrderedDict[str, ProgramProfile] = OrderedDict()
+        self.promoted: OrderedDict[str, Callable[[], Any]] = OrderedDict()
+        self.transpile_cache = TranspileCache(max_entries=max_promoted)
+        self.stats = TierStats()
+
+    def run(self, source: str) -> Any:
+        """
+        执行源代码，返回最后一条语句的值
+        """
+        function: Callable[[], Any] | None = self.promoted.get(source)
+        if function is not None:
+            self.promoted.move_to_end(source)
+            self.stats.runs[self.tier] += 1
+            return function()
+        profile: ProgramProfile | None = self.profiles.get(source)
+        if profile is None:
+            tree: TreeNode = PrecedenceParser(list(Scanner(source))).parse()
+            profile = self.profiles[source] = ProgramProfile(tree, assemble(StackCompiler(tree).compile_to_list()))
+            while len(self.profiles) > self.max_tracked:
+                self.profiles.popitem(last=False)
+        else:
+            self.profiles.move_to_end(source)
+        profile.runs += 1
+        if profile.runs > self.threshold:
+            del self.profiles[source]
+            function = self.promote(source, profile.tree)
+            self.stats.runs[self.tier] += 1
+            return function()
+        self.stats.runs[Tier.INTERPRETER] += 1
+        return Interpreter(profile.code).run()
+
+    def promote(self, source: str, tree: TreeNode) -> Callable[[], Any]:
+        """
+        用程序的语法树把它提升到 self.tier 层级，返回执行提升后版本的函数
+        """
+        start: float = time.perf_counter()
+        match self.tier:
+            case Tier.OPTIMIZED:
+                function: Callable[[], Any] = _optimized(tree)
+            case Tier.CLOSURE:
+                function = ClosureInterpreter(tree).run
+            case _:
+                function = NativeInterpreter(tree, self.transpile_cache).run
+        self.promoted[source] = function
+        while len(self.promoted) > self.max_promoted:
+            self.promoted.popitem(last=False)
+            self.stats.demotions += 1
+        self.stats.promotions[self.tier] += 1
+        self.stats.promotion_seconds += time.perf_counter() - start
+        return function
+
+    def tier_of(self, source: str) -> Tier | None:
+        """
+        返回程序当前所在的层级，没有记录的程序返回 None
+        """
+        if source in self.promoted:
+            return self.tier
+        return Tier.INTERPRETER if source in self.profiles else None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({len(self.profiles)} cold, {len(self.promoted)} promoted to {self.tier!r})"
+        )
+
+
+if __name__ == "__main__":
+    runtime = TieredRuntime(threshold=2)
+    for expression in ["1 + 2 * 3"] * 4 + ["2 ** 100 % 7"]:
+        print(f"{expression} = {runtime.run(expression)} ({runtime.tier_of(expression)!r})")
+    print(runtime, runtime.stats)
@@ -0,0 +1,113 @@
+"""
+紧凑标记流
+"""
+from array import array
+from typing import Any, Generator
+
+from .scanner import FIXED_TOKENS, Scanner, float_value
+from .tokenizer import Token, TokenType
+
+# 标记类型与整数编码之间的对应关系，编码就是 TOKEN_TYPES 中的下标。
+TOKEN_TYPES: tuple[TokenType, ...] = tuple(TokenType)
+TOKEN_CODES: dict[TokenType, int] = {type_: code for code, type_ in enumerate(TOKEN_TYPES)}
+
+# 除字面量以外每种标记在源代码中的文本。
+_TOKEN_TEXTS: dict[TokenType, str] = {
+    **{type_: text for text, type_ in FIXED_TOKENS.items()},
+    TokenType.NEWLINE: "\n",
+    TokenType.EOF: "",
+}
+_INT: int = TOKEN_CODES[TokenType.INT]
+_FLOAT: int = TOKEN_CODES[TokenType.FLOAT]
+
+
+class TokenStream:
+    """
+    标记流类
+
+    以“数组结构”保存标记：类型编码在 array('B') 中，源代码起止位置在两个整数数组中。
+    INT 和 FLOAT 的值只在被读取时才从源代码中解析出来。
+    """
+
+    def __init__(self, code: str) -> None:
+        self.code: str = code
+        self.kinds: array[int] = array("B")
+        self.starts: array[int] = array("q")
+        self.ends: array[int] = array("q")
+        self._scan()
+
+    def _scan(self) -> None:
+        """
+        用 Scanner 扫描源代码，填充三个数组，产生的标记与 Tokenizer 相同
+        """
+        code: str = self.code
+        append_kind, append_start, append_end = self.kinds.append, self.starts.append, self.ends.append
+        token_codes: dict[TokenType, int] = TOKEN_CODES
+        texts: dict[TokenType, str] = _TOKEN_TEXTS
+        end: int = 0
+        for token in Scanner(code, parse_literals=False):
+            text: str = token.value if token.value is not None else texts[token.type]
+            # Only spaces and blank lines are skipped, so the next occurrence of the text is the token.
+            start: int = code.find(text, end) if text else -1
+            if start < 0:  # The NEWLINE and EOF added at the end of the program are not in the source.
+                start = end = len(code)
+            else:
+                end = start + len(text)
+            append_kind(token_codes[token.type])
+            append_start(start)
+            append_end(end)
+
+    def value_at(self, index: int) -> Any:
+        """
+        解析并返回第 index 个标记的值
+        """
+        kind: int = self.kinds[index]
+        if kind == _INT:
+            return int(self.code[self.starts[index] : self.ends[index]])
+        if kind == _FLOAT:
+            return float_value(self.code[self.starts[index] : self.ends[index]])
+        return None
+
+    def peek(self, index: int) -> TokenType | None:
+        """
+        返回第 index 个标记的类型，超出末尾时返回 None，不解析字面量
+        """
+        kinds: array[int] = self.kinds
+        return TOKEN_TYPES[kinds[index]] if index < len(kinds) else None
+
+    def eat(self, index: int, expected_token_type: TokenType) -> Token:
+        """
+        返回第 index 个标记，类型不符时报错；只比较类型编码，只为 INT 和 FLOAT 解析值
+        """
+        kind: int = self.kinds[index]
+        if kind != TOKEN_CODES[expected_token_type]:
+            raise RuntimeError(f"Expected {expected_token_type}, ate {self[index]!r}.")
+        if kind == _INT:
+            return Token(TokenType.INT, int(self.code[self.starts[index] : self.ends[index]]))
+        if kind == _FLOAT:
+            return Token(TokenType.FLOAT, float_value(self.code[self.starts[index] : self.ends[index]]))
+        return Token(expected_token_type)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index: int) -> Token:
+        kind: int = self.kinds[index]
+        if kind == _INT or kind == _FLOAT:  # pylint: disable=R1714
+            return Token(TOKEN_TYPES[kind], self.value_at(index))
+        return Token(TOKEN_TYPES[kind])
+
+    def __iter__(self) -> Generator[Token, None, None]:
+        for index in range(len(self.kinds)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self)} tokens)"
+
+
+if __name__ == "__main__":
+    CODE = "1 + 2 ** 3.5 - .5\n\n(4 % 5) / 6"
+    stream = TokenStream(CODE)
+    print(stream)
+    for i, tok in enumerate(stream):
+        print(f"\t{tok.type}, {tok.value}, {stream.starts[i]}:{stream.ends[i]}")
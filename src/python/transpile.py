@@ -0,0 +1,354 @@
+"""
+把程序转换成 CPython 代码对象的执行后端
+"""
+import ast
+import hashlib
+import types
+from collections import OrderedDict
+from typing import Any, Callable
+
+from .arena import AstArena
+from .bytecache import CacheStats, dumps_code
+from .codeobject import STACK_EFFECTS, assemble
+from .compiler import Bytecode, BytecodeType
+from .folding import ConstantFolder, FoldingLimits
+from .interpreter import Interpreter
+from .parser import TreeNode
+from .serialize import dumps, dumps_arena
+from .stackcompiler import StackCompiler
+from .visitor import Dispatcher
+
+FUNCTION_NAME: str = "program"
+FILENAME: str = "<bpci>"
+# 表达式的嵌套深度超过这个值时，把栈上的中间结果先存入局部变量，CPython 编译器就不会递归得太深。
+DEFAULT_MAX_DEPTH: int = 200
+
+AST_OPERATORS: dict[str, type[ast.operator]] = {
+    "**": ast.Pow,
+    "%": ast.Mod,
+    "/": ast.Div,
+    "*": ast.Mult,
+    "+": ast.Add,
+    "-": ast.Sub,
+}
+
+# 结果的位数可能远大于操作数的运算符。
+GROWING_OPERATORS: frozenset[str] = frozenset({"*", "**"})
+
+# 转换失败时（例如 CPython 编译器的内存或者递归限制）改用 Interpreter 执行。
+TRANSPILE_ERRORS: tuple[type[Exception], ...] = (RecursionError, MemoryError, SyntaxError, ValueError)
+
+
+def _unknown_operator(op: str, *operands: Any) -> Any:
+    """
+    生成的代码遇到未知运算符时调用，操作数已经求值，与 Interpreter 一样在运行时报错
+    """
+    raise RuntimeError(f"Unknown operator {op}.")
+
+
+GLOBALS: dict[str, Any] = {"__builtins__": {}, _unknown_operator.__name__: _unknown_operator}
+
+# 符号栈上的一项：表达式和它的嵌套深度，常量和局部变量的深度是 0。
+Entry = tuple[ast.expr, int]
+
+
+class Transpiler(Dispatcher):
+    """
+    转换器类
+
+    像 Interpreter 一样逐条执行字节码，但栈上放的是 Python 表达式的语法树，POP 生成一条赋值语句，
+    整个程序成为一个函数 `def program(): ...; return last`，由 CPython 编译并用它自己的求值循环执行。
+    求值顺序和运算函数都与 Interpreter 相同，所以结果和异常也相同。
+
+    CPython 编译时会折叠常量表达式。为了不在转换时计算巨大的 `**`，两边都是常量表达式的 `*` 和 `**`
+    只有在两边都是字面量、而且结果不超过 limits.max_int_bits 时才允许折叠，否则先把左操作数存入局部变量；
+    其它运算符的结果最多比操作数多一位，可以放心折叠。
+    """
+
+    dispatch_prefix = "translate_"
+    dispatch_keys = {bct: bct.value for bct in BytecodeType}
+
+    def __init__(
+        self, bytecode: list[Bytecode], max_depth: int = DEFAULT_MAX_DEPTH, limits: FoldingLimits | None = None
+    ) -> None:
+        self.bytecode: list[Bytecode] = bytecode
+        self.max_depth: int = max_depth
+        self.folder = ConstantFolder(limits)
+        self.stack: list[Entry] = []
+        self.body: list[ast.stmt] = []
+        self.temporaries: int = 0  # Number of locals used so far, every stored value gets a new one.
+
+    def translate(self) -> ast.Module:
+        """
+        返回定义程序函数的模块语法树
+        """
+        self.stack.clear()
+        self.temporaries = 0
+        self.body = [self._assign("last", ast.Constant(None))]
+        for index, bc in enumerate(self.bytecode):
+            handler: Callable[..., Any] | None = self.dispatch_table.get(bc.type)
+            if handler is None:
+                raise RuntimeError(f"Can't translate {bc.type}.")
+            if len(self.stack) < STACK_EFFECTS[bc.type][0]:
+                raise RuntimeError(f"Stack underflow at instruction {index}.")
+            handler(self, bc)
+        self._spill(len(self.stack))  # Values left on the stack are still evaluated, in order.
+        self.body.append(ast.Return(ast.Name("last", ast.Load())))
+        function = ast.FunctionDef(
+            FUNCTION_NAME, ast.arguments([], [], None, [], [], None, []), self.body, [], None, None
+        )
+        return ast.fix_missing_locations(ast.Module([function], []))
+
+    def translate_push(self, bc: Bytecode) -> None:
+        """
+        转换入栈
+        """
+        self.stack.append((ast.Constant(bc.value), 0))
+
+    def translate_pop(self, bc: Bytecode) -> None:  # pylint: disable=W0613
+        """
+        转换弹出，生成赋值语句
+        """
+        self._spill(len(self.stack) - 1)
+        self.body.append(self._assign("last", self.stack.pop()[0]))
+
+    def translate_binop(self, bc: Bytecode) -> None:
+        """
+        转换二元运算
+        """
+        right: Entry = self.stack.pop()
+        left: Entry = self.stack.pop()
+        self._push_binary(bc.value, left, right)
+
+    def translate_binop_const(self, bc: Bytecode) -> None:
+        """
+        转换右操作数是常量的二元运算
+        """
+        op, right = bc.value
+        self._push_binary(op, self.stack.pop(), (ast.Constant(right), 0))
+
+    def translate_push_push_binop(self, bc: Bytecode) -> None:
+        """
+        转换两个操作数都是常量的二元运算
+        """
+        op, left, right = bc.value
+        self._push_binary(op, (ast.Constant(left), 0), (ast.Constant(right), 0))
+
+    def translate_unaryop(self, bc: Bytecode) -> None:
+        """
+        转换一元运算，正号什么也不做
+        """
+        if bc.value == "+":
+            return
+        value, depth = self.stack.pop()
+        if bc.value == "-" and isinstance(value, ast.Constant):
+            self.stack.append((ast.Constant(-value.value), 0))
+        elif bc.value == "-":
+            self._push(ast.UnaryOp(ast.USub(), value), depth + 1)
+        else:
+            self._push(self._unknown(bc.value, [value]), depth + 1)
+
+    def _push_binary(self, op: str, left: Entry, right: Entry) -> None:
+        """
+        把二元运算压入符号栈
+        """
+        depth: int = max(left[1], right[1]) + 1
+        operator_class: type[ast.operator] | None = AST_OPERATORS.get(op)
+        if operator_class is None:
+            self._push(self._unknown(op, [left[0], right[0]]), depth)
+            return
+        if op in GROWING_OPERATORS and self._is_constant(left[0]) and self._is_constant(right[0]):
+            match left[0], right[0]:
+                case ast.Constant(left_value), ast.Constant(right_value) if self.folder.is_small_enough(
+                    op, left_value, right_value
+                ):
+                    pass
+                case _:  # Everything below the left operand is evaluated before it.
+                    self._spill(len(self.stack))
+                    left = self._store(left[0])
+        self._push(ast.BinOp(left[0], operator_class(), right[0]), depth)
+
+    def _push(self, value: ast.expr, depth: int) -> None:
+        """
+        压入一个表达式，太深时连同下面还没有求值的表达式一起按顺序存入局部变量
+        """
+        self.stack.append((value, depth))
+        if depth > self.max_depth:
+            self._spill(len(self.stack))
+
+    def _spill(self, count: int) -> None:
+        """
+        把栈底的 count 项中的表达式按入栈顺序存入局部变量，保持求值顺序不变
+        """
+        for position in range(count):
+            value, depth = self.stack[position]
+            if depth:
+                self.stack[position] = self._store(value)
+
+    def _store(self, value: ast.expr) -> Entry:
+        """
+        把表达式存入一个新的局部变量，返回读取它的符号栈项
+
+        局部变量从不重复使用，因为栈上还没有求值的表达式可能仍然引用以前存入的值。
+        """
+        name: str = f"t{self.temporaries}"
+        self.temporaries += 1
+        self.body.append(self._assign(name, value))
+        return ast.Name(name, ast.Load()), 0
+
+    @staticmethod
+    def _is_constant(value: ast.expr) -> bool:
+        """
+        返回 CPython 编译时是否可能把表达式折叠成常量
+        """
+        stack: list[ast.expr] = [value]
+        while stack:
+            match stack.pop():
+                case ast.UnaryOp(_, operand):
+                    stack.append(operand)
+                case ast.BinOp(left, _, right):
+                    stack.extend([left, right])
+                case ast.Constant():
+                    pass
+                case _:
+                    return False
+        return True
+
+    @staticmethod
+    def _unknown(op: str, operands: list[ast.expr]) -> ast.expr:
+        """
+        返回调用 _unknown_operator 的表达式
+        """
+        return ast.Call(ast.Name(_unknown_operator.__name__, ast.Load()), [ast.Constant(op), *operands], [])
+
+    @staticmethod
+    def _assign(name: str, value: ast.expr) -> ast.stmt:
+        """
+        返回赋值语句
+        """
+        return ast.Assign([ast.Name(name, ast.Store())], value)
+
+
+def transpile(
+    program: TreeNode | AstArena | list[Bytecode],
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    limits: FoldingLimits | None = None,
+) -> types.CodeType:
+    """
+    把语法树（或者 Compiler 输出的字节码列表）转换成程序函数的 CPython 代码对象
+    """
+    bytecode: list[Bytecode] = program if isinstance(program, list) else StackCompiler(program).compile_to_list()
+    module: types.CodeType = compile(Transpiler(bytecode, max_depth, limits).translate(), FILENAME, "exec")
+    return next(const for const in module.co_consts if isinstance(const, types.CodeType))
+
+
+class TranspileCache:
+    """
+    转换结果的缓存类
+
+    语法树用 serialize.dumps、字节码列表用 bytecache.dumps_code 序列化后取 SHA-256 作为键，
+    按 LRU 最多保存 max_entries 个代码对象。含有未知运算符的程序无法序列化，每次都重新转换。
+    """
+
+    def __init__(
+        self, max_entries: int = 256, max_depth: int = DEFAULT_MAX_DEPTH, limits: FoldingLimits | None = None
+    ) -> None:
+        self.max_entries: int = max_entries
+        self.max_depth: int = max_depth
+        self.limits: FoldingLimits | None = limits
+        self.entries: OrderedDict[bytes, types.CodeType] = OrderedDict()
+        self.stats = CacheStats()
+
+    @staticmethod
+    def key(program: TreeNode | AstArena | list[Bytecode]) -> bytes | None:
+        """
+        返回程序的缓存键，无法序列化时返回 None
+        """
+        try:
+            if isinstance(program, list):
+                data: bytes = b"bytecode\0" + dumps_code(assemble(program))
+            elif isinstance(program, AstArena):
+                data = b"tree\0" + dumps_arena(program)
+            else:
+                data = b"tree\0" + dumps(program)
+        except RuntimeError:
+            return None
+        return hashlib.sha256(data).digest()
+
+    def compile(self, program: TreeNode | AstArena | list[Bytecode]) -> types.CodeType:
+        """
+        返回程序函数的代码对象，未命中时转换并写入缓存
+        """
+        key: bytes | None = self.key(program)
+        if key is not None and (code := self.entries.get(key)) is not None:
+            self.entries.move_to_end(key)
+            self.stats.hits += 1
+            return code
+        self.stats.misses += 1
+        code = transpile(program, self.max_depth, self.limits)
+        if key is not None:
+            self.entries[key] = code
+            self.stats.writes += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats.evictions += 1
+        return code
+
+    def clear(self) -> None:
+        """
+        清空缓存，保留统计信息
+        """
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+DEFAULT_TRANSPILE_CACHE: TranspileCache = TranspileCache()
+
+
+class NativeInterpreter:
+    """
+    原生解释器类
+
+    与 Interpreter 的接口相同，程序由 CPython 的求值循环执行。
+    转换失败时退回到 Interpreter，fallback 记录是否发生了这种情况。
+    """
+
+    def __init__(self, program: TreeNode | AstArena | list[Bytecode], cache: TranspileCache | None = None) -> None:
+        cache = cache if cache is not None else DEFAULT_TRANSPILE_CACHE
+        self.fallback: bool = False
+        try:
+            self.function: Callable[[], Any] = types.FunctionType(cache.compile(program), GLOBALS)
+        except TRANSPILE_ERRORS:
+            cache.stats.errors += 1
+            self.fallback = True
+            bytecode: list[Bytecode] = (
+                program if isinstance(program, list) else StackCompiler(program).compile_to_list()
+            )
+            self.function = lambda: Interpreter(bytecode).run()
+        self.last_value_popped: Any = None
+
+    def interpret(self) -> None:
+        """
+        执行程序并打印结果
+        """
+        self.run()
+        print("Done!")
+        print(self.last_value_popped)
+
+    def run(self) -> Any:
+        """
+        执行程序，返回最后一条语句的值
+        """
+        self.last_value_popped = self.function()
+        return self.last_value_popped
+
+
+if __name__ == "__main__":
+    from .parser import Parser
+    from .tokenizer import Tokenizer
+
+    source_tree = Parser(list(Tokenizer("1 + 2 * 3\n-(2 ** 10) / +4\n2 ** 100000 % 7"))).parse()
+    print(ast.unparse(Transpiler(StackCompiler(source_tree).compile_to_list()).translate()))
+    NativeInterpreter(source_tree).interpret()
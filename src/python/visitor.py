@@ -0,0 +1,34 @@
+"""
+预先解析的分派表
+"""
+from typing import Any, Callable, ClassVar, Hashable
+
+
+class Dispatcher:
+    """
+    分派基类
+
+    子类在 dispatch_keys 中列出要处理的键（节点类或者字节码类型）和对应的名称，
+    创建子类时为每个键找到方法 `{dispatch_prefix}{名称}`，存入 dispatch_table，
+    缺少处理方法时直接报错。之后每次分派只需要查一次字典：`self.dispatch_table[key](self, item)`。
+    子类覆盖处理方法后，它自己的分派表会指向新的方法。
+    """
+
+    dispatch_prefix: ClassVar[str] = ""
+    dispatch_keys: ClassVar[dict[Hashable, str]] = {}
+    dispatch_table: ClassVar[dict[Any, Callable[..., Any]]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if not cls.dispatch_prefix:
+            return
+        table: dict[Any, Callable[..., Any]] = {}
+        missing: list[str] = []
+        for key, name in cls.dispatch_keys.items():
+            handler: Callable[..., Any] | None = getattr(cls, f"{cls.dispatch_prefix}{name}", None)
+            if handler is None:
+                missing.append(f"{cls.dispatch_prefix}{name}")
+            table[key] = handler  # type: ignore[assignment]
+        if missing:
+            raise RuntimeError(f"{cls.__name__} is missing the handlers {', '.join(missing)}.")
+        cls.dispatch_table = table
@@ -0,0 +1,66 @@
+"""
+语法树存储区测试
+"""
+import pytest
+
+from python.arena import AstArena, NodeKind
+from python.compiler import Compiler
+from python.parser import BinOp, Int, Parser, UnaryOp, print_ast
+from python.tokenizer import Tokenizer
+
+CODES: list[str] = [
+    "3 + 5",
+    "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3",
+    "-(3 + 2) * -(((1))) ** (2 + (3.5))",
+    "--++-++-+3\n(2 - 3) - (5 - 6) % .5 / 73.",
+    "",
+]
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_arena_round_trip(code: str):
+    """
+    测试数据类语法树与存储区之间的相互转换
+    """
+    tree = Parser(list(Tokenizer(code))).parse()
+    assert AstArena.from_tree(tree).to_tree() == tree
+
+
+def test_arena_stores_nodes_in_post_order():
+    """
+    测试节点按后序存放
+    """
+    arena = AstArena.from_tree(BinOp("*", UnaryOp("-", Int(2)), Int(3)))
+    assert list(arena.kinds) == [NodeKind.INT, NodeKind.UNARYOP, NodeKind.INT, NodeKind.BINOP]
+    assert arena.root == 3
+    assert (arena.left[3], arena.right[3]) == (1, 2)
+    assert arena.literals == [2, 3]
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_compiler_accepts_arena(code: str):
+    """
+    测试直接编译存储区
+    """
+    tree = Parser(list(Tokenizer(code))).parse()
+    assert list(Compiler(AstArena.from_tree(tree)).compile()) == list(Compiler(tree).compile())
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_print_ast_accepts_arena(code: str, capsys):
+    """
+    测试打印存储区与打印语法树的格式相同
+    """
+    tree = Parser(list(Tokenizer(code))).parse()
+    print_ast(tree)
+    expected = capsys.readouterr().out
+    print_ast(AstArena.from_tree(tree))
+    assert capsys.readouterr().out == expected
+
+
+def test_arena_rejects_unknown_operators():
+    """
+    测试未知运算符
+    """
+    with pytest.raises(RuntimeError):
+        AstArena.from_tree(BinOp("^", Int(2), Int(3)))
@@ -0,0 +1,123 @@
+"""
+字节码缓存测试
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from python import bytecache
+from python.bytecache import BytecodeCache, compile_source, dumps_code, loads_code
+from python.image import BytecodeImage, dumps_image
+
+CODE: str = "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3.5\n-0.0"
+
+
+@pytest.mark.parametrize("code", [CODE, "", "1\n" * 1000, f"{2**100} + 1"])
+def test_code_objects_round_trip(code: str):
+    """
+    测试代码对象序列化后可以原样读出
+    """
+    code_object = compile_source(code)
+    assert loads_code(dumps_code(code_object)) == code_object
+    assert loads_code(dumps_code(BytecodeImage(dumps_image(code_object)))) == code_object
+
+
+@pytest.mark.parametrize("data", [b"", b"BPCC", dumps_code(compile_source(CODE))[:-3], b"XXXX" + bytes(12)])
+def test_bad_entries_are_rejected(data: bytes):
+    """
+    测试截断或者格式不对的数据会报错
+    """
+    with pytest.raises(RuntimeError):
+        loads_code(data)
+
+
+def test_second_compile_hits_the_cache(tmp_path):
+    """
+    测试第二次编译相同的源代码时命中缓存，而且不同的缓存实例共用文件
+    """
+    cache = BytecodeCache(tmp_path)
+    assert cache.compile(CODE) == compile_source(CODE)
+    assert cache.compile(CODE) == compile_source(CODE)
+    assert BytecodeCache(tmp_path).get(CODE) == compile_source(CODE)
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.writes) == (1, 1, 1)
+    assert sorted(os.listdir(tmp_path)) == [cache.key(CODE) + ".bpcc"]
+
+
+def test_version_is_part_of_the_key(tmp_path, monkeypatch):
+    """
+    测试格式版本改变后旧的缓存不会命中
+    """
+    cache = BytecodeCache(tmp_path)
+    old_key: str = cache.key(CODE)
+    monkeypatch.setattr(bytecache, "CACHE_VERSION", bytecache.CACHE_VERSION + 1)
+    assert cache.key(CODE) != old_key
+
+
+def test_corrupted_entries_are_recompiled(tmp_path):
+    """
+    测试损坏的缓存文件被当作未命中，并被重新写入
+    """
+    cache = BytecodeCache(tmp_path)
+    cache.compile(CODE)
+    with open(cache.path(CODE), "r+b") as file:
+        file.truncate(10)
+    assert cache.compile(CODE) == compile_source(CODE)
+    assert cache.stats.errors == 1
+    assert cache.get(CODE) == compile_source(CODE)
+
+
+def test_hits_survive_a_failed_utime(tmp_path, monkeypatch):
+    """
+    测试更新访问时间失败时（例如只读的缓存目录）仍然命中，缓存文件也不会被删除
+    """
+    cache = BytecodeCache(tmp_path)
+    cache.compile(CODE)
+
+    def fail(*args: object) -> None:
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(os, "utime", fail)
+    assert cache.get(CODE) == compile_source(CODE)
+    assert (cache.stats.hits, cache.stats.errors) == (1, 0)
+    assert os.path.exists(cache.path(CODE))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """
+    测试总大小超过限制时删除最久没有用过的文件
+    """
+    sources: list[str] = [f"{index} + {index}" for index in range(5)]
+    cache = BytecodeCache(tmp_path, max_bytes=3 * len(dumps_code(compile_source(sources[0]))))
+    for mtime, source in enumerate(sources[:3]):
+        cache.compile(source)
+        os.utime(cache.path(source), (mtime, mtime))
+    cache.get(sources[0])  # Now the most recently used.
+    cache.compile(sources[3])
+    assert [cache.get(source) is not None for source in sources[:4]] == [True, False, True, True]
+    assert cache.stats.evictions == 1
+    cache.clear()
+    assert not os.listdir(tmp_path)
+
+
+def test_write_failures_are_not_fatal(tmp_path):
+    """
+    测试无法写入缓存时照常编译
+    """
+    not_a_directory = tmp_path / "file"
+    not_a_directory.write_text("")
+    cache = BytecodeCache(not_a_directory)
+    assert cache.compile(CODE) == compile_source(CODE)
+    assert cache.stats.writes == 0 and cache.stats.errors > 0
+
+
+def test_concurrent_writers(tmp_path):
+    """
+    测试多个写入者同时写入相同的键
+    """
+    caches: list[BytecodeCache] = [BytecodeCache(tmp_path) for _ in range(8)]
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda cache: cache.compile(CODE * 50), caches * 4))
+    assert all(result == compile_source(CODE * 50) for result in results)
+    assert os.listdir(tmp_path) == [caches[0].key(CODE * 50) + ".bpcc"]
+    assert sum(cache.stats.errors for cache in caches) == 0
@@ -0,0 +1,67 @@
+"""
+字节扫描器测试
+"""
+import mmap
+
+import pytest
+
+from python.bytescanner import ByteScanner, scan_file
+from python.tokenizer import Token, Tokenizer, TokenType
+
+CODES: list[str] = [
+    "",
+    "1 + 2 + 3 + 4 - 5 - 6 + 7 - 8",
+    "12345 * 678 ** 90 * 1 ** 2",
+    "1.25 + .5 - 73. + 100.0625 ** 2",
+    "\n\n\n1 + 2\n\n\n3 + 4\n\n\n",
+    "( 1 ( 2 ) 3 ( ) 4       ",
+    "1.2.3 * .4.5",
+]
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_byte_scanner_matches_tokenizer(code: str):
+    """
+    测试 bytes、bytearray 和 memoryview 都与 Tokenizer 产生相同的标记
+    """
+    expected = list(Tokenizer(code))
+    data = code.encode("ascii")
+    assert list(ByteScanner(data)) == expected
+    assert list(ByteScanner(bytearray(data))) == expected
+    assert list(ByteScanner(memoryview(data))) == expected
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_scan_file_matches_tokenizer(code: str, tmp_path):
+    """
+    测试通过 mmap 扫描文件
+    """
+    path = tmp_path / "program.txt"
+    path.write_bytes(code.encode("ascii"))
+    assert list(scan_file(path)) == list(Tokenizer(code))
+
+
+def test_byte_scanner_scans_mmap(tmp_path):
+    """
+    测试直接扫描 mmap 对象
+    """
+    path = tmp_path / "program.txt"
+    path.write_bytes(b"3 ** 2\n")
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        tokens = list(ByteScanner(mapped))
+    assert tokens == [
+        Token(TokenType.INT, 3),
+        Token(TokenType.EXP),
+        Token(TokenType.INT, 2),
+        Token(TokenType.NEWLINE),
+        Token(TokenType.EOF),
+    ]
+
+
+@pytest.mark.parametrize("code", [b"$", b"  .  ", b"1 + \xe2\x82\xac"])
+def test_byte_scanner_raises_error_on_garbage(code: bytes):
+    """
+    测试未知字符
+    """
+    with pytest.raises(RuntimeError):
+        list(ByteScanner(code))
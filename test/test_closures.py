@@ -0,0 +1,146 @@
+"""
+闭包后端测试
+"""
+from typing import Any
+
+import pytest
+
+from python.closures import ClosureCompiler, ClosureInterpreter
+from python.interpreter import Interpreter
+from python.parser import BinOp, ExprStatement, Float, Int, Parser, Program, TreeNode, UnaryOp
+from python.stackcompiler import StackCompiler
+from python.tokenizer import Tokenizer
+
+
+def parse(code: str) -> TreeNode:
+    """
+    解析源代码
+    """
+    return Parser(list(Tokenizer(code))).parse()
+
+
+def run_both(tree: TreeNode, max_depth: int = 200) -> tuple[Any, Any]:
+    """
+    分别用 Interpreter 和 ClosureInterpreter 执行，返回结果或者异常
+    """
+    results: list[Any] = []
+    for run in [
+        lambda: Interpreter(StackCompiler(tree).compile_to_list()).run(),
+        lambda: ClosureInterpreter(tree, max_depth).run(),
+    ]:
+        try:
+            results.append(run())
+        except Exception as error:  # pylint: disable=W0718
+            results.append((error.__class__, str(error)))
+    return results[0], results[1]
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "",
+        "3 + 5",
+        "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3",
+        "--+(1 + 2) * -(3.0 - +4) ** 2 ** -0.5",
+        "-0.0\n+-0",
+        "2 ** 300 % 7",
+        "1 / 0",
+        "1 + 2 % 0.0",
+        "10.0 ** 400",
+        "(-8) ** 0.5",
+        "1 - 2 - 3 - 4",
+        "2 ** 3 ** 2",
+    ],
+)
+@pytest.mark.parametrize("max_depth", [200, 0])
+def test_closures_match_interpreter(code: str, max_depth: int):
+    """
+    测试结果和异常与 Interpreter 相同，包括全部语句都交给 Interpreter 的情况
+    """
+    expected, actual = run_both(parse(code), max_depth)
+    assert repr(actual) == repr(expected)
+
+
+def test_runtime_errors_keep_previous_value():
+    """
+    测试出错时保留上一条语句的值
+    """
+    interpreter = ClosureInterpreter(parse("7\n1 + 1 / 0\n8"))
+    with pytest.raises(ZeroDivisionError):
+        interpreter.run()
+    assert interpreter.last_value_popped == 7
+
+
+@pytest.mark.parametrize(
+    "tree",
+    [
+        Program([ExprStatement(BinOp("?", Int(1), Int(2)))]),
+        Program([ExprStatement(BinOp("?", Int(1), BinOp("/", Int(1), Int(0))))]),
+        Program([ExprStatement(UnaryOp("~", Float(1.5)))]),
+        Program([ExprStatement(UnaryOp("~", BinOp("%", Int(1), Int(0))))]),
+    ],
+)
+def test_unknown_operators_fail_at_run_time(tree: TreeNode):
+    """
+    测试未知运算符在运行时才报错，而且先求值操作数
+    """
+    expected, actual = run_both(tree)
+    assert actual == expected
+    assert expected[0] in {RuntimeError, ZeroDivisionError}
+
+
+@pytest.mark.parametrize(
+    "tree",
+    [
+        Program([ExprStatement(UnaryOp("-", Int(1)))] * 3),
+        Program([ExprStatement(BinOp("+", Int(1), Int(2)))]),
+    ],
+)
+def test_constant_operands_are_bound(tree: TreeNode):
+    """
+    测试常量操作数的各种组合，编译完后值栈是空的
+    """
+    compiler = ClosureCompiler(tree)
+    statements = compiler.compile()
+    assert len(statements) == len(tree.statements)  # type: ignore[attr-defined]
+    assert not compiler.operands
+    assert [statement() for statement in statements][-1] == Interpreter(StackCompiler(tree).compile_to_list()).run()
+
+
+def left_deep_sum(depth: int) -> TreeNode:
+    """
+    构造 1 + 1 + ... + 1
+    """
+    tree: TreeNode = Int(1)
+    for _ in range(depth):
+        tree = BinOp("+", tree, Int(1))
+    return Program([ExprStatement(tree), ExprStatement(Int(2)), ExprStatement(tree)])
+
+
+def nested_negations(depth: int) -> TreeNode:
+    """
+    构造 -(-(-(... x)))
+    """
+    tree: TreeNode = BinOp("*", Int(3), Float(0.5))
+    for _ in range(depth):
+        tree = UnaryOp("-", tree)
+    return Program([ExprStatement(tree)])
+
+
+@pytest.mark.parametrize("build", [left_deep_sum, nested_negations])
+def test_deep_trees(build):
+    """
+    测试很深的语法树既不会在编译时也不会在求值时递归溢出
+    """
+    tree: TreeNode = build(20_000)
+    expected, actual = run_both(tree)
+    assert actual == expected
+    assert not isinstance(actual, tuple)
+
+
+def test_unknown_node():
+    """
+    测试不能编译的节点
+    """
+    with pytest.raises(RuntimeError, match="Can't compile Program"):
+        ClosureCompiler(ExprStatement(Program([]))).compile()  # type: ignore[arg-type]
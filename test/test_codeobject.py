@@ -0,0 +1,83 @@
+"""
+代码对象测试
+"""
+import sys
+
+import pytest
+
+from python.codeobject import CodeObject, assemble
+from python.compiler import Bytecode, BytecodeType, Compiler
+from python.interpreter import Interpreter
+from python.parser import Parser
+from python.tokenizer import Tokenizer
+
+CODES: list[str] = [
+    "3 + 5",
+    "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3",
+    "--+(1 + 2) * -(3.0 - +4) ** 2 ** -0.5",
+    "0.0 - -0.0\n1 + 1.0\n-0.0",
+    "",
+]
+
+
+def compile_code(code: str) -> list[Bytecode]:
+    """
+    编译源代码
+    """
+    return list(Compiler(Parser(list(Tokenizer(code))).parse()).compile())
+
+
+def run(bytecode: list[Bytecode] | CodeObject) -> tuple:
+    """
+    运行字节码，返回最后弹出的值和它的类型
+    """
+    interpreter = Interpreter(bytecode)
+    interpreter.interpret()
+    return interpreter.last_value_popped, type(interpreter.last_value_popped), interpreter.stack.stack
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_code_object_round_trips(code: str):
+    """
+    测试代码对象可以转换回相同的 Bytecode 列表
+    """
+    bytecode = compile_code(code)
+    code_object = assemble(bytecode)
+    assert len(code_object) == len(bytecode)
+    assert code_object.to_bytecode() == bytecode
+    assert [type(bc.value) for bc in code_object] == [type(bc.value) for bc in bytecode]
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_interpreter_runs_code_objects(code: str):
+    """
+    测试直接执行代码对象与执行 Bytecode 列表的结果相同
+    """
+    bytecode = compile_code(code)
+    assert run(assemble(bytecode)) == run(bytecode)
+
+
+def test_constants_are_deduplicated():
+    """
+    测试常量去重，但 1 与 1.0、0.0 与 -0.0 是不同的常量
+    """
+    code_object = assemble(compile_code("1 + 1\n1.0 * 1\n0.0 - -0.0 + 0.0"))
+    assert code_object.consts == (1, None, 1.0, 0.0)
+    assert [str(value) for value in assemble([Bytecode(BytecodeType.PUSH, -0.0)]).consts] == ["-0.0"]
+
+
+def test_assembler_rejects_unknown_operators():
+    """
+    测试未知的运算符会报错
+    """
+    with pytest.raises(RuntimeError, match="Unknown operator //"):
+        assemble([Bytecode(BytecodeType.BINOP, "//")])
+
+
+def test_code_objects_are_compact():
+    """
+    测试代码对象比 Bytecode 列表小得多
+    """
+    bytecode = compile_code("1 + 2 * 3 - 4 / 5\n" * 1000)
+    list_size = sys.getsizeof(bytecode) + sum(sys.getsizeof(bc) + sys.getsizeof(bc.__dict__) for bc in bytecode)
+    assert assemble(bytecode).nbytes * 10 < list_size
@@ -0,0 +1,89 @@
+"""
+求值缓存测试
+"""
+import sys
+
+import pytest
+
+from python.evalcache import CacheLevel, EvaluationCache, estimate_size, evaluate
+from python.interpreter import Interpreter
+from python.parser import Parser
+from python.stackcompiler import StackCompiler
+from python.tokenizer import Tokenizer
+
+
+def run_computation(code: str):
+    """
+    不经过缓存运行源代码
+    """
+    return Interpreter(StackCompiler(Parser(list(Tokenizer(code))).parse()).compile_to_list()).run()
+
+
+@pytest.mark.parametrize("levels", [[], [CacheLevel.RESULT], [CacheLevel.TOKENS, CacheLevel.AST], list(CacheLevel)])
+@pytest.mark.parametrize("code", ["1 + 2 * 3", "5 ** -3 / 5\n-2.5", "2 ** 300 % 17", ""])
+def test_cached_evaluation_matches_interpreter(levels: list[CacheLevel], code: str):
+    """
+    测试任何级别组合下，多次求值的结果都与直接运行相同
+    """
+    cache = EvaluationCache(levels)
+    assert [cache.evaluate(code) for _ in range(3)] == [run_computation(code)] * 3
+    assert {level for level, _ in cache.entries} == set(levels)
+
+
+def test_lower_levels_are_used_when_results_are_not_cached():
+    """
+    测试结果没有缓存时使用下一级的缓存
+    """
+    cache = EvaluationCache([CacheLevel.RESULT, CacheLevel.BYTECODE])
+    cache.evaluate("1 + 2")
+    cache.entries.pop((CacheLevel.RESULT, "1 + 2"))
+    assert cache.evaluate("1 + 2") == 3
+    assert cache.metrics.hits == {CacheLevel.BYTECODE: 1}
+    assert cache.metrics.misses == {CacheLevel.RESULT: 2, CacheLevel.BYTECODE: 1}
+    assert cache.metrics.hit_rate() == 0.0
+    assert cache.metrics.hit_rate(CacheLevel.BYTECODE) == 0.5
+
+
+def test_least_recently_used_entries_are_evicted_by_count():
+    """
+    测试条目数超过限制时淘汰最久没有用过的条目
+    """
+    cache = EvaluationCache([CacheLevel.RESULT], max_entries=2)
+    for code in ["1", "2", "1", "3"]:
+        cache.evaluate(code)
+    assert [source for _, source in cache.entries] == ["1", "3"]
+    assert cache.metrics.evictions == 1
+
+
+def test_entries_are_evicted_by_size():
+    """
+    测试按字节数淘汰条目，比整个预算还大的结果不会被缓存
+    """
+    max_bytes: int = estimate_size(CacheLevel.RESULT, 2**20000) + sys.getsizeof("2 ** 20000") + 8
+    cache = EvaluationCache([CacheLevel.RESULT], max_bytes=max_bytes)
+    cache.evaluate("1")
+    cache.evaluate("2 ** 20000")
+    assert list(cache.entries) == [(CacheLevel.RESULT, "2 ** 20000")]
+    assert cache.evaluate("2 ** 40000") == 2**40000
+    assert cache.metrics.oversized == 1
+    assert cache.nbytes == sum(size for _, size in cache.entries.values()) <= max_bytes
+
+
+def test_errors_are_not_cached():
+    """
+    测试运行时出错的程序每次都抛出异常，但编译结果仍然被缓存
+    """
+    cache = EvaluationCache()
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            cache.evaluate("1 / 0")
+    assert list(cache.entries) == [(CacheLevel.BYTECODE, "1 / 0")]
+
+
+def test_front_door_uses_the_cache():
+    """
+    测试 evaluate 函数使用传入的缓存
+    """
+    cache = EvaluationCache()
+    assert evaluate("6 * 7", cache) == evaluate("6 * 7", cache) == evaluate("6 * 7") == 42
+    assert cache.metrics.hits[CacheLevel.RESULT] == 1
@@ -0,0 +1,103 @@
+"""
+快速解释器测试
+"""
+from array import array
+
+import pytest
+
+from python.codeobject import CodeObject, assemble, stack_depth
+from python.compiler import Bytecode, BytecodeType, Compiler
+from python.fastvm import FastInterpreter
+from python.image import BytecodeImage, dumps_image
+from python.interpreter import Interpreter
+from python.parser import Parser
+from python.tokenizer import Tokenizer
+
+
+def compile_code(code: str) -> list[Bytecode]:
+    """
+    编译源代码
+    """
+    return list(Compiler(Parser(list(Tokenizer(code))).parse()).compile())
+
+
+@pytest.mark.parametrize(
+    ["code", "depth"],
+    [
+        ("", 0),
+        ("1", 1),
+        ("1 + 2 * 3", 3),
+        ("1 * 2 + 3", 2),
+        ("2 ** 2 ** 2 ** 2 ** 2", 5),
+        ("-(1 + (2 - (3 * 4)))\n5", 4),
+    ],
+)
+def test_stack_depth(code: str, depth: int):
+    """
+    测试计算栈的最大深度
+    """
+    assert stack_depth(compile_code(code)) == depth
+    assert FastInterpreter(compile_code(code)).max_depth == depth
+
+
+@pytest.mark.parametrize(
+    "code",
+    ["3 + 5", "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3", "--+(1 + 2) * -(3.0 - +4) ** 2 ** -0.5", "", "2 ** 300 % 7"],
+)
+def test_fast_interpreter_matches_interpreter(code: str):
+    """
+    测试与 Interpreter 的结果相同
+    """
+    expected = Interpreter(compile_code(code)).run()
+    assert FastInterpreter(compile_code(code)).run() == expected
+    assert FastInterpreter(assemble(compile_code(code))).run() == expected
+
+
+def test_runtime_errors_leave_consistent_state():
+    """
+    测试运行时出错时保留已经弹出的值和栈上的值
+    """
+    interpreter = FastInterpreter(compile_code("7\n1 + 1 / 0"))
+    with pytest.raises(ZeroDivisionError):
+        interpreter.run()
+    assert interpreter.last_value_popped == 7
+    assert interpreter.stack.stack == [1, 1]
+
+
+def test_fast_interpreter_runs_images():
+    """
+    测试能运行字节码镜像，镜像的操作码是 uint32 的 memoryview
+    """
+    image = BytecodeImage(dumps_image(compile_code("1 + 2 * 3\n4 - 5")))
+    assert stack_depth(image) == 3
+    assert FastInterpreter(image).run() == -1
+
+
+@pytest.mark.parametrize(
+    ["bytecode", "message"],
+    [
+        ([Bytecode(BytecodeType.POP)], "Stack underflow at instruction 0"),
+        ([Bytecode(BytecodeType.PUSH, 1), Bytecode(BytecodeType.BINOP, "+")], "Stack underflow at instruction 1"),
+        ([Bytecode(BytecodeType.PUSH, 1)], "Unbalanced stack, 1 values"),
+        ([Bytecode(BytecodeType.PUSH, 1), Bytecode(BytecodeType.UNARYOP, "*")], "Bad argument"),
+        ([Bytecode(BytecodeType.BINOP, "//")], "Unknown operator //"),
+    ],
+)
+def test_malformed_bytecode_is_rejected_at_load_time(bytecode: list[Bytecode], message: str):
+    """
+    测试格式不对的字节码在加载时就被拒绝
+    """
+    with pytest.raises(RuntimeError, match=message):
+        FastInterpreter(bytecode)
+
+
+@pytest.mark.parametrize(
+    ["opcodes", "args", "message"],
+    [(b"\x09", [0], "Bad opcode 9"), (b"\x02\x03", [5, 0], "Bad argument 5"), (b"\x00", [99], "Bad argument 99")],
+)
+def test_malformed_code_objects_are_rejected(opcodes: bytes, args: list[int], message: str):
+    """
+    测试操作码或者参数无效的代码对象会被拒绝
+    """
+    with pytest.raises(RuntimeError, match=message):
+        stack_depth(CodeObject(opcodes, array("I", args), (None,)))
@@ -0,0 +1,107 @@
+"""
+常量折叠测试
+"""
+import pytest
+
+from python.compiler import Compiler
+from python.folding import ConstantFolder, FoldingLimits, fold_constants
+from python.interpreter import Interpreter
+from python.parser import BinOp, ExprStatement, Float, Int, Parser, Program, UnaryOp
+from python.tokenizer import Tokenizer
+
+
+def run(tree) -> int | float:
+    """
+    编译并运行语法树
+    """
+    interpreter = Interpreter(list(Compiler(tree).compile()))
+    interpreter.interpret()
+    return interpreter.last_value_popped
+
+
+def parse(code: str) -> Program:
+    """
+    解析源代码
+    """
+    return Parser(list(Tokenizer(code))).parse()
+
+
+@pytest.mark.parametrize(
+    ["code", "folded"],
+    [
+        ("1 + 2", Int(3)),
+        ("-3", Int(-3)),
+        ("+3.5", Float(3.5)),
+        ("--++-++-+3", Int(3)),
+        ("2 + 3 * 4 ** 5 - 6 % 7 / 8", Float(3073.25)),
+        ("-2 ** 10", Int(-1024)),
+        ("5 ** -3 / 5", Float(0.0016)),
+        ("(((1))) + (2 + (3))", Int(6)),
+    ],
+)
+def test_folds_constant_expressions(code: str, folded):
+    """
+    测试把常量表达式折叠成一个字面量
+    """
+    assert fold_constants(parse(code)) == Program([ExprStatement(folded)])
+    assert run(fold_constants(parse(code))) == run(parse(code))
+
+
+def test_folding_does_not_modify_the_input():
+    """
+    测试不修改输入的语法树，没有变化的子树原样返回
+    """
+    tree = parse("1 + 2\n3 / 0")
+    folded = fold_constants(tree)
+    assert tree == parse("1 + 2\n3 / 0")
+    assert folded.statements[1] is tree.statements[1]
+
+
+@pytest.mark.parametrize("code", ["1 / 0", "5 % (2 - 2)", "0.0 ** -1", "2 ** 1.5 / (3 * 0)", "10 ** 400 / 3.0"])
+def test_operations_that_raise_are_not_folded(code: str):
+    """
+    测试会抛出异常的运算保持原样，运行时抛出相同的异常
+    """
+    folded = fold_constants(parse(code))
+    assert isinstance(folded.statements[0].expr, BinOp)
+    with pytest.raises(ArithmeticError) as expected:
+        run(parse(code))
+    with pytest.raises(expected.type):
+        run(folded)
+
+
+def test_partial_folding():
+    """
+    测试只折叠可以折叠的子树
+    """
+    assert fold_constants(parse("(1 + 1) / (3 - 3) + 2 * 3")) == Program(
+        [ExprStatement(BinOp("+", BinOp("/", Int(2), Int(0)), Int(6)))]
+    )
+
+
+def test_huge_results_are_not_folded():
+    """
+    测试结果过大的整数运算不折叠
+    """
+    assert fold_constants(BinOp("**", Int(2), Int(100_000))) == BinOp("**", Int(2), Int(100_000))
+    assert fold_constants(BinOp("**", Int(2), Int(100))) == Int(2**100)
+    limits = FoldingLimits(max_int_bits=64)
+    assert fold_constants(BinOp("**", Int(2), Int(100)), limits) == BinOp("**", Int(2), Int(100))
+    assert fold_constants(BinOp("*", Int(2**40), Int(2**40)), limits) == BinOp("*", Int(2**40), Int(2**40))
+    assert fold_constants(BinOp("**", Int(-1), Int(10**30))) == Int(1)
+
+
+def test_complex_results_are_not_folded():
+    """
+    测试结果是复数的运算不折叠
+    """
+    assert fold_constants(BinOp("**", UnaryOp("-", Int(8)), Float(0.5))) == BinOp("**", Int(-8), Float(0.5))
+
+
+def test_folder_counts_folded_operations():
+    """
+    测试统计折叠的运算数量
+    """
+    folder = ConstantFolder()
+    folder.fold(parse("1 + 2 * 3\n-4"))
+    assert folder.folded == 3
@@ -0,0 +1,68 @@
+"""
+哈希共享语法树测试
+"""
+import pytest
+
+from python.compiler import Compiler
+from python.hashcons import HashConsingParser, NodeInterner
+from python.parser import BinOp, Float, Int, Parser, UnaryOp
+from python.tokenizer import Tokenizer
+
+CODE: str = "(1 + 2) * (1 + 2)\n-(1 + 2) ** 2.5\n(1 + 2) * (1 + 2)\n0.0 - -0.0 + 1.0 + 1"
+
+
+def test_hash_consing_parser_matches_parser():
+    """
+    测试共享子树的语法树与 Parser 的结果相等
+    """
+    assert HashConsingParser(list(Tokenizer(CODE))).parse() == Parser(list(Tokenizer(CODE))).parse()
+
+
+def test_hash_consing_parser_shares_identical_subtrees():
+    """
+    测试结构相同的子树是同一个对象
+    """
+    parser = HashConsingParser(list(Tokenizer(CODE)))
+    first, second, third, _ = (statement.expr for statement in parser.parse().statements)
+    assert first.left is first.right
+    assert first.left is second.value.left
+    assert first is third
+    assert parser.interner.structural_hash(first) == parser.interner.structural_hash(third)
+
+
+def test_hash_consing_keeps_distinct_literals_apart():
+    """
+    测试 1 与 1.0、0.0 与 -0.0 不会被共享
+    """
+    interner = NodeInterner()
+    assert interner.int_node(1) is not interner.float_node(1.0)
+    assert interner.float_node(0.0) is not interner.float_node(-0.0)
+    assert interner.float_node(0.5) is interner.float_node(0.5)
+
+
+def test_compiler_output_is_unchanged_by_sharing():
+    """
+    测试编译共享子树的语法树得到相同的字节码
+    """
+    shared = HashConsingParser(list(Tokenizer(CODE))).parse()
+    plain = Parser(list(Tokenizer(CODE))).parse()
+    assert list(Compiler(shared).compile()) == list(Compiler(plain).compile())
+
+
+@pytest.mark.parametrize(
+    "tree",
+    [
+        BinOp("+", UnaryOp("-", Int(3)), Float(2.5)),
+        BinOp("*", BinOp("+", Int(1), Int(2)), BinOp("+", Int(1), Int(2))),
+    ],
+)
+def test_intern_existing_tree(tree):
+    """
+    测试驻留已有的语法树
+    """
+    interner = NodeInterner()
+    interned = interner.intern(tree)
+    assert interned == tree
+    assert interner.intern(tree) is interned
+    other = NodeInterner()
+    assert interner.structural_hash(interned) == other.structural_hash(other.intern(tree))
@@ -0,0 +1,140 @@
+"""
+字节码映像测试
+"""
+import pytest
+
+from python.codeobject import CodeObject, assemble
+from python.compiler import Bytecode, BytecodeType, Compiler
+from python.image import BytecodeImage, dumps_image, load_image, write_image
+from python.interpreter import Interpreter
+from python.parser import Parser
+from python.tokenizer import Tokenizer
+
+CODES: list[str] = [
+    "3 + 5",
+    "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3.5",
+    f"{2**200} - {-(2**70)} * -0.0\n-1\n255 + 256 + -128 + -129",
+    "",
+]
+
+
+def compile_code(code: str) -> list[Bytecode]:
+    """
+    编译源代码
+    """
+    return list(Compiler(Parser(list(Tokenizer(code))).parse()).compile())
+
+
+def run(bytecode) -> tuple:
+    """
+    运行字节码，返回最后弹出的值和它的类型
+    """
+    interpreter = Interpreter(bytecode)
+    interpreter.interpret()
+    return interpreter.last_value_popped, type(interpreter.last_value_popped)
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_image_round_trips(code: str):
+    """
+    测试映像可以读出相同的指令和常量
+    """
+    bytecode = compile_code(code)
+    image = BytecodeImage(dumps_image(bytecode))
+    image.verify()
+    assert image.to_bytecode() == bytecode
+    assert image == assemble(bytecode)
+    assert [image.consts[index] for index in range(len(image.consts))] == list(assemble(bytecode).consts)
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_interpreter_runs_mapped_images(code: str, tmp_path):
+    """
+    测试直接执行 mmap 打开的映像与执行字节码列表的结果相同
+    """
+    bytecode = compile_code(code)
+    write_image(bytecode, tmp_path / "program.bpci")
+    with load_image(tmp_path / "program.bpci") as image:
+        assert run(image) == run(bytecode)
+
+
+def test_constants_are_decoded_lazily():
+    """
+    测试常量在第一次用到时才解码
+    """
+    image = BytecodeImage(dumps_image(compile_code("1 + 2.5")))
+    assert not dict.__len__(image.consts)
+    assert image.consts[1] == 2.5
+    assert dict(image.consts) == {1: 2.5}
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"BPCA" + bytes(32),
+        dumps_image(compile_code("1 + 2"))[:-1],
+        dumps_image(compile_code("1 + 2")) + b"\0",
+        dumps_image(compile_code("1 + 2")).replace(b"BPCI\x01", b"BPCI\x02"),
+    ],
+)
+def test_bad_images_are_rejected(data: bytes):
+    """
+    测试格式不对的映像会报错
+    """
+    with pytest.raises(RuntimeError):
+        BytecodeImage(data)
+
+
+@pytest.mark.parametrize("operand", [("+", 1, 2.5), ("*", -3)])
+def test_fused_operands_round_trip(operand: tuple):
+    """
+    测试超级指令的常量可以存入映像
+    """
+    code = CodeObject(consts=(operand,))
+    assert BytecodeImage(dumps_image(code)).consts[0] == operand
+
+
+@pytest.mark.parametrize("operand", [("?", 1), ("+",), ("+", 1, 2, 3), ("+", "1"), ("+", True), ([], 1), (1, 2)])
+def test_bad_fused_operands_are_rejected(operand: tuple):
+    """
+    测试映像中格式不对的元组常量会报错
+    """
+    image = BytecodeImage(dumps_image(CodeObject(consts=(operand,))))
+    with pytest.raises(RuntimeError, match="Corrupted image: bad constant 0"):
+        image.consts[0]  # pylint: disable=W0104
+
+
+def test_corrupted_instructions_are_detected(tmp_path):
+    """
+    测试损坏的操作码、参数和常量会报错
+    """
+    header_size: int = len(dumps_image([]))
+    data = bytearray(dumps_image([Bytecode(BytecodeType.PUSH, 1), Bytecode(BytecodeType.POP)]))
+    data[header_size + 4] = 9  # The PUSH argument points past the constants.
+    with pytest.raises(RuntimeError, match="bad argument"):
+        BytecodeImage(data).verify()
+    with pytest.raises(RuntimeError, match="bad constant index"):
+        run(BytecodeImage(data))
+    data[header_size] = 200  # Not an opcode.
+    with pytest.raises(RuntimeError, match="bad opcode"):
+        run(BytecodeImage(data))
+    (tmp_path / "empty.bpci").write_bytes(b"")
+    with pytest.raises(RuntimeError, match="Truncated"):
+        load_image(tmp_path / "empty.bpci")
+    (tmp_path / "bad.bpci").write_bytes(b"BPCA" + bytes(32))
+    with pytest.raises(RuntimeError, match="Not a bytecode image"):
+        load_image(tmp_path / "bad.bpci")
+
+
+@pytest.mark.parametrize("opcode", [BytecodeType.BINOP, BytecodeType.UNARYOP])
+def test_corrupted_operator_arguments_are_reported(opcode: BytecodeType):
+    """
+    测试运算符编码越界的指令在执行时报告映像损坏，而不是 IndexError
+    """
+    header_size: int = len(dumps_image([]))
+    data = bytearray(dumps_image(compile_code("1 + -2")))
+    index: int = [bc.type for bc in compile_code("1 + -2")].index(opcode)
+    data[header_size + index * 8 + 4] = 99
+    with pytest.raises(RuntimeError, match="Corrupted image: bad argument 99"):
+        run(BytecodeImage(data))
@@ -0,0 +1,54 @@
+"""
+并行前端测试
+"""
+import pytest
+
+from python.compiler import Compiler
+from python.parallel import compile_file, compile_source, split_source
+from python.parser import Parser
+from python.tokenizer import Tokenizer
+
+CODE: str = "\n".join(f"{i} + {i}.5 * -(2 ** {i % 4}) % 7" for i in range(200)) + "\n\n\n1 / 3"
+
+
+def compile_sequentially(code: str):
+    """
+    顺序编译整个程序
+    """
+    return list(Compiler(Parser(list(Tokenizer(code))).parse()).compile())
+
+
+def test_split_source_ends_chunks_after_newlines():
+    """
+    测试切分的区间首尾相接并且在换行符之后结束
+    """
+    ranges = split_source(CODE, chunk_size=100)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(CODE)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and CODE[end - 1] == "\n"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_compile_source_matches_sequential_compilation(workers: int):
+    """
+    测试并行编译的字节码与顺序编译相同
+    """
+    assert compile_source(CODE, workers=workers, chunk_size=100) == compile_sequentially(CODE)
+
+
+@pytest.mark.parametrize("code", [CODE, ""])
+def test_compile_file_matches_sequential_compilation(code: str, tmp_path):
+    """
+    测试并行编译文件
+    """
+    path = tmp_path / "program.txt"
+    path.write_text(code)
+    assert compile_file(path, workers=2, chunk_size=100) == compile_sequentially(code)
+
+
+def test_compile_source_reports_errors():
+    """
+    测试某个区间中的语法错误
+    """
+    with pytest.raises(RuntimeError):
+        compile_source("1 + 2\n" * 50 + "3 +\n" + "4\n" * 50, workers=2, chunk_size=20)
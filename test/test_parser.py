@@ -1,10 +1,25 @@
 """
 解析器测试
 """
+import io
+
 import pytest
 
-from python.parser import BinOp, ExprStatement, Float, Int, Parser, Program, UnaryOp
+from python.parser import (
+    BinOp,
+    Expr,
+    ExprStatement,
+    Float,
+    Int,
+    Parser,
+    Program,
+    TokenStreamParser,
+    UnaryOp,
+    dump_ast,
+    print_ast,
+)
 from python.tokenizer import Token, Tokenizer, TokenType
+from python.tokenstream import TokenStream
 
 
 def test_parsing_addition():
@@ -428,3 +443,96 @@ def test_parsing_multiple_statements():
             ),
         ]
     )
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3",
+        "\n\n(((1.5))) + (2 + (.3))\n\n",
+        "--++-++-+3 * 73. - 4 ** -2 ** 3",
+    ],
+)
+def test_parser_accepts_token_stream(code: str):
+    """
+    测试解析器直接解析紧凑标记流
+    """
+    assert TokenStreamParser(TokenStream(code)).parse() == Parser(list(Tokenizer(code))).parse()
+
+
+@pytest.mark.parametrize("code", ["1 +", "(2.5 * 3", "4 5", "2 ** )"])
+def test_token_stream_errors_match_list(code: str):
+    """
+    测试解析紧凑标记流时报出与标记列表相同的错误
+    """
+    with pytest.raises(RuntimeError) as expected:
+        Parser(list(Tokenizer(code))).parse()
+    with pytest.raises(RuntimeError) as actual:
+        TokenStreamParser(TokenStream(code)).parse()
+    assert str(actual.value) == str(expected.value)
+
+
+def test_print_ast_format(capsys):
+    """
+    测试打印语法树的格式
+    """
+    print_ast(Parser(list(Tokenizer("1 % -2\n2 ** 3.5"))).parse())
+    assert capsys.readouterr().out == (
+        "Program([\n"
+        "    ExprStatement(\n"
+        "        BinOp(\n"
+        "            '%',\n"
+        "            Int(1),\n"
+        "            UnaryOp(\n"
+        "                '-',\n"
+        "                Int(2),\n"
+        "            ),\n"
+        "        ),\n"
+        "    ),\n"
+        "    ExprStatement(\n"
+        "        BinOp(\n"
+        "            '**',\n"
+        "            Int(2),\n"
+        "            Float(3.5),\n"
+        "        ),\n"
+        "    ),\n"
+        ",\n"
+        "])\n"
+    )
+
+
+def test_dump_ast_compact_format():
+    """
+    测试单行格式
+    """
+    file = io.StringIO()
+    dump_ast(Parser(list(Tokenizer("1 % -2\n2 ** 3.5"))).parse(), file, compact=True)
+    assert file.getvalue() == (
+        "Program([ExprStatement(BinOp('%', Int(1), UnaryOp('-', Int(2)))), "
+        "ExprStatement(BinOp('**', Int(2), Float(3.5)))])\n"
+    )
+
+
+def test_dump_ast_handles_deep_trees():
+    """
+    测试很深的语法树不会导致递归错误，并且分块写入文本流
+    """
+    writes: list[str] = []
+
+    class RecordingFile(io.StringIO):
+        """
+        记录每次写入
+        """
+
+        def write(self, text: str, /) -> int:
+            writes.append(text)
+            return super().write(text)
+
+    depth = 2_000  # The indentation makes the output quadratic in the depth.
+    tree: Expr = Int(1)
+    for _ in range(depth):
+        tree = UnaryOp("-", tree)
+    file = RecordingFile()
+    dump_ast(tree, file)
+    assert file.getvalue().count("UnaryOp(") == depth
+    assert len(writes) > 1
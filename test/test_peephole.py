@@ -0,0 +1,93 @@
+"""
+窥孔优化测试
+"""
+import random
+
+import pytest
+
+from python.compiler import Bytecode, BytecodeType, Compiler
+from python.interpreter import Interpreter
+from python.parser import Parser
+from python.peephole import PeepholeOptimizer, PeepholeRule, optimize_bytecode
+from python.tokenizer import Tokenizer
+
+
+def compile_code(code: str) -> list[Bytecode]:
+    """
+    编译源代码
+    """
+    return list(Compiler(Parser(list(Tokenizer(code))).parse()).compile())
+
+
+def run(bytecode: list[Bytecode]) -> int | float | str:
+    """
+    运行字节码，返回最后弹出的值或者异常的类型名
+    """
+    interpreter = Interpreter(bytecode)
+    try:
+        interpreter.interpret()
+    except ArithmeticError as error:
+        return error.__class__.__name__
+    return interpreter.last_value_popped
+
+
+def random_expression(rng: random.Random, depth: int) -> str:
+    """
+    随机生成带有很多一元运算符的表达式
+    """
+    if depth <= 0 or rng.random() < 0.2:
+        literal: str = rng.choice([str(rng.randrange(10)), f"{rng.randrange(10)}.{rng.randrange(10)}"])
+        return "".join(rng.choices("+-", k=rng.randrange(4))) + literal
+    left, right = random_expression(rng, depth - 1), random_expression(rng, depth - 1)
+    prefix: str = "".join(rng.choices("+-", k=rng.randrange(3)))
+    return f"{prefix}({left} {rng.choice(['+', '-', '*', '/', '%'])} {right})"
+
+
+@pytest.mark.parametrize(
+    ["code", "optimized"],
+    [
+        ("+3", [Bytecode(BytecodeType.PUSH, 3)]),
+        ("-3", [Bytecode(BytecodeType.PUSH, -3)]),
+        ("--+-+-2.5", [Bytecode(BytecodeType.PUSH, 2.5)]),
+        ("--(1 + 2)", compile_code("1 + 2")[:-1]),
+        ("-+-(1 + 2)", compile_code("1 + 2")[:-1]),
+        ("---(1 + 2)", compile_code("-(1 + 2)")[:-1]),
+    ],
+)
+def test_redundant_unary_operators_are_removed(code: str, optimized: list[Bytecode]):
+    """
+    测试删掉多余的一元运算
+    """
+    assert optimize_bytecode(compile_code(code)) == optimized + [Bytecode(BytecodeType.POP)]
+
+
+def test_removed_instructions_are_counted_per_rule():
+    """
+    测试按规则统计删掉的指令数
+    """
+    optimizer = PeepholeOptimizer()
+    optimizer.optimize(compile_code("+-3\n--(1 + 2)\n1 - 2"))
+    assert optimizer.removed == {"unary_plus": 1, "negate_constant": 1, "double_negation": 2}
+
+
+def test_rules_must_shrink_the_bytecode():
+    """
+    测试不缩短字节码的规则会报错
+    """
+    optimizer = PeepholeOptimizer((PeepholeRule("identity", 1, lambda window: window),))
+    with pytest.raises(RuntimeError):
+        optimizer.optimize(compile_code("1"))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_optimized_bytecode_gives_the_same_results(seed: int):
+    """
+    差分测试：随机程序优化前后每条语句的结果（或异常）相同
+    """
+    rng = random.Random(seed)
+    for _ in range(50):
+        bytecode: list[Bytecode] = compile_code(random_expression(rng, 4))
+        optimized: list[Bytecode] = optimize_bytecode(bytecode)
+        assert run(optimized) == run(bytecode)
+        assert optimize_bytecode(optimized) == optimized
+        assert not any(bc.type == BytecodeType.UNARYOP and bc.value == "+" for bc in optimized)
@@ -0,0 +1,70 @@
+"""
+迭代式优先级解析器测试
+"""
+import pytest
+
+from python.parser import BinOp, Int, Parser, UnaryOp
+from python.precedence import PrecedenceParser, TokenStreamPrecedenceParser
+from python.tokenizer import Tokenizer
+from python.tokenstream import TokenStream
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "3 + 5",
+        "1 - 2 + 3 - 4 + 5 - 6",
+        "2 + 3 * 4 ** 5 - 6 % 7 / 8",
+        "--++-++-+3",
+        "-2 ** -3",
+        "2 ** -3 ** 2 * 4",
+        "2 ** 3 ** 4 ** 5",
+        "-(3 + 2) * -(((1))) ** (2 + (3))",
+        "(2 - 3) - (5 - 6) % .5 / 73.",
+        "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3",
+        "\n\n1\n\n(2)\n",
+    ],
+)
+def test_precedence_parser_matches_parser(code: str):
+    """
+    测试与递归下降解析器产生相同的语法树
+    """
+    expected = Parser(list(Tokenizer(code))).parse()
+    assert PrecedenceParser(list(Tokenizer(code))).parse() == expected
+    assert TokenStreamPrecedenceParser(TokenStream(code)).parse() == expected
+
+
+@pytest.mark.parametrize("code", ["1 +", "(1 + 2", "((1) + 2", "1 + 2)", "* 3", "()", "1 2", "(3))"])
+def test_precedence_parser_raises_same_errors(code: str):
+    """
+    测试语法错误与递归下降解析器相同
+    """
+    with pytest.raises(RuntimeError) as expected:
+        Parser(list(Tokenizer(code))).parse()
+    with pytest.raises(RuntimeError) as actual:
+        PrecedenceParser(list(Tokenizer(code))).parse()
+    assert str(actual.value) == str(expected.value)
+    with pytest.raises(RuntimeError) as actual:
+        TokenStreamPrecedenceParser(TokenStream(code)).parse()
+    assert str(actual.value) == str(expected.value)
+
+
+def test_precedence_parser_handles_deep_nesting():
+    """
+    测试深度嵌套不会导致递归错误
+    """
+    depth = 20_000
+    tree = PrecedenceParser(list(Tokenizer("(" * depth + "1" + ")" * depth))).parse_computation()
+    assert tree == Int(1)
+
+    tree = PrecedenceParser(list(Tokenizer("-" * depth + "1"))).parse_computation()
+    for _ in range(depth):
+        assert isinstance(tree, UnaryOp) and tree.op == "-"
+        tree = tree.value
+    assert tree == Int(1)
+
+    tree = PrecedenceParser(list(Tokenizer(" ** ".join(["2"] * depth)))).parse_computation()
+    for _ in range(depth - 1):
+        assert isinstance(tree, BinOp) and tree.op == "**" and tree.left == Int(2)
+        tree = tree.right
+    assert tree == Int(2)
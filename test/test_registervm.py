@@ -0,0 +1,107 @@
+"""
+寄存器虚拟机测试
+"""
+from typing import Any, Callable
+
+import pytest
+
+from python.codeobject import stack_depth
+from python.compiler import Bytecode, BytecodeType, Compiler
+from python.interpreter import Interpreter
+from python.parser import Parser
+from python.peephole import optimize_bytecode
+from python.registervm import RegisterInterpreter, translate
+from python.superinstructions import fuse_superinstructions
+from python.tokenizer import Tokenizer
+
+
+def compile_code(code: str) -> list[Bytecode]:
+    """
+    编译源代码
+    """
+    return list(Compiler(Parser(list(Tokenizer(code))).parse()).compile())
+
+
+def outcome(run: Callable[[], Any]) -> Any:
+    """
+    返回运行的结果或者异常
+    """
+    try:
+        return run()
+    except Exception as error:  # pylint: disable=W0718
+        return error.__class__, str(error)
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "",
+        "3 + 5",
+        "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3",
+        "--+(1 + 2) * -(3.0 - +4) ** 2 ** -0.5",
+        "-0.0\n+-0\n0.0",
+        "2 ** 300 % 7",
+        "7\n1 + 1 / 0\n8",
+        "10.0 ** 400",
+        "(1 + 2) * (3 + 4) - (5 - (6 - (7 - 8)))",
+    ],
+)
+@pytest.mark.parametrize("fuse", [False, True])
+def test_register_vm_matches_interpreter(code: str, fuse: bool):
+    """
+    测试结果、异常和出错时保留的值都与 Interpreter 相同
+    """
+    bytecode: list[Bytecode] = compile_code(code)
+    if fuse:
+        bytecode = fuse_superinstructions(optimize_bytecode(bytecode))
+    interpreter, register_interpreter = Interpreter(bytecode), RegisterInterpreter(bytecode)
+    assert repr(outcome(register_interpreter.run)) == repr(outcome(interpreter.run))
+    assert repr(register_interpreter.last_value_popped) == repr(interpreter.last_value_popped)
+
+
+@pytest.mark.parametrize(
+    ["code", "count", "registers"],
+    [
+        ("", 0, 1),
+        ("5", 1, 2),
+        ("1 + 2", 1, 4),
+        ("1 + 2 * 3", 2, 6),
+        ("+-+1\n1 - 1", 2, 3),
+        ("-(1 + 1)\n1", 3, 3),
+    ],
+)
+def test_instruction_count(code: str, count: int, registers: int):
+    """
+    测试 PUSH 和正号不生成指令，POP 合并到上一条指令中，常量去重
+    """
+    register_code = translate(compile_code(code))
+    assert len(register_code) == count
+    assert len(register_code.registers) == registers
+
+
+def test_temporaries_follow_stack_depth():
+    """
+    测试临时寄存器与栈上的位置对应，数量不超过栈的最大深度
+    """
+    bytecode: list[Bytecode] = compile_code("1 - (2 - (3 - (4 - 5)))\n6 * 7")
+    register_code = translate(bytecode)
+    temporaries: int = len(register_code.registers) - 1 - 7
+    assert temporaries < stack_depth(bytecode)
+    assert register_code.registers[1 + temporaries :] == [1, 2, 3, 4, 5, 6, 7]
+    assert list(register_code) == ["r4 = r8 - r9", "r3 = r7 - r4", "r2 = r6 - r3", "r0 = r5 - r2", "r0 = r10 * r11"]
+
+
+@pytest.mark.parametrize(
+    ["bytecode", "message"],
+    [
+        ([Bytecode(BytecodeType.PUSH, 1), Bytecode(BytecodeType.BINOP, "+")], "Stack underflow at instruction 1"),
+        ([Bytecode(BytecodeType.PUSH, 1), Bytecode(BytecodeType.UNARYOP, "~")], "Unknown operator ~"),
+        ([Bytecode(BytecodeType.PUSH, 1)] * 2 + [Bytecode(BytecodeType.BINOP, "?")], "Unknown operator ?"),
+    ],
+)
+def test_bad_bytecode(bytecode: list[Bytecode], message: str):
+    """
+    测试无法转换的字节码
+    """
+    with pytest.raises(RuntimeError, match=message):
+        translate(bytecode)
@@ -0,0 +1,78 @@
+"""
+扫描器测试
+"""
+import pytest
+
+from python.scanner import Scanner
+from python.tokenizer import Token, Tokenizer, TokenType
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "",
+        "3",
+        "1.2",
+        ".12",
+        "73.",
+        "0.005",
+        "9142351643",
+        "1 + 2 + 3 + 4 - 5 - 6 + 7 - 8",
+        "     1+       2   +3+4-5  -   6 + 7  - 8        ",
+        "( 1 ( 2 ) 3 ( ) 4",
+        "1 * 2 ** 3 * 4 ** 5",
+        "2 *** 3",
+        "1.2.3",
+        "103.6 + 5.4 % 2 / 7",
+        "\n\n\n1 + 2\n\n\n3 + 4\n\n\n",
+        "1\n   \n  2  \n",
+        "   ",
+        "12345678901234567.89",
+    ],
+)
+def test_scanner_matches_tokenizer(code: str):
+    """
+    测试扫描器与分词器产生相同的标记
+    """
+    assert list(Scanner(code)) == list(Tokenizer(code))
+
+
+@pytest.mark.parametrize("code", ["$", "  .  ", "1 + 2\t", "1..", "3 \r\n"])
+def test_scanner_raises_error_on_garbage(code: str):
+    """
+    测试未知字符
+    """
+    with pytest.raises(RuntimeError) as expected:
+        list(Tokenizer(code))
+    with pytest.raises(RuntimeError) as actual:
+        list(Scanner(code))
+    assert str(actual.value) == str(expected.value)
+
+
+def test_scanner_can_keep_literal_text():
+    """
+    测试不解析字面量时，INT 和 FLOAT 标记的值是源代码中的文本
+    """
+    assert list(Scanner("007 + .5 * 1.", parse_literals=False)) == [
+        Token(TokenType.INT, "007"),
+        Token(TokenType.PLUS),
+        Token(TokenType.FLOAT, ".5"),
+        Token(TokenType.MUL),
+        Token(TokenType.FLOAT, "1."),
+        Token(TokenType.NEWLINE),
+        Token(TokenType.EOF),
+    ]
+
+
+def test_scanner_handles_many_blank_lines():
+    """
+    测试大量空行不会导致递归错误
+    """
+    tokens = list(Scanner("1" + "\n" * 100_000 + "2"))
+    assert tokens == [
+        Token(TokenType.INT, 1),
+        Token(TokenType.NEWLINE),
+        Token(TokenType.INT, 2),
+        Token(TokenType.NEWLINE),
+        Token(TokenType.EOF),
+    ]
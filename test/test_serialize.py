@@ -0,0 +1,114 @@
+"""
+语法树序列化测试
+"""
+import io
+
+import pytest
+
+from python.arena import AstArena, NodeKind
+from python.parser import BinOp, Float, Int, Parser, UnaryOp
+from python.precedence import PrecedenceParser
+from python.serialize import HEADER, dump, dumps, dumps_arena, load, loads, loads_arena
+from python.tokenizer import Tokenizer
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "",
+        "3 + 5",
+        "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3",
+        "-(3 + 2) * -(((1))) ** (2 + (3.5)) - 123456789012345678901234567890",
+    ],
+)
+def test_round_trip(code: str):
+    """
+    测试序列化后再读出得到相同的语法树
+    """
+    tree = Parser(list(Tokenizer(code))).parse()
+    assert loads(dumps(tree)) == tree
+
+
+def test_round_trip_through_file():
+    """
+    测试读写二进制文件
+    """
+    tree = BinOp("/", UnaryOp("-", Float(-0.0)), Int(-(10**50)))
+    file = io.BytesIO()
+    dump(tree, file)
+    file.seek(0)
+    assert load(file) == tree
+
+
+def test_round_trip_deep_tree():
+    """
+    测试很深的语法树不受递归深度限制
+    """
+    depth = 20_000
+    tree = PrecedenceParser(list(Tokenizer("-" * depth + "1"))).parse()
+    loaded = loads(dumps(tree)).statements[0].expr
+    for _ in range(depth):
+        assert isinstance(loaded, UnaryOp)
+        loaded = loaded.value
+    assert loaded == Int(1)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"XXXX" + dumps(Int(1))[4:],
+        dumps(Int(1))[:-1],
+        dumps(Int(1))[:4] + b"\xff\xff" + dumps(Int(1))[6:],
+        dumps(Int(1))[: HEADER.size] + b"\x09" + dumps(Int(1))[HEADER.size + 1 :],
+    ],
+)
+def test_loads_rejects_bad_data(data: bytes):
+    """
+    测试损坏的数据
+    """
+    with pytest.raises(RuntimeError):
+        loads(data)
+
+
+@pytest.mark.parametrize(
+    "name, index, value",
+    [
+        ("right", 4, -3),
+        ("right", 4, 4),
+        ("left", 4, 5),
+        ("left", 5, 6),
+        ("left", 0, 3),
+        ("left", 6, 1),
+        ("right", 6, 2),
+        ("children", 0, 6),
+    ],
+)
+def test_loads_rejects_bad_indices(name: str, index: int, value: int):
+    """
+    测试越界的下标和指向后面节点的子节点下标
+    """
+    arena = AstArena.from_tree(Parser(list(Tokenizer("1 + 2 * 3"))).parse())
+    getattr(arena, name)[index] = value
+    with pytest.raises(RuntimeError, match="Corrupted AST data"):
+        loads_arena(dumps_arena(arena))
+
+
+@pytest.mark.parametrize(
+    "name, index, value",
+    [
+        ("kinds", 3, NodeKind.EXPR_STATEMENT),
+        ("kinds", 4, NodeKind.EXPR_STATEMENT),
+        ("kinds", 5, NodeKind.UNARYOP),
+        ("left", 3, 0),
+        ("right", 4, 0),
+    ],
+)
+def test_loads_rejects_bad_structure(name: str, index: int, value: int):
+    """
+    测试语句作为运算的操作数、程序的语句不是表达式语句、一个子节点属于多个父节点
+    """
+    arena = AstArena.from_tree(Parser(list(Tokenizer("1 + 2 * 3"))).parse())
+    getattr(arena, name)[index] = value
+    with pytest.raises(RuntimeError, match="Corrupted AST data: bad nodes"):
+        loads_arena(dumps_arena(arena))
@@ -0,0 +1,74 @@
+"""
+非递归编译器测试
+"""
+import pytest
+
+from python.arena import AstArena
+from python.compiler import Compiler
+from python.parser import BinOp, ExprStatement, Int, Parser, Program, TreeNode, UnaryOp
+from python.stackcompiler import StackCompiler
+from python.tokenizer import Tokenizer
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "3 + 5",
+        "-3.5",
+        "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3",
+        "--(1 + 2) * -(3.0 - +4) ** 2 ** -0.5",
+        "((((1)))) / (2 % (3 - 4)) - 5 ** (6 * 7)\n8\n9.0",
+        "",
+    ],
+)
+def test_stack_compiler_matches_compiler(code: str):
+    """
+    测试与 Compiler 的编译结果相同
+    """
+    tree = Parser(list(Tokenizer(code))).parse()
+    expected = list(Compiler(tree).compile())
+    assert StackCompiler(tree).compile_to_list() == expected
+    assert list(StackCompiler(tree).compile()) == expected
+    assert StackCompiler(AstArena.from_tree(tree)).compile_to_list() == expected
+    for statement in tree.statements:
+        assert StackCompiler(statement.expr).compile_to_list() == list(Compiler(statement.expr).compile())
+
+
+def right_deep_tower(depth: int) -> TreeNode:
+    """
+    构造 2 ** 2 ** ... ** 2 这样向右延伸的语法树
+    """
+    tree: TreeNode = Int(2)
+    for _ in range(depth):
+        tree = BinOp("**", Int(2), tree)
+    return Program([ExprStatement(tree)])
+
+
+def nested_negations(depth: int) -> TreeNode:
+    """
+    构造 -(-(-(...))) 这样深度嵌套的语法树
+    """
+    tree: TreeNode = Int(1)
+    for _ in range(depth):
+        tree = UnaryOp("-", tree)
+    return Program([ExprStatement(tree)])
+
+
+@pytest.mark.parametrize("build", [right_deep_tower, nested_negations])
+def test_stack_compiler_handles_deep_trees(build):
+    """
+    测试深度远超递归限制的语法树
+    """
+    bytecode = StackCompiler(build(100_000)).compile_to_list()
+    assert len(bytecode) == len(StackCompiler(build(100)).compile_to_list()) + (100_000 - 100) * (
+        2 if build is right_deep_tower else 1
+    )
+    assert StackCompiler(build(300)).compile_to_list() == list(Compiler(build(300)).compile())
+
+
+def test_stack_compiler_rejects_unknown_nodes():
+    """
+    测试无法编译的节点会报错
+    """
+    with pytest.raises(RuntimeError, match="Can't compile TreeNode."):
+        StackCompiler(Program([ExprStatement(TreeNode())])).compile_to_list()
@@ -0,0 +1,144 @@
+"""
+流式分词器测试
+"""
+import io
+from typing import Iterator
+
+import pytest
+
+from python.parser import Parser
+from python.streaming import StreamParser, StreamTokenizer
+from python.tokenizer import Token, Tokenizer, TokenType
+
+CODES: list[str] = [
+    "",
+    "1 + 2 + 3 + 4 - 5 - 6 + 7 - 8",
+    "12345 * 678 ** 90 * 1 ** 2",
+    "1.25 + .5 - 73. + 100.0625 ** 2",
+    "\n\n\n1 + 2\n\n\n3 + 4\n\n\n",
+    "( 1 ( 2 ) 3 ( ) 4       \n   \n",
+    "2 *** 3 ** ** 4",
+    "1.2.3 * .4.5",
+]
+
+
+@pytest.mark.parametrize("code", CODES)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_stream_tokenizer_matches_tokenizer(code: str, chunk_size: int):
+    """
+    测试任意块大小下都与 Tokenizer 产生相同的标记
+    """
+    tokens = list(StreamTokenizer(io.StringIO(code), chunk_size=chunk_size))
+    assert tokens == list(Tokenizer(code))
+
+
+@pytest.mark.parametrize("code", CODES)
+def test_stream_tokenizer_accepts_iterable_of_chunks(code: str):
+    """
+    测试字符串块的可迭代对象
+    """
+    chunks = [code[i : i + 5] for i in range(0, len(code), 5)]
+    assert list(StreamTokenizer(chunks)) == list(Tokenizer(code))
+
+
+def test_stream_tokenizer_raises_error_on_garbage():
+    """
+    测试未知字符
+    """
+    with pytest.raises(RuntimeError):
+        list(StreamTokenizer(io.StringIO("1 + 2\n3 $ 4"), chunk_size=3))
+
+
+def test_stream_tokenizer_rejects_plain_strings():
+    """
+    测试直接传入字符串
+    """
+    with pytest.raises(RuntimeError):
+        StreamTokenizer("1 + 2")
+
+
+def test_stream_tokenizer_reads_bounded_chunks():
+    """
+    测试每次只读取一块
+    """
+
+    class RecordingReader(io.StringIO):
+        """
+        记录每次读取的大小
+        """
+
+        def __init__(self, text: str) -> None:
+            super().__init__(text)
+            self.sizes: list[int | None] = []
+
+        def read(self, size: int | None = -1, /) -> str:
+            self.sizes.append(size)
+            return super().read(size)
+
+    reader = RecordingReader("1 + 2\n" * 1000)
+    tokens = list(StreamTokenizer(reader, chunk_size=16))
+    assert len(tokens) == 4 * 1000 + 1
+    assert set(reader.sizes) == {16}
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "",
+        "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3",
+        "\n\n(((1.5))) + (2 + (.3))\n\n--++-++-+3 * 73. - 4 ** -2 ** 3\n",
+    ],
+)
+def test_stream_parser_matches_parser(code: str):
+    """
+    测试逐条产生的语句与 Parser 相同
+    """
+    statements = list(StreamParser(StreamTokenizer(io.StringIO(code), chunk_size=3)))
+    assert statements == Parser(list(Tokenizer(code))).parse().statements
+    assert StreamParser(Tokenizer(code)).parse() == Parser(list(Tokenizer(code))).parse()
+
+
+def test_stream_parser_pulls_tokens_lazily():
+    """
+    测试每条语句只读取它自己的标记和一个前瞻标记
+    """
+    pulled: list[Token] = []
+
+    def recording_tokens():
+        for token in Tokenizer("1 + 2\n3 * 4\n5"):
+            pulled.append(token)
+            yield token
+
+    statements = iter(StreamParser(recording_tokens()))
+    next(statements)
+    assert len(pulled) == 4
+    next(statements)
+    assert len(pulled) == 8
+
+
+def test_stream_parser_raises_error_when_tokens_run_out():
+    """
+    测试标记提前结束
+    """
+    with pytest.raises(RuntimeError):
+        list(StreamParser(iter([Token(TokenType.INT, 1)])))
+
+
+@pytest.mark.parametrize(
+    "code", ["1*2*3*" * 2000 + "4", "2**" * 3000 + "3", "2***" * 3000 + "3"], ids=["products", "powers", "stars"]
+)
+def test_stream_tokenizer_carry_is_bounded(code: str):
+    """
+    测试没有空格的程序：块末尾只留下最后一个可能被切断的标记，标记随着读取陆续产生
+    """
+    tokens: list[Token] = []
+    produced: list[int] = []  # Number of tokens produced before each chunk is read.
+
+    def chunks() -> Iterator[str]:
+        for i in range(0, len(code), 7):
+            produced.append(len(tokens))
+            yield code[i : i + 7]
+
+    tokens.extend(StreamTokenizer(chunks()))
+    assert tokens == list(Tokenizer(code))
+    assert all(later - earlier >= 1 for earlier, later in zip(produced[1:], produced[2:]))
@@ -0,0 +1,119 @@
+"""
+超级指令测试
+"""
+import random
+from collections import Counter
+
+import pytest
+
+from python.codeobject import assemble, stack_depth
+from python.compiler import Bytecode, BytecodeType, Compiler
+from python.fastvm import FastInterpreter
+from python.image import BytecodeImage, dumps_image
+from python.interpreter import Interpreter
+from python.parser import Parser
+from python.peephole import optimize_bytecode
+from python.superinstructions import fuse_superinstructions
+from python.tokenizer import Tokenizer
+
+
+def compile_code(code: str) -> list[Bytecode]:
+    """
+    编译源代码并做窥孔优化
+    """
+    return optimize_bytecode(list(Compiler(Parser(list(Tokenizer(code))).parse()).compile()))
+
+
+def random_expression(rng: random.Random, depth: int) -> str:
+    """
+    随机生成表达式
+    """
+    if depth <= 0 or rng.random() < 0.3:
+        return rng.choice([str(rng.randrange(-9, 10)), f"{rng.randrange(10)}.{rng.randrange(10)}"])
+    return f"({random_expression(rng, depth - 1)} {rng.choice('+-*/%')} {random_expression(rng, depth - 1)})"
+
+
+@pytest.mark.parametrize(
+    ["code", "fused"],
+    [
+        ("1 + 2", [Bytecode(BytecodeType.PUSH_PUSH_BINOP, ("+", 1, 2))]),
+        (
+            "(1 + 2) * 3",
+            [Bytecode(BytecodeType.PUSH_PUSH_BINOP, ("+", 1, 2)), Bytecode(BytecodeType.BINOP_CONST, ("*", 3))],
+        ),
+        (
+            "1 - 2 * 3",
+            [
+                Bytecode(BytecodeType.PUSH, 1),
+                Bytecode(BytecodeType.PUSH_PUSH_BINOP, ("*", 2, 3)),
+                Bytecode(BytecodeType.BINOP, "-"),
+            ],
+        ),
+        ("-1", [Bytecode(BytecodeType.PUSH, -1)]),
+    ],
+)
+def test_common_sequences_are_fused(code: str, fused: list[Bytecode]):
+    """
+    测试把常见的指令序列改写成超级指令
+    """
+    assert fuse_superinstructions(compile_code(code)) == fused + [Bytecode(BytecodeType.POP)]
+
+
+def test_removed_dispatches_are_counted():
+    """
+    测试统计每条规则省掉的指令数
+    """
+    removed: Counter[str] = Counter()
+    fuse_superinstructions(compile_code("1 + 2\n(1 + 2) * 3 / 4"), removed)
+    assert removed == {"push_push_binop": 4, "binop_const": 2}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fused_programs_give_the_same_results(seed: int):
+    """
+    差分测试：随机程序融合前后在各个执行路径上的结果（或异常）相同
+    """
+    rng = random.Random(seed)
+    for _ in range(30):
+        bytecode: list[Bytecode] = compile_code(random_expression(rng, 4))
+        fused: list[Bytecode] = fuse_superinstructions(bytecode)
+        code = assemble(fused)
+        results = []
+        for run in [
+            lambda: Interpreter(bytecode).run(),
+            lambda: Interpreter(fused).run(),
+            lambda: Interpreter(code).run(),
+            lambda: Interpreter(BytecodeImage(dumps_image(code))).run(),
+            lambda: FastInterpreter(code).run(),
+        ]:
+            try:
+                results.append(run())
+            except ArithmeticError as error:
+                results.append(error.__class__)
+        assert results == [results[0]] * len(results)
+        assert stack_depth(code) <= stack_depth(bytecode)
+
+
+def test_malformed_superinstructions_are_rejected():
+    """
+    测试超级指令的常量格式不对时报错
+    """
+    with pytest.raises(RuntimeError, match="Unknown operator //"):
+        Interpreter([Bytecode(BytecodeType.PUSH_PUSH_BINOP, ("//", 1, 2))]).run()
+    bad_operand: list[Bytecode] = [Bytecode(BytecodeType.PUSH, 1), Bytecode(BytecodeType.BINOP_CONST, ("//", 2))]
+    with pytest.raises(RuntimeError, match="Bad argument"):
+        stack_depth(bad_operand + [Bytecode(BytecodeType.POP)])
+    for fused in [bad_operand, [Bytecode(BytecodeType.PUSH_PUSH_BINOP, ("//", 1, 2))]]:
+        with pytest.raises(RuntimeError, match="Unknown operator //"):
+            Interpreter(assemble(fused + [Bytecode(BytecodeType.POP)])).run()
+
+
+def test_operands_with_signed_zeros_are_not_shared():
+    """
+    测试 ('+', 0.0) 与 ('+', -0.0) 是不同的常量
+    """
+    code = assemble(fuse_superinstructions(compile_code("1 + 0.0\n1 + -0.0\n1 + 0.0")))
+    assert [str(operand) for operand in code.consts if isinstance(operand, tuple)] == [
+        "('+', 1, 0.0)",
+        "('+', 1, -0.0)",
+    ]
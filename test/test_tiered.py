@@ -0,0 +1,133 @@
+"""
+分层运行时测试
+"""
+import random
+from functools import partial
+from typing import Any, Callable
+
+import pytest
+
+from python.interpreter import Interpreter
+from python.parser import Parser
+from python.stackcompiler import StackCompiler
+from python.tiered import Tier, TieredRuntime
+from python.tokenizer import Tokenizer
+
+
+def outcome(run: Callable[[], Any]) -> Any:
+    """
+    返回运行的结果或者异常
+    """
+    try:
+        return run()
+    except Exception as error:  # pylint: disable=W0718
+        return error.__class__, str(error)
+
+
+def run_computation(code: str) -> Any:
+    """
+    不经过运行时直接运行源代码
+    """
+    return outcome(Interpreter(StackCompiler(Parser(list(Tokenizer(code))).parse()).compile_to_list()).run)
+
+
+PROMOTED_TIERS: list[Tier] = [Tier.OPTIMIZED, Tier.CLOSURE, Tier.NATIVE]
+
+
+@pytest.mark.parametrize("tier", PROMOTED_TIERS)
+@pytest.mark.parametrize(
+    "code",
+    ["1 + 2 * 3", "5 ** -3 / 5\n-2.5", "2 ** 300 % 17", "", "7\n1 / (2 - 2)", "--+(1 + 2) * -(3.0 - +4) ** 2 ** -0.5"],
+)
+def test_every_tier_matches_interpreter(tier: Tier, code: str):
+    """
+    测试提升前后的结果和异常都与 Interpreter 相同
+    """
+    runtime = TieredRuntime(threshold=2, tier=tier)
+    results: list[Any] = [outcome(lambda: runtime.run(code)) for _ in range(5)]
+    assert [repr(result) for result in results] == [repr(run_computation(code))] * 5
+    assert runtime.stats.runs == {Tier.INTERPRETER: 2, tier: 3}
+    assert runtime.stats.promotions == {tier: 1}
+    assert runtime.tier_of(code) == tier
+
+
+def random_expression(rng: random.Random, depth: int) -> str:
+    """
+    随机生成表达式，包括除以零、溢出和很大的乘方
+    """
+    if depth <= 0 or rng.random() < 0.25:
+        return rng.choice(["0", "1", "2", "3", "7", "0.0", "0.5", "2.5", "99999999.9", "10.0", "-2"])
+    op: str = rng.choice(["+", "-", "*", "/", "%", "**"])
+    right: str = rng.choice(["0.5", "2", "3", "-1", "10000.0"]) if op == "**" else random_expression(rng, depth - 1)
+    return f"{rng.choice(['', '-', '+'])}({random_expression(rng, depth - 1)} {op} {right})"
+
+
+@pytest.mark.parametrize("tier", PROMOTED_TIERS)
+@pytest.mark.parametrize("seed", range(5))
+def test_random_programs_match_interpreter(tier: Tier, seed: int):
+    """
+    随机程序的差分测试：阈值为 0 时每个程序都直接提升，结果和异常都与 Interpreter 相同
+    """
+    rng = random.Random(seed)
+    runtime = TieredRuntime(threshold=0, tier=tier)
+    for _ in range(100):
+        code: str = "\n".join(random_expression(rng, 5) for _ in range(rng.randrange(1, 4)))
+        assert repr(outcome(partial(runtime.run, code))) == repr(run_computation(code)), code
+    assert runtime.stats.runs == {tier: 100}
+
+
+def test_tier_transitions():
+    """
+    测试程序在执行次数超过阈值之后才被提升
+    """
+    runtime = TieredRuntime(threshold=3, tier=Tier.CLOSURE)
+    assert runtime.tier_of("1 + 1") is None
+    tiers: list[Tier | None] = []
+    for _ in range(5):
+        runtime.run("1 + 1")
+        tiers.append(runtime.tier_of("1 + 1"))
+    assert tiers == [Tier.INTERPRETER] * 3 + [Tier.CLOSURE] * 2
+    assert runtime.stats.promotion_seconds > 0
+
+
+def test_threshold_zero_promotes_immediately():
+    """
+    测试阈值为 0 时第一次执行就提升
+    """
+    runtime = TieredRuntime(threshold=0, tier=Tier.OPTIMIZED)
+    assert runtime.run("2 * 21") == 42
+    assert runtime.stats.runs == {Tier.OPTIMIZED: 1}
+    assert not runtime.profiles
+
+
+def test_promoted_store_is_bounded():
+    """
+    测试提升的程序超过上限时淘汰最久没有用过的，被淘汰的程序重新计数
+    """
+    runtime = TieredRuntime(threshold=1, max_promoted=2)
+    for code in ["1", "2", "1", "2", "3", "3"]:
+        runtime.run(code)
+    assert list(runtime.promoted) == ["2", "3"]
+    assert runtime.stats.demotions == 1
+    assert runtime.tier_of("1") is None
+    runtime.run("1")
+    assert runtime.tier_of("1") == Tier.INTERPRETER
+    assert len(runtime.transpile_cache) <= 2
+
+
+def test_cold_profiles_are_bounded():
+    """
+    测试冷程序的记录数有上限
+    """
+    runtime = TieredRuntime(max_tracked=3)
+    for value in range(10):
+        assert runtime.run(f"{value} + 1") == value + 1
+    assert list(runtime.profiles) == ["7 + 1", "8 + 1", "9 + 1"]
+
+
+def test_interpreter_is_not_a_promotion_tier():
+    """
+    测试不能把程序提升到 INTERPRETER
+    """
+    with pytest.raises(RuntimeError, match="Can't promote"):
+        TieredRuntime(tier=Tier.INTERPRETER)
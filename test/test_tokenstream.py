@@ -0,0 +1,76 @@
+"""
+紧凑标记流测试
+"""
+import pytest
+
+from python.tokenizer import Token, Tokenizer, TokenType
+from python.tokenstream import TOKEN_TYPES, TokenStream
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "",
+        "1 + 2 + 3 + 4 - 5 - 6 + 7 - 8",
+        "12345 * 678 ** 90 * 1 ** 2",
+        "1.25 + .5 - 73. + 100.0625 ** 2",
+        "\n\n\n1 + 2\n\n\n3 + 4\n\n\n",
+        "( 1 ( 2 ) 3 ( ) 4       ",
+        "1.2.3 * .4.5",
+    ],
+)
+def test_token_stream_matches_tokenizer(code: str):
+    """
+    测试标记流与 Tokenizer 产生相同的标记
+    """
+    assert list(TokenStream(code)) == list(Tokenizer(code))
+
+
+def test_token_stream_stores_compact_arrays():
+    """
+    测试类型编码和源代码位置
+    """
+    stream = TokenStream("12 ** 3.5\n")
+    assert [TOKEN_TYPES[kind] for kind in stream.kinds] == [
+        TokenType.INT,
+        TokenType.EXP,
+        TokenType.FLOAT,
+        TokenType.NEWLINE,
+        TokenType.EOF,
+    ]
+    assert list(stream.starts) == [0, 3, 6, 9, 10]
+    assert list(stream.ends) == [2, 5, 9, 10, 10]
+    assert stream.value_at(0) == 12
+    assert stream.value_at(2) == 3.5
+    assert stream.value_at(1) is None
+
+
+@pytest.mark.parametrize("code", ["$", "  .  ", "1 + 2\t"])
+def test_token_stream_raises_error_on_garbage(code: str):
+    """
+    测试未知字符
+    """
+    with pytest.raises(RuntimeError):
+        TokenStream(code)
+
+
+def test_token_stream_eat_and_peek():
+    """
+    测试按下标读取标记：peek 只返回类型，eat 检查类型并解析字面量
+    """
+    stream = TokenStream("(1 + 2.5)")
+    assert [stream.peek(index) for index in range(len(stream) + 1)] == [
+        TokenType.LPAREN,
+        TokenType.INT,
+        TokenType.PLUS,
+        TokenType.FLOAT,
+        TokenType.RPAREN,
+        TokenType.NEWLINE,
+        TokenType.EOF,
+        None,
+    ]
+    assert stream.eat(1, TokenType.INT) == Token(TokenType.INT, 1)
+    assert stream.eat(3, TokenType.FLOAT) == Token(TokenType.FLOAT, 2.5)
+    assert stream.eat(4, TokenType.RPAREN) == Token(TokenType.RPAREN)
+    with pytest.raises(RuntimeError, match=r"Expected int, ate Token\(TokenType.LPAREN, None\)"):
+        stream.eat(0, TokenType.INT)
@@ -0,0 +1,203 @@
+"""
+CPython 代码对象后端测试
+"""
+import random
+import types
+from typing import Any, Callable
+
+import pytest
+
+from python import transpile as transpile_module
+from python.arena import AstArena
+from python.compiler import Bytecode, BytecodeType
+from python.interpreter import Interpreter
+from python.parser import BinOp, ExprStatement, Float, Int, Parser, Program, TreeNode, UnaryOp
+from python.peephole import optimize_bytecode
+from python.stackcompiler import StackCompiler
+from python.superinstructions import fuse_superinstructions
+from python.tokenizer import Tokenizer
+from python.transpile import NativeInterpreter, TranspileCache, transpile
+
+
+def parse(code: str) -> TreeNode:
+    """
+    解析源代码
+    """
+    return Parser(list(Tokenizer(code))).parse()
+
+
+def outcome(run: Callable[[], Any]) -> Any:
+    """
+    返回运行的结果或者异常
+    """
+    try:
+        return run()
+    except Exception as error:  # pylint: disable=W0718
+        return error.__class__, str(error)
+
+
+CODES: list[str] = [
+    "",
+    "3 + 5",
+    "1 % -2\n5 ** -3 / 5\n1 * 2 + 2 ** 3",
+    "--+(1 + 2) * -(3.0 - +4) ** 2 ** -0.5",
+    "-0.0\n+-0\n-(0.0 * 1)",
+    "2 ** 300 % 7",
+    "1 / 0",
+    "1 + 2 % 0.0",
+    "10.0 ** 400",
+    "(-8) ** 0.5",
+    "2 ** 3 ** 2\n1 - 2 - 3 - 4",
+    "(2 ** 64) * (2 ** 64) - 1",
+    "((((7 + 99999999.9) - (1 / 2)) % ((2.5 - 0) ** 0.5)) - ((7 - (1 + 3)) * 0.0))",
+    "(2.0 ** 10000) + ((1 / 0) * 2)",
+]
+
+
+@pytest.mark.parametrize("code", CODES)
+@pytest.mark.parametrize(
+    "prepare",
+    [
+        lambda tree: tree,
+        AstArena.from_tree,
+        lambda tree: StackCompiler(tree).compile_to_list(),
+        lambda tree: fuse_superinstructions(optimize_bytecode(StackCompiler(tree).compile_to_list())),
+    ],
+)
+def test_native_matches_interpreter(code: str, prepare: Callable[[TreeNode], Any]):
+    """
+    测试语法树、存储区、字节码和超级指令的转换结果都与 Interpreter 相同
+    """
+    tree: TreeNode = parse(code)
+    expected = outcome(Interpreter(StackCompiler(tree).compile_to_list()).run)
+    actual = outcome(NativeInterpreter(prepare(tree), TranspileCache()).run)
+    assert repr(actual) == repr(expected)
+
+
+@pytest.mark.parametrize(
+    "bytecode",
+    [
+        [Bytecode(BytecodeType.PUSH, 1), Bytecode(BytecodeType.PUSH, 2), Bytecode(BytecodeType.BINOP, "?")],
+        [Bytecode(BytecodeType.PUSH, 1), Bytecode(BytecodeType.UNARYOP, "~"), Bytecode(BytecodeType.POP)],
+        [
+            Bytecode(BytecodeType.PUSH, 1),
+            Bytecode(BytecodeType.PUSH, 0),
+            Bytecode(BytecodeType.BINOP, "/"),
+            Bytecode(BytecodeType.PUSH, 5),
+            Bytecode(BytecodeType.POP),
+        ],
+        [Bytecode(BytecodeType.PUSH, 5), Bytecode(BytecodeType.POP), Bytecode(BytecodeType.PUSH, 6)],
+    ],
+)
+def test_unusual_bytecode(bytecode: list[Bytecode]):
+    """
+    测试未知运算符和留在栈上的值，它们的求值顺序和异常与 Interpreter 相同
+    """
+    expected = outcome(Interpreter(bytecode).run)
+    assert outcome(NativeInterpreter(bytecode, TranspileCache()).run) == expected
+
+
+def random_expression(rng: random.Random, depth: int) -> str:
+    """
+    随机生成表达式，包括除以零、溢出和很大的乘方
+    """
+    if depth <= 0 or rng.random() < 0.25:
+        return rng.choice(["0", "1", "2", "3", "7", "0.0", "0.5", "2.5", "99999999.9", "10.0", "-2"])
+    op: str = rng.choice(["+", "-", "*", "/", "%", "**"])
+    right: str = rng.choice(["0.5", "2", "3", "-1", "10000.0"]) if op == "**" else random_expression(rng, depth - 1)
+    return f"({random_expression(rng, depth - 1)} {op} {right})"
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_programs_match_interpreter(seed: int):
+    """
+    随机程序的差分测试：结果和异常都与 Interpreter 相同
+    """
+    rng = random.Random(seed)
+    for _ in range(100):
+        code: str = "\n".join(random_expression(rng, 5) for _ in range(rng.randrange(1, 4)))
+        tree: TreeNode = parse(code)
+        expected = outcome(Interpreter(StackCompiler(tree).compile_to_list()).run)
+        actual = outcome(NativeInterpreter(tree, TranspileCache()).run)
+        assert repr(actual) == repr(expected), code
+
+
+def test_stack_underflow():
+    """
+    测试栈下溢在转换时报错
+    """
+    with pytest.raises(RuntimeError, match="Stack underflow at instruction 1"):
+        transpile([Bytecode(BytecodeType.PUSH, 1), Bytecode(BytecodeType.BINOP, "+")])
+
+
+def test_huge_powers_are_not_folded():
+    """
+    测试转换时不会计算巨大的乘方
+    """
+    code: types.CodeType = transpile(parse("(2 ** 3) ** 1000000000\n2 ** 2 ** 40\n7 * 3 ** 5000000"))
+    assert all(const.bit_length() <= 4096 for const in code.co_consts if isinstance(const, int))
+
+
+def left_deep_sum(depth: int) -> TreeNode:
+    """
+    构造 1 + 1 + ... + 1
+    """
+    tree: TreeNode = Int(1)
+    for _ in range(depth):
+        tree = BinOp("+", tree, Int(1))
+    return Program([ExprStatement(tree), ExprStatement(BinOp("-", Float(0.5), tree))])
+
+
+def nested_negations(depth: int) -> TreeNode:
+    """
+    构造 -(-(-(... x)))
+    """
+    tree: TreeNode = BinOp("*", Int(3), BinOp("/", Float(0.5), Int(0)))
+    for _ in range(depth):
+        tree = UnaryOp("-", tree)
+    return Program([ExprStatement(tree)])
+
+
+@pytest.mark.parametrize("build", [left_deep_sum, nested_negations])
+def test_deep_trees(build: Callable[[int], TreeNode]):
+    """
+    测试很深的语法树分段存入局部变量，CPython 编译器不会递归溢出
+    """
+    tree: TreeNode = build(20_000)
+    interpreter = NativeInterpreter(tree, TranspileCache())
+    assert not interpreter.fallback
+    assert outcome(interpreter.run) == outcome(Interpreter(StackCompiler(tree).compile_to_list()).run)
+
+
+def test_cache():
+    """
+    测试相同的程序共用代码对象，缓存按 LRU 淘汰
+    """
+    cache = TranspileCache(max_entries=2)
+    first: types.CodeType = cache.compile(parse("1 + 2"))
+    assert cache.compile(parse("1 + 2")) is first
+    assert cache.compile(StackCompiler(parse("1 + 2")).compile_to_list()) is not first
+    cache.compile(parse("3 * 4"))
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.evictions, len(cache)) == (1, 3, 1, 2)
+    unknown = Program([ExprStatement(BinOp("?", Int(1), Int(2)))])
+    assert cache.key(unknown) is None
+    cache.compile(unknown)
+    assert len(cache) == 2
+    cache.clear()
+    assert not cache
+
+
+def test_fallback(monkeypatch: pytest.MonkeyPatch):
+    """
+    测试转换失败时退回到 Interpreter
+    """
+
+    def fail(*args: Any) -> types.CodeType:
+        raise RecursionError("maximum recursion depth exceeded during compilation")
+
+    monkeypatch.setattr(transpile_module, "transpile", fail)
+    cache = TranspileCache()
+    interpreter = NativeInterpreter(parse("7\n2 ** 10"), cache)
+    assert interpreter.fallback
+    assert interpreter.run() == 1024
+    assert cache.stats.errors == 1
@@ -0,0 +1,82 @@
+"""
+分派表测试
+"""
+import pytest
+
+from python.compiler import Bytecode, BytecodeType, Compiler
+from python.interpreter import Interpreter
+from python.parser import NodeDescriber, TreeNode, describe_node
+from python.visitor import Dispatcher
+
+
+@pytest.mark.parametrize(
+    ["dispatcher", "keys"],
+    [
+        (Compiler, Compiler.dispatch_keys),
+        (Interpreter, list(BytecodeType)),
+        (NodeDescriber, NodeDescriber.dispatch_keys),
+    ],
+)
+def test_every_key_has_a_handler(dispatcher: type[Dispatcher], keys):
+    """
+    测试分派表覆盖了所有的键
+    """
+    assert set(dispatcher.dispatch_table) == set(keys)
+    assert all(callable(handler) for handler in dispatcher.dispatch_table.values())
+
+
+def test_missing_handlers_are_reported_at_class_creation():
+    """
+    测试创建类时就报告缺少的处理方法
+    """
+    with pytest.raises(RuntimeError, match="interpret_push, interpret_pop"):
+
+        class Incomplete(Dispatcher):  # pylint: disable=W0612
+            """
+            缺少处理方法的分派类
+            """
+
+            dispatch_prefix = "interpret_"
+            dispatch_keys = {bct: bct.value for bct in BytecodeType}
+
+            def interpret_binop(self, bc: Bytecode) -> None:
+                """
+                解释二元运算
+                """
+
+            def interpret_unaryop(self, bc: Bytecode) -> None:
+                """
+                解释一元运算
+                """
+
+
+def test_subclasses_dispatch_to_overridden_handlers():
+    """
+    测试子类覆盖的处理方法会进入子类的分派表
+    """
+
+    class DoublingInterpreter(Interpreter):
+        """
+        入栈时把值翻倍的解释器
+        """
+
+        def interpret_push(self, bc: Bytecode) -> None:
+            self.stack.push(2 * bc.value)
+
+    bytecode: list[Bytecode] = [Bytecode(BytecodeType.PUSH, 21), Bytecode(BytecodeType.POP)]
+    interpreter = DoublingInterpreter(bytecode)
+    interpreter.interpret()
+    assert interpreter.last_value_popped == 42
+    assert Interpreter.dispatch_table[BytecodeType.PUSH] is Interpreter.interpret_push
+
+
+def test_unknown_keys_raise():
+    """
+    测试没有处理方法的节点和字节码会报错
+    """
+    with pytest.raises(RuntimeError, match="Can't compile TreeNode"):
+        list(Compiler(TreeNode()).compile())
+    with pytest.raises(RuntimeError, match="Can't print a node of type TreeNode"):
+        describe_node(TreeNode())
+    with pytest.raises(RuntimeError, match="Can't interpret jump"):
+        Interpreter([Bytecode("jump")]).interpret()  # type: ignore[arg-type]